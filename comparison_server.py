@@ -15,6 +15,7 @@ from openai import OpenAI
 import concurrent.futures
 import threading
 import queue
+from github_hub.http_client import http_client  # 共享 keep-alive 连接池与重试
 
 # Global log queue for SSE
 log_queue = queue.Queue()
@@ -65,7 +66,7 @@ def search_duckduckgo(query, max_results=3):
     payload = {'q': query}
     
     try:
-        response = requests.post(url, data=payload, headers=HEADERS, timeout=10)
+        response = http_client.post(url, data=payload, headers=HEADERS, timeout=10)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         results = []
@@ -95,7 +96,7 @@ def search_github(query, max_results=5):
     params = {'q': query, 'sort': 'stars', 'order': 'desc', 'per_page': max_results}
     
     try:
-        response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        response = http_client.get(url, params=params, headers=HEADERS, timeout=10)
         response.raise_for_status()
         data = response.json()
         results = []
@@ -123,7 +124,7 @@ def search_searxng(query, max_results=5):
             log_event("SearXNG", f"Trying {instance}...")
             url = f"{instance}/search"
             params = {'q': query, 'format': 'json', 'engines': 'google,bing,brave'}
-            response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+            response = http_client.get(url, params=params, headers=HEADERS, timeout=10)
             response.raise_for_status()
             data = response.json()
             results = []
@@ -153,7 +154,7 @@ def search_bing_news(query, max_results=5):
     params = {'q': query, 'FORM': 'HDRSC6', 'qft': 'sortbydate%3d"1"'}
     
     try:
-        response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        response = http_client.get(url, params=params, headers=HEADERS, timeout=10)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         results = []
@@ -195,7 +196,7 @@ def search_hackernews(query, max_results=5):
     params = {'query': query, 'tags': 'story', 'hitsPerPage': max_results}
     
     try:
-        response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        response = http_client.get(url, params=params, headers=HEADERS, timeout=10)
         response.raise_for_status()
         data = response.json()
         results = []
@@ -0,0 +1,225 @@
+# GitHub Hub - 增量压缩归档 (base 快照 + 每日 delta，JSONL + gzip/zstd)
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .config import ARCHIVE_CONFIG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 每天都会变化但不代表内容变化的字段，不参与变更检测
+VOLATILE_FIELDS = ("last_scanned", "growth_updated_at", "row_updated_at")
+
+_EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _row_hash(row: Dict) -> str:
+    stable = {k: v for k, v in row.items() if k not in VOLATILE_FIELDS}
+    payload = json.dumps(stable, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _open_write(path: str, compression: str):
+    if compression == "zstd":
+        raw = open(path, "wb")
+        stream = zstandard.ZstdCompressor(level=ARCHIVE_CONFIG["zstd_level"]).stream_writer(raw)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return gzip.open(path, "wt", encoding="utf-8", compresslevel=ARCHIVE_CONFIG["gzip_level"])
+
+
+def _open_read(path: str):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; pip install zstandard to read it")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+class ArchiveEngine:
+    """Daily project archives stored as a base snapshot plus per-day deltas.
+
+    <root>/<YYYY-MM-DD>/ holds either base.jsonl.* (every row) or
+    delta.jsonl.* ({"op": "upsert", "row": ...} / {"op": "delete", "id": ...}),
+    plus _index.json.gz (id -> row hash, used to diff the next day) and
+    _stats.json. A new base is written every base_every days so
+    reconstructing a date never replays a long chain. Rows whose only change
+    is a VOLATILE_FIELDS value are not rewritten, so a reconstructed row keeps
+    the last_scanned of the day it last changed.
+    """
+
+    def __init__(self, root: str = None, compression: str = None, base_every: int = None):
+        self.root = root or ARCHIVE_CONFIG["dir"]
+        compression = compression or ARCHIVE_CONFIG["compression"]
+        if compression == "zstd" and zstandard is None:
+            print("[Archive] zstandard not installed, using gzip")
+            compression = "gzip"
+        self.compression = compression
+        self.base_every = base_every or ARCHIVE_CONFIG["base_every"]
+
+    # ---------- layout ----------
+
+    def days(self) -> List[Tuple[str, str]]:
+        """Archived days in order as (day, "base" | "delta")"""
+        if not os.path.isdir(self.root):
+            return []
+        result = []
+        for day in sorted(os.listdir(self.root)):
+            kind = self._kind(day)
+            if kind:
+                result.append((day, kind))
+        return result
+
+    def _kind(self, day: str) -> Optional[str]:
+        for kind in ("base", "delta"):
+            if self._data_file(day, kind):
+                return kind
+        return None  # 旧格式目录 (按分类的 .json) 或空目录
+
+    def _data_file(self, day: str, kind: str) -> Optional[str]:
+        for ext in _EXTENSIONS.values():
+            path = os.path.join(self.root, day, kind + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _load_index(self, day: str) -> Dict[str, str]:
+        with gzip.open(os.path.join(self.root, day, "_index.json.gz"), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    # ---------- write ----------
+
+    def archive(self, rows: Iterable[Dict], day: str = None) -> Dict:
+        """Archive a stream of project rows for day (default today).
+
+        Writes a delta against the previous archived day, or a base snapshot
+        when there is none or the last base is base_every days old. Re-running
+        on the same day replaces that day's archive. Returns the day's stats.
+        """
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        history = [(d, k) for d, k in self.days() if d < day]
+        previous = history[-1][0] if history else None
+        last_base = next((d for d, k in reversed(history) if k == "base"), None)
+        is_base = last_base is None or (
+            datetime.fromisoformat(day) - datetime.fromisoformat(last_base)).days >= self.base_every
+        prev_index = {} if is_base or previous is None else self._load_index(previous)
+
+        day_dir = os.path.join(self.root, day)
+        os.makedirs(day_dir, exist_ok=True)
+        kind = "base" if is_base else "delta"
+        path = os.path.join(day_dir, kind + _EXTENSIONS[self.compression])
+        tmp = path + ".tmp"
+
+        # 统计与写入在同一次遍历中完成
+        stats = {"date": day, "kind": kind, "total": 0, "breakdown": {},
+                 "added": 0, "changed": 0, "removed": 0, "written": 0}
+        index: Dict[str, str] = {}
+        with _open_write(tmp, self.compression) as f:
+            for row in rows:
+                row_id = str(row["id"])
+                digest = _row_hash(row)
+                index[row_id] = digest
+                stats["total"] += 1
+                category = row.get("category") or "other"
+                stats["breakdown"][category] = stats["breakdown"].get(category, 0) + 1
+
+                old = prev_index.get(row_id)
+                if is_base:
+                    f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                elif old != digest:
+                    stats["added" if old is None else "changed"] += 1
+                    f.write(json.dumps({"op": "upsert", "row": row}, ensure_ascii=False, default=str) + "\n")
+                else:
+                    continue
+                stats["written"] += 1
+            for row_id in prev_index.keys() - index.keys():
+                f.write(json.dumps({"op": "delete", "id": row_id}) + "\n")
+                stats["removed"] += 1
+                stats["written"] += 1
+
+        index_path = os.path.join(day_dir, "_index.json.gz")
+        with gzip.open(index_path + ".tmp", "wt", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        stats["bytes"] = os.path.getsize(tmp)
+        stats_path = os.path.join(day_dir, "_stats.json")
+        with open(stats_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+
+        # 数据文件是当天归档的发布标记，最后才放到位:
+        # 先撤下旧数据 (同一天重跑)，再替换 index/stats，中途崩溃只会让这一天缺失，
+        # 不会留下与数据不符的 index 供下一天的 delta 对比
+        for stale_kind in ("base", "delta"):
+            stale = self._data_file(day, stale_kind)
+            if stale:
+                os.remove(stale)
+        os.replace(index_path + ".tmp", index_path)
+        os.replace(stats_path + ".tmp", stats_path)
+        os.replace(tmp, path)
+        return stats
+
+    # ---------- read ----------
+
+    def _apply(self, day: str, kind: str, rows: Dict[str, Dict]):
+        if kind == "base":
+            rows.clear()
+        with _open_read(self._data_file(day, kind)) as f:
+            for line in f:
+                record = json.loads(line)
+                if kind == "base":
+                    rows[str(record["id"])] = record
+                elif record["op"] == "upsert":
+                    rows[str(record["row"]["id"])] = record["row"]
+                else:
+                    rows.pop(str(record["id"]), None)
+
+    def reconstruct(self, day: str) -> Dict[str, Dict]:
+        """Rebuild the full project set as archived on day (id -> row)"""
+        chain = []
+        for d, kind in self.days():
+            if d > day:
+                break
+            if kind == "base":
+                chain = []
+            chain.append((d, kind))
+        if not chain:
+            raise FileNotFoundError(f"No archive on or before {day}")
+
+        rows: Dict[str, Dict] = {}
+        for d, kind in chain:
+            self._apply(d, kind, rows)
+        return rows
+
+    def replay(self, since: str = None) -> Iterator[Tuple[str, Dict[str, Dict]]]:
+        """Yield (day, rows) for each archived day >= since, reading every file once.
+
+        rows is the same dict mutated in place between days; copy it if it
+        must outlive the iteration step.
+        """
+        days = self.days()
+        start = 0
+        for i, (d, kind) in enumerate(days):
+            if since is None or d > since:
+                break
+            if kind == "base":
+                start = i
+        rows: Dict[str, Dict] = {}
+        for d, kind in days[start:]:
+            self._apply(d, kind, rows)
+            if since is None or d >= since:
+                yield d, rows
+
+    def iter_day(self, day: str) -> Iterator[Dict]:
+        """Reconstructed rows for day in id order"""
+        rows = self.reconstruct(day)
+        for row_id in sorted(rows):
+            yield rows[row_id]
+
+    def stats(self, day: str) -> Dict:
+        with open(os.path.join(self.root, day, "_stats.json"), encoding="utf-8") as f:
+            return json.load(f)
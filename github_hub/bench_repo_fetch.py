@@ -0,0 +1,82 @@
+# GitHub Hub - 基准测试: 逐仓库 REST (/repos + /readme) 对比 GraphQL 批量获取元数据与 README
+"""
+Usage:
+    python -m github_hub.bench_repo_fetch                      # 100 most-starred projects in the database
+    python -m github_hub.bench_repo_fetch --repos psf/requests pallets/flask --batch-size 50
+
+Both paths start from an empty README cache and bypass the HTTP response
+cache, so every run measures real round trips. GraphQL needs GITHUB_TOKEN.
+"""
+import argparse
+import tempfile
+import time
+from typing import Dict, List
+from .config import GITHUB_API, GITHUB_TOKEN, GRAPHQL_CONFIG
+from .crawler import CrawlerAgent
+from .readme_cache import ReadmeCache
+from .ratelimit import governor
+
+
+def bench_rest(crawler: CrawlerAgent, full_names: List[str]) -> Dict:
+    started = time.perf_counter()
+    found = readmes = 0
+    for full_name in full_names:
+        response = governor.get(f"{GITHUB_API}/repos/{full_name}", headers=crawler.headers, timeout=15)
+        if response.status_code == 200:
+            crawler._parse_repo(response.json(), "")
+            found += 1
+            readmes += crawler.get_readme(full_name) is not None
+    return {"seconds": time.perf_counter() - started, "requests": 2 * found + (len(full_names) - found),
+            "repos": found, "readmes": readmes}
+
+
+def bench_graphql(crawler: CrawlerAgent, full_names: List[str], batch_size: int) -> Dict:
+    started = time.perf_counter()
+    projects = {}
+    for start in range(0, len(full_names), batch_size):
+        projects.update(crawler._fetch_graphql_batch(full_names[start:start + batch_size], ""))
+    readmes = sum(crawler.readme_cache.get(name) is not None for name in projects)
+    return {"seconds": time.perf_counter() - started, "requests": -(-len(full_names) // batch_size),
+            "repos": len(projects), "readmes": readmes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-repo REST vs batched GraphQL repo + README fetches")
+    parser.add_argument("--repos", nargs="*", help="owner/name list (default: top projects from the database)")
+    parser.add_argument("--limit", type=int, default=100, help="number of database projects when --repos is omitted")
+    parser.add_argument("--batch-size", type=int, default=GRAPHQL_CONFIG["batch_size"])
+    args = parser.parse_args()
+
+    full_names = args.repos
+    if not full_names:
+        from .database import Database
+        db = Database()
+        try:
+            projects = sorted(db.get_all_projects(projection="card"), key=lambda p: p.get("stars") or 0, reverse=True)
+            full_names = [p["full_name"] for p in projects[:args.limit]]
+        finally:
+            db.close()
+    print(f"[Bench] {len(full_names)} repos")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        crawler = CrawlerAgent()
+        crawler.readme_cache = ReadmeCache(root=f"{tmp}/rest")
+        rest = bench_rest(crawler, full_names)
+        print(f"[Bench] REST     {rest['seconds']:.2f}s  {rest['requests']} requests  "
+              f"{rest['repos']} repos  {rest['readmes']} READMEs")
+
+        if not GITHUB_TOKEN:
+            print("[Bench] GITHUB_TOKEN not set, GraphQL skipped")
+            return
+        crawler.readme_cache = ReadmeCache(root=f"{tmp}/graphql")
+        graphql = bench_graphql(crawler, full_names, args.batch_size)
+        print(f"[Bench] GraphQL  {graphql['seconds']:.2f}s  {graphql['requests']} requests  "
+              f"{graphql['repos']} repos  {graphql['readmes']} READMEs")
+        if graphql["seconds"]:
+            print(f"[Bench] speedup {rest['seconds'] / graphql['seconds']:.1f}x, "
+                  f"{rest['requests'] - graphql['requests']} fewer requests")
+        print(f"[Bench] rate limit: {governor.stats()}")
+
+
+if __name__ == "__main__":
+    main()
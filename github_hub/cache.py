@@ -0,0 +1,148 @@
+# GitHub Hub - Read-through Cache (LRU + TTL)
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable
+
+_MISS = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL, a byte budget and tag invalidation.
+
+    Entries can carry tags (e.g. "project:123", "category:llm_rag"); invalidate_tag
+    drops every entry carrying that tag, which is how Database invalidates list
+    reads that contain a project after that project is written.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 2048,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size, tags)
+        self._tags: Dict[str, set] = {}
+        self._bytes = 0
+        # 每次失效 +1；get_or_load 据此丢弃加载期间已被失效的结果
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a cached value, or default on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float = None, tags: Iterable[str] = ()):
+        """Store a value, evicting least-recently-used entries over budget"""
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl is None else ttl)
+        tags = frozenset(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: float = None,
+                    tags: Callable[[Any], Iterable[str]] = None) -> Any:
+        """Read-through: return the cached value or call loader() and cache its result.
+
+        tags is a function of the loaded value so list entries can be tagged with
+        the ids they contain. If anything is invalidated while loader() runs,
+        the result is returned but not cached, since it may predate the write.
+        """
+        value = self.get(key, _MISS)
+        if value is not _MISS:
+            return value
+        with self._lock:
+            generation = self._generation
+        value = loader()
+        if value is not None:
+            entry_tags = tags(value) if tags else ()
+            with self._lock:
+                if self._generation == generation:
+                    self.set(key, value, ttl=ttl, tags=entry_tags)
+        return value
+
+    def invalidate(self, key: str):
+        """Drop a single key"""
+        with self._lock:
+            self._generation += 1
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_tag(self, tag: str):
+        """Drop every entry carrying tag"""
+        with self._lock:
+            self._generation += 1
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self):
+        """Drop everything (counters are kept)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current footprint"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key: str):
+        value, _, size, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        """Approximate footprint as the size of the JSON encoding"""
+        try:
+            return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+        except (TypeError, ValueError):
+            return 1024
+
+
+class NullCache(TTLCache):
+    """Cache that never stores anything (use to disable caching)"""
+
+    def __init__(self):
+        super().__init__(ttl_seconds=0, max_entries=0, max_bytes=0)
+
+    def set(self, key: str, value: Any, ttl: float = None, tags: Iterable[str] = ()):
+        pass
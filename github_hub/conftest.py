@@ -0,0 +1,25 @@
+"""Shared test fixtures: a minimal project row factory and a temporary Database"""
+import pytest
+
+from github_hub.database import Database
+
+
+def _project(pid, category: str = "llm", **extra) -> dict:
+    pid = str(pid)
+    row = {"id": pid, "name": f"repo{pid}", "full_name": f"owner/repo{pid}", "category": category,
+           "stars": 10, "forks": 0, "url": f"https://github.com/owner/repo{pid}"}
+    row.update(extra)
+    return row
+
+
+@pytest.fixture
+def make_project():
+    """make_project(pid, category="llm", **extra) -> the smallest row upsert_projects accepts"""
+    return _project
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "hub.db"))
+    yield database
+    database.close()
@@ -0,0 +1,86 @@
+# GitHub Hub - Content Store (教程/README/视觉摘要等大文本，压缩后存放在 project_content 表)
+"""
+Usage:
+    python -m github_hub.content_store          # move inline blobs out of the projects table
+"""
+import argparse
+import hashlib
+import zlib
+from typing import Dict, List, Optional
+from .storage import StorageBackend
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _decode(row: Dict) -> str:
+    data = row["data"]
+    return (zlib.decompress(data) if row["codec"] == "zlib" else data).decode("utf-8")
+
+
+class ContentStore:
+    """zlib-compressed text bodies keyed by (project id, kind), deduplicated by content hash"""
+
+    def __init__(self, backend: StorageBackend, level: int = 6):
+        self.backend = backend
+        self.level = level
+
+    def put_many(self, project_id: str, bodies: Dict[str, Optional[str]]) -> int:
+        """Store kind -> text for a project; empty text deletes the kind.
+
+        Bodies whose hash matches the stored one are not rewritten.
+        Returns the number of bodies written.
+        """
+        current = {row["kind"]: row["content_hash"]
+                   for row in self.backend.get_content(project_id, list(bodies), with_data=False)}
+        rows, removed = [], []
+        for kind, text in bodies.items():
+            if not text:
+                if kind in current:
+                    removed.append(kind)
+                continue
+            digest = content_hash(text)
+            if current.get(kind) == digest:
+                continue
+            raw = text.encode("utf-8")
+            rows.append({"project_id": project_id, "kind": kind, "content_hash": digest, "codec": "zlib",
+                         "data": zlib.compress(raw, self.level), "size": len(raw)})
+        if rows:
+            self.backend.put_content(rows)
+        if removed:
+            self.backend.delete_content(project_id, removed)
+        return len(rows)
+
+    def put(self, project_id: str, kind: str, text: Optional[str]) -> bool:
+        return self.put_many(project_id, {kind: text}) > 0
+
+    def get_many(self, project_id: str, kinds: List[str] = None) -> Dict[str, str]:
+        return {row["kind"]: _decode(row) for row in self.backend.get_content(project_id, kinds)}
+
+    def get_for_projects(self, project_ids: List[str], kinds: List[str] = None) -> Dict[str, Dict[str, str]]:
+        """project id -> {kind: text} for a page of projects, in one query"""
+        bodies: Dict[str, Dict[str, str]] = {}
+        for row in self.backend.get_content_for(project_ids, kinds):
+            bodies.setdefault(str(row["project_id"]), {})[row["kind"]] = _decode(row)
+        return bodies
+
+    def get(self, project_id: str, kind: str) -> Optional[str]:
+        return self.get_many(project_id, [kind]).get(kind)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move inline tutorials/READMEs into the content store")
+    parser.add_argument("--db", default=None, help="use a local SQLite database at this path")
+    args = parser.parse_args()
+
+    from .database import Database
+    db = Database(args.db)
+    try:
+        db.move_inline_content()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 # GitHub Hub - GitHub API 爬虫 Agent
-import requests
-import time
 import base64
 import random
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
-from .config import GITHUB_API, GITHUB_TOKEN, CATEGORIES, SCAN_CONFIG
+from .config import GITHUB_API, GITHUB_TOKEN, CATEGORIES, SCAN_CONFIG, README_CONFIG, RATELIMIT_CONFIG, GRAPHQL_CONFIG
+from .readme_cache import ReadmeCache
+from .ratelimit import governor, RateLimitExceeded
+from .http_cache import http_cache
+from .http_client import http_client
 import os
 
 try:
@@ -25,6 +29,7 @@ class CrawlerAgent:
         }
         if GITHUB_TOKEN:
             self.headers["Authorization"] = f"token {GITHUB_TOKEN}"
+        self.readme_cache = ReadmeCache()
             
         # 确保截图目录存在
         os.makedirs("static/screenshots", exist_ok=True)
@@ -83,26 +88,14 @@ class CrawlerAgent:
         print(f"[Crawler] Searching category '{category}' with query: {query[:50]}...")
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
-            # 处理速率限制
-            if response.status_code == 403 or response.status_code == 429:
-                print(f"[Crawler] Rate limit hit for {category}! Waiting 60s...")
-                time.sleep(60)
-                # 重试一次
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
+            # 条件请求缓存 (304 不消耗额度)；速率限制由 governor 按响应头等待，限流时重试一次
+            response = http_cache.get(url, headers=self.headers, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             
             projects = []
             for item in data.get("items", []):
                 projects.append(self._parse_repo(item, category))
-                
-            # 搜索 API 限制非常大 (10 req/min for unauth)，所以必须 sleep
-            # 如果有 Token 可以快一点，如果没有建议 sleep 6s
-            delay = 2 if GITHUB_TOKEN else 10
-            time.sleep(delay)
             
             return projects
             
@@ -140,7 +133,9 @@ class CrawlerAgent:
                 params = base_params.copy()
                 params['page'] = page
                 
-                response = requests.get(f"{GITHUB_API}/search/repositories", headers=self.headers, params=params, timeout=15)
+                response = http_cache.get(f"{GITHUB_API}/search/repositories", retries=0,
+                                          max_wait=RATELIMIT_CONFIG["interactive_max_wait"],
+                                          headers=self.headers, params=params, timeout=15)
                 
                 if response.status_code in [403, 429]:
                     print(f"[Crawler] Rate limit hit for Remote Search!")
@@ -174,7 +169,6 @@ class CrawlerAgent:
                     projects.append(p)
                 
                 page += 1
-                time.sleep(1) # Be nice to API
                 
             except Exception as e:
                 print(f"[Crawler] Error remote searching page {page}: {e}")
@@ -194,7 +188,7 @@ class CrawlerAgent:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            response = http_cache.get(url, headers=self.headers, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             return [self._parse_repo(item, "trending") for item in data.get("items", [])]
@@ -213,7 +207,7 @@ class CrawlerAgent:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            response = http_cache.get(url, headers=self.headers, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             return [self._parse_repo(item, "new_releases") for item in data.get("items", [])]
@@ -222,20 +216,165 @@ class CrawlerAgent:
             return []
     
     def get_readme(self, full_name: str) -> Optional[str]:
-        """获取项目 README 内容"""
+        """获取项目 README 内容 (本地缓存；过期后用 ETag 条件请求，304 不消耗解码)"""
+        cache = self.readme_cache
+        entry = cache.get(full_name)
+        if entry is not None and cache.is_fresh(entry):
+            cache.count("hits")
+            return self._readme_text(entry)
+        
         url = f"{GITHUB_API}/repos/{full_name}/readme"
+        headers = dict(self.headers)
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = governor.get(url, headers=headers, timeout=15)
+            if response.status_code == 304 and entry is not None:
+                cache.count("revalidated")
+                return self._readme_text(cache.touch(full_name, entry))
             if response.status_code == 200:
                 data = response.json()
-                # README 内容是 base64 编码的
-                import base64
-                content = base64.b64decode(data.get("content", "")).decode("utf-8")
-                return content[:10000]  # 限制长度
-        except:
-            pass
-        return None
+                sha = data.get("sha")
+                if entry is not None and sha and entry.get("sha") == sha:
+                    # blob SHA 未变: 沿用缓存文本，跳过 base64 解码
+                    cache.count("unchanged")
+                    text = entry.get("text")
+                else:
+                    cache.count("fetched")
+                    # README 内容是 base64 编码的
+                    text = base64.b64decode(data.get("content", "")).decode("utf-8", errors="replace")
+                entry = cache.put(full_name, text, sha, response.headers.get("ETag"))
+                return self._readme_text(entry)
+            if response.status_code == 404:
+                # 没有 README 的仓库也缓存，避免重复请求
+                cache.put(full_name, None, etag=response.headers.get("ETag"))
+                return None
+        except Exception as e:
+            print(f"[Crawler] README fetch failed for {full_name}: {e}")
+        # 请求失败时退回到过期的缓存
+        return self._readme_text(entry) if entry is not None else None
+    
+    @staticmethod
+    def _readme_text(entry: Dict) -> Optional[str]:
+        text = entry.get("text")
+        return text[:README_CONFIG["max_chars"]] if text else None
+
+    def _graphql_query(self, count: int) -> str:
+        readmes = "\n".join(f'    readme{i}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text oid }} }}'
+                            for i, path in enumerate(GRAPHQL_CONFIG["readme_paths"]))
+        fields = f"""
+    databaseId name nameWithOwner stargazerCount forkCount description url homepageUrl
+    createdAt updatedAt primaryLanguage {{ name }}
+    repositoryTopics(first: 20) {{ nodes {{ topic {{ name }} }} }}
+{readmes}"""
+        params = ", ".join(f"$o{i}: String!, $n{i}: String!" for i in range(count))
+        repos = "\n".join(f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{{fields}\n  }}" for i in range(count))
+        return f"query({params}) {{\n  rateLimit {{ cost remaining }}\n{repos}\n}}"
+
+    @staticmethod
+    def _graphql_item(node: Dict) -> Dict:
+        """GraphQL repository node -> REST-shaped item for _parse_repo"""
+        return {
+            "id": node["databaseId"],
+            "name": node["name"],
+            "full_name": node["nameWithOwner"],
+            "stargazers_count": node["stargazerCount"],
+            "forks_count": node["forkCount"],
+            "description": node.get("description") or "",
+            "html_url": node["url"],
+            "homepage": node.get("homepageUrl"),
+            "language": (node.get("primaryLanguage") or {}).get("name"),
+            "topics": [t["topic"]["name"] for t in (node.get("repositoryTopics") or {}).get("nodes", [])],
+            "created_at": node["createdAt"],
+            "updated_at": node["updatedAt"],
+        }
+
+    def _fetch_graphql_batch(self, full_names: List[str], category: str) -> Dict[str, Dict]:
+        """One GraphQL query for up to batch_size repos; README text goes into the README cache"""
+        variables = {}
+        for i, full_name in enumerate(full_names):
+            variables[f"o{i}"], variables[f"n{i}"] = full_name.split("/", 1)
+        headers = {k: v for k, v in self.headers.items() if k != "Accept"}
+        response = governor.post(GRAPHQL_CONFIG["url"], headers=headers, timeout=60,
+                                 json={"query": self._graphql_query(len(full_names)), "variables": variables})
+        response.raise_for_status()
+        data = response.json().get("data") or {}
+
+        projects = {}
+        for i, full_name in enumerate(full_names):
+            node = data.get(f"r{i}")
+            if not node:
+                continue  # 仓库不存在/无权限，交给 REST
+            projects[full_name] = self._parse_repo(self._graphql_item(node), category)
+            blob = next((node[f"readme{j}"] for j in range(len(GRAPHQL_CONFIG["readme_paths"]))
+                         if node.get(f"readme{j}") and node[f"readme{j}"].get("text") is not None), None)
+            if blob is not None:
+                self.readme_cache.count("fetched")
+                # Blob oid 即 REST /readme 返回的 sha，之后的 ETag 重新验证仍可跳过解码
+                self.readme_cache.put(node["nameWithOwner"], blob["text"], blob["oid"])
+        return projects
+
+    def _fetch_repo_rest(self, full_name: str, category: str) -> Optional[Dict]:
+        try:
+            response = http_cache.get(f"{GITHUB_API}/repos/{full_name}", headers=self.headers, timeout=15)
+            if response.status_code != 200:
+                return None
+            return self._parse_repo(response.json(), category)
+        except Exception as e:
+            print(f"[Crawler] Error fetching {full_name}: {e}")
+            return None
+
+    def fetch_repos(self, full_names: List[str], category: str = "", with_readme: bool = True) -> Dict[str, Dict]:
+        """Repo metadata (_parse_repo shape) for many repos, keyed by full_name.
+
+        With a token, up to GRAPHQL_CONFIG["batch_size"] repos and their
+        READMEs come back in one GraphQL query, and the READMEs are stored in
+        the README cache so get_readme() answers locally. Repos the query
+        could not resolve (or all of them, without a token or on error) fall
+        back to the per-repo REST calls.
+        """
+        projects = {}
+        if GITHUB_TOKEN:
+            size = GRAPHQL_CONFIG["batch_size"]
+            for start in range(0, len(full_names), size):
+                chunk = full_names[start:start + size]
+                try:
+                    projects.update(self._fetch_graphql_batch(chunk, category))
+                except Exception as e:
+                    print(f"[Crawler] GraphQL batch of {len(chunk)} failed, using REST: {e}")
+
+        for full_name in full_names:
+            if full_name not in projects:
+                project = self._fetch_repo_rest(full_name, category)
+                if project:
+                    projects[full_name] = project
+            if with_readme and full_name in projects:
+                # GraphQL 已写入缓存的直接命中；其他 README 文件名/失败的走 REST
+                self.get_readme(full_name)
+        return projects
+
+    def prefetch_readmes(self, full_names: List[str]) -> int:
+        """Warm the README cache for repos whose entry is missing or stale (GraphQL batches).
+
+        GraphQL requires a token: without GITHUB_TOKEN this is a no-op and
+        get_readme() fetches each README over REST when it is needed.
+        """
+        if not GITHUB_TOKEN:
+            return 0  # 没有 token 无法使用 GraphQL，按需逐个获取即可
+        stale = []
+        for full_name in full_names:
+            entry = self.readme_cache.get(full_name)
+            if entry is None or not self.readme_cache.is_fresh(entry):
+                stale.append(full_name)
+        size = GRAPHQL_CONFIG["batch_size"]
+        warmed = 0
+        for start in range(0, len(stale), size):
+            try:
+                warmed += len(self._fetch_graphql_batch(stale[start:start + size], ""))
+            except Exception as e:
+                print(f"[Crawler] README prefetch failed: {e}")
+        return warmed
 
     def fetch_project_by_url(self, url: str) -> Optional[Dict]:
         """通过 URL 获取项目详情"""
@@ -248,13 +387,27 @@ class CrawlerAgent:
             
             repo_full_name = f"{parts[-2]}/{parts[-1]}"
             
+            if GITHUB_TOKEN:
+                # 一次 GraphQL 查询同时取回元数据与 README，随后的立即分析直接命中 README 缓存
+                try:
+                    project = self._fetch_graphql_batch([repo_full_name], "manual").get(repo_full_name)
+                    if project:
+                        return project
+                except Exception as e:
+                    print(f"[Crawler] GraphQL lookup of {repo_full_name} failed, using REST: {e}")
+            
             api_url = f"{GITHUB_API}/repos/{repo_full_name}"
-            response = requests.get(api_url, headers=self.headers, timeout=10)
+            # 交互请求不长时间阻塞: 额度耗尽时直接走 HTML 备用方案
+            response = http_cache.get(api_url, retries=0, max_wait=RATELIMIT_CONFIG["interactive_max_wait"],
+                                      headers=self.headers, timeout=10)
             response.raise_for_status()
             
             data = response.json()
             return self._parse_repo(data, "manual") # 'manual' category
             
+        except RateLimitExceeded as e:
+            print(f"[Crawler] {e}. Attempting HTML scrape fallback for {url}...")
+            return self._scrape_github_page_fallback(url)
         except Exception as e:
             # Fallback: API Rate Limit or Network Error -> Try HTML Scrape
             if "403" in str(e) or "429" in str(e):
@@ -267,7 +420,7 @@ class CrawlerAgent:
     def _scrape_github_page_fallback(self, url: str) -> Optional[Dict]:
         """Github API 限流时的备用方案：直接爬取网页"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = http_client.get(url, headers=self.headers, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -339,30 +492,70 @@ class CrawlerAgent:
         date = datetime.now() - timedelta(days=days)
         return date.strftime("%Y-%m-%d")
     
-    def crawl_all_categories(self, db) -> Dict:
-        """爬取所有分类"""
+    def fetch_category(self, cat_id: str) -> List[Dict]:
+        """获取单个分类的项目"""
+        if cat_id == "trending":
+            return self.get_trending()
+        if cat_id == "new_releases":
+            return self.get_new_releases()
+        return self.search_by_keywords(CATEGORIES[cat_id]["keywords"], cat_id)
+
+    def iter_categories(self, cat_ids: List[str], cancel: threading.Event = None,
+                        workers: int = None) -> Iterator[Tuple[str, List[Dict]]]:
+        """Fetch categories on a thread pool, yielding (cat_id, projects) as each one completes.
+
+        Categories start in the given order, at most SCAN_CONFIG["crawl_workers"]
+        at a time; the rate-limit governor paces the requests themselves.
+        Setting cancel (then governor.wake()) aborts budget waits, drops
+        categories not yet started and ends the iteration.
+        """
+        cancel = cancel or threading.Event()
+        workers = max(1, min(workers or SCAN_CONFIG["crawl_workers"], len(cat_ids)))
+
+        def fetch(cat_id: str) -> List[Dict]:
+            if cancel.is_set():
+                return []
+            with governor.cancel_on(cancel):
+                return self.fetch_category(cat_id)
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl")
+        futures = {executor.submit(fetch, cat_id): cat_id for cat_id in cat_ids}
+        try:
+            for future in as_completed(futures):
+                if cancel.is_set():
+                    break
+                try:
+                    projects = future.result()
+                except Exception as e:
+                    print(f"[Crawler] Error crawling category '{futures[future]}': {e}")
+                    projects = []
+                yield futures[future], projects
+        finally:
+            # 不等待进行中的请求 (最多一个请求超时)，未开始的分类直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def crawl_all_categories(self, db, cancel: threading.Event = None) -> Dict:
+        """爬取所有分类 (并行获取，结果到达即写入数据库)"""
         results = {}
+        db.load_fingerprints()
+        http_before = http_cache.stats()
         
-        for cat_id, cat_config in CATEGORIES.items():
-            print(f"[Crawler] Scanning category: {cat_config['name']}")
-            
-            if cat_id == "trending":
-                projects = self.get_trending()
-            elif cat_id == "new_releases":
-                projects = self.get_new_releases()
-            else:
-                projects = self.search_by_keywords(cat_config["keywords"], cat_id)
+        for cat_id, projects in self.iter_categories(list(CATEGORIES), cancel):
+            cat_config = CATEGORIES[cat_id]
             
-            # 存入数据库
+            # 存入数据库 (批量 upsert)
             new_count = 0
-            for project in projects:
-                db.upsert_project(project)
-                new_count += 1
+            if projects:
+                write = db.upsert_projects(projects)
+                new_count = write["written"]
+                print(f"[Crawler] {write['written']} written, {write['skipped']} unchanged")
             
             db.log_scan(cat_id, len(projects), new_count, "success")
             results[cat_id] = len(projects)
             print(f"[Crawler] Found {len(projects)} projects in {cat_config['name']}")
         
+        db.drop_fingerprints()
+        print(f"[Crawler] HTTP cache: {http_cache.delta(http_before)}")
         return results
     
     def crawl_external_page(self, url: str) -> List[Dict]:
@@ -371,7 +564,7 @@ class CrawlerAgent:
         projects = []
         try:
             # 简单请求网页
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = http_client.get(url, headers=self.headers, timeout=15)
             if response.status_code != 200:
                 print(f"[Crawler] Failed to load {url}: {response.status_code}")
                 return []
@@ -1,38 +1,83 @@
-# GitHub Hub - Database Layer (Supabase PostgreSQL)
+# GitHub Hub - Database Layer (Supabase PostgreSQL / local SQLite)
+import atexit
+import hashlib
 import json
 import threading
-from datetime import datetime
-from typing import Optional, List, Dict
-from supabase import create_client, Client
-from .config import SUPABASE_URL, SUPABASE_KEY
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Iterator
+from .config import DB_CONFIG, CACHE_CONFIG, SEARCH_CONFIG, ANALYSIS_CONFIG
+from .cache import TTLCache, NullCache
+from .storage import StorageBackend, CONTENT_FIELDS, GROWTH_COLUMNS, create_backend
+from .content_store import ContentStore
+from .search_index import SearchIndex, build_index
+from .growth import compute_growth
+
+# 命名列投影: 列表页只取卡片需要的轻量字段，详情页才加载教程等大文本
+PROJECTIONS = {
+    "card": ("id,name,full_name,category,stars,forks,description,url,homepage,language,topics,"
+             "ai_summary,ai_rag_summary,ai_difficulty,ai_model_name,screenshot,has_tutorial,"
+             "last_scanned,last_analyzed,stars_growth_7d,stars_acceleration"),
+    "detail": "*",
+}
+
+# 参与内容指纹的字段: 这些字段都没变时扫描只需刷新 last_scanned
+# (updated_at 随每次 star/push 变化，不计入指纹)
+FINGERPRINT_FIELDS = ("name", "full_name", "category", "stars", "forks", "description",
+                      "url", "homepage", "language", "topics", "created_at")
 
 class Database:
-    """Database layer using Supabase PostgreSQL"""
-    
-    def __init__(self, db_path: str = None):
-        """Initialize Supabase client. db_path is ignored (legacy compat)."""
-        self.lock = threading.RLock()  # Keep for thread safety
-        try:
-            self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-            print(f"Connected to Supabase: {SUPABASE_URL}")
-        except Exception as e:
-            print(f"Error connecting to Supabase: {e}")
-            self.supabase = None
+    """Database layer: caching, write buffering and search over a storage backend"""
     
-    def _ensure_client(self):
-        """Check if Supabase client is available"""
-        if not self.supabase:
-            raise Exception("Supabase client not initialized")
+    def __init__(self, db_path: str = None, cache: TTLCache = None,
+                 backend: StorageBackend = None):
+        """Open the configured storage backend.
+        
+        db_path: use the local SQLite backend at this path; otherwise
+        DB_BACKEND decides ("supabase" or "sqlite" at DATABASE_PATH).
+        cache: read-through cache for hot reads; defaults to a TTLCache built
+        from CACHE_CONFIG (NullCache when disabled).
+        """
+        if backend is None:
+            backend = create_backend("sqlite" if db_path else None, db_path)
+        self.backend = backend
+        # 教程/README 等大文本存放在独立的 content store，列表查询不会读取
+        self.content = ContentStore(backend)
+        if cache is None:
+            cache = TTLCache(CACHE_CONFIG["ttl_seconds"], CACHE_CONFIG["max_entries"],
+                             CACHE_CONFIG["max_bytes"]) if CACHE_CONFIG["enabled"] else NullCache()
+        self.cache = cache
+        
+        # Write-behind buffer: project_id -> merged pending fields
+        self._pending_updates: Dict[str, dict] = {}
+        self._pending_completions: Dict[str, str] = {}  # project_id -> worker (job done after patch lands)
+        self._pending_since: Optional[float] = None
+        self._buffer_lock = threading.Lock()
+        # 串行化整次刷新 (交换 -> 写入 -> 标记完成)，防止旧快照覆盖新值
+        self._flush_lock = threading.RLock()
+        self._buffer_depth = 0
+        # 后台刷新线程与 atexit 钩子在首次缓冲写入时才启动，close() 时停止
+        self._flusher: Optional[threading.Thread] = None
+        self._flush_stop = threading.Event()
+        
+        # id -> content_fingerprint, loaded in bulk at scan start (None = not loaded)
+        self._fingerprints: Optional[Dict[str, str]] = None
+        
+        # Local search index (built lazily on first search, kept in sync by writes)
+        self.search_index: Optional[SearchIndex] = None
+        self._index_built_at = 0.0
+        self._index_lock = threading.Lock()
+        self._index_rebuilding = False
+        # 重建期间的索引写入记在日志里，交换前重放到新索引上 (否则会随旧索引一起丢失)
+        self._index_journal: Optional[List[tuple]] = None
+        self._journal_lock = threading.Lock()
     
     # ========== Projects ==========
     
-    def upsert_project(self, project: dict):
-        """Insert or update a project"""
-        self._ensure_client()
-        now = datetime.now().isoformat()
-        
-        # Prepare data for PostgreSQL
-        data = {
+    def _project_row(self, project: dict, now: str) -> dict:
+        """Map a crawler project dict to a projects table row"""
+        row = {
             "id": str(project['id']),
             "name": project['name'],
             "full_name": project['full_name'],
@@ -43,44 +88,275 @@ class Database:
             "url": project.get('url'),
             "homepage": project.get('homepage'),
             "language": project.get('language'),
-            "topics": project.get('topics', []),  # JSONB in PostgreSQL
+            "topics": project.get('topics', []),  # JSONB in PostgreSQL, JSON text in SQLite
             "created_at": project.get('created_at'),
             "updated_at": project.get('updated_at'),
             "last_scanned": now,
         }
+        row["content_fingerprint"] = self._fingerprint(row)
+        return row
+    
+    @staticmethod
+    def _fingerprint(row: dict) -> str:
+        """Stable hash of the crawled content fields of a row"""
+        payload = json.dumps([row.get(f) for f in FINGERPRINT_FIELDS],
+                             ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def load_fingerprints(self, filters: Dict = None) -> int:
+        """Load id -> content_fingerprint in bulk (call at scan start).
         
-        with self.lock:
-            self.supabase.table("projects").upsert(data).execute()
-    
-    def get_all_projects(self) -> List[Dict]:
-        """Get all projects"""
-        self._ensure_client()
-        response = self.supabase.table("projects").select("*").execute()
-        return [dict(row) for row in response.data]
-    
-    def get_projects_by_category(self, category: str, limit: int = 100) -> List[Dict]:
-        """Get projects by category"""
-        self._ensure_client()
-        response = self.supabase.table("projects").select("*").eq("category", category).limit(limit).execute()
-        return [dict(row) for row in response.data]
-    
-    def get_project(self, project_id: str) -> Optional[Dict]:
-        """Get single project by ID"""
-        self._ensure_client()
-        response = self.supabase.table("projects").select("*").eq("id", str(project_id)).execute()
-        if response.data:
-            return dict(response.data[0])
-        return None
+        While loaded, upsert_projects only sends rows whose fingerprint
+        changed and bumps last_scanned for the rest.
+        """
+        fingerprints = {}
+        for row in self.iter_projects(columns="id,content_fingerprint", filters=filters):
+            fingerprints[str(row["id"])] = row.get("content_fingerprint")
+        self._fingerprints = fingerprints
+        print(f"[DB] Loaded {len(fingerprints)} content fingerprints")
+        return len(fingerprints)
+    
+    def drop_fingerprints(self):
+        """Forget the fingerprint map (scan finished; every upsert writes again)"""
+        self._fingerprints = None
+    
+    def touch_projects(self, project_ids: List[str], now: str = None, chunk_size: int = None):
+        """Bump last_scanned for unchanged rows with chunked UPDATE ... WHERE id IN (...)"""
+        if not project_ids:
+            return
+        now = now or datetime.now().isoformat()
+        chunk_size = chunk_size or DB_CONFIG["upsert_chunk_size"]
+        for i in range(0, len(project_ids), chunk_size):
+            self.backend.update_projects(project_ids[i:i + chunk_size], {"last_scanned": now})
+    
+    def upsert_project(self, project: dict):
+        """Insert or update a project"""
+        data = self._project_row(project, datetime.now().isoformat())
+        self.backend.upsert_projects([data])
+        self._record_snapshots([data])
+        if self._fingerprints is not None:
+            self._fingerprints[data["id"]] = data["content_fingerprint"]
+        self._invalidate([data["id"]], [data["category"]])
+        self._index_rows([data])
+        self.enqueue_analysis([data["id"]])
+    
+    def upsert_projects(self, projects: List[dict], chunk_size: int = None) -> Dict:
+        """Insert or update many projects with chunked multi-row upserts.
+        
+        When fingerprints are loaded (load_fingerprints), unchanged rows are
+        skipped and only get a bulk last_scanned update.
+        
+        Returns {"rows": n, "written": w, "skipped": s,
+                 "chunks": [{"rows": k, "seconds": t}, ...], "queued": q}.
+        """
+        chunk_size = chunk_size or DB_CONFIG["upsert_chunk_size"]
+        now = datetime.now().isoformat()
+        
+        # 同一条 INSERT ... ON CONFLICT 不能重复更新同一行，按 id 去重 (后出现的覆盖)
+        rows = {}
+        for project in projects:
+            row = self._project_row(project, now)
+            rows[row["id"]] = row
+        rows = list(rows.values())
+        total = len(rows)
+        self._record_snapshots(rows)
+        
+        skipped = []
+        if self._fingerprints is not None:
+            changed = []
+            for row in rows:
+                if self._fingerprints.get(row["id"]) == row["content_fingerprint"]:
+                    skipped.append(row["id"])
+                else:
+                    changed.append(row)
+            rows = changed
+            self.touch_projects(skipped, now, chunk_size)
+        
+        stats = {"rows": total, "written": len(rows), "skipped": len(skipped), "chunks": []}
+        total_chunks = (len(rows) + chunk_size - 1) // chunk_size
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i:i + chunk_size]
+            start = time.perf_counter()
+            self.backend.upsert_projects(chunk)
+            elapsed = time.perf_counter() - start
+            stats["chunks"].append({"rows": len(chunk), "seconds": round(elapsed, 3)})
+            print(f"[DB] Upsert chunk {i // chunk_size + 1}/{total_chunks}: "
+                  f"{len(chunk)} rows in {elapsed * 1000:.0f} ms")
+            if self._fingerprints is not None:
+                self._fingerprints.update((row["id"], row["content_fingerprint"]) for row in chunk)
+        self._invalidate([row["id"] for row in rows], {row["category"] for row in rows})
+        self._index_rows(rows)
+        stats["queued"] = self.enqueue_analysis([row["id"] for row in rows])
+        return stats
+    
+    # ========== Star History ==========
+    
+    def _record_snapshots(self, rows: List[Dict]):
+        """Append one star_snapshots row per crawled project (captured at its last_scanned)"""
+        snapshots = [{"project_id": row["id"], "captured_at": row["last_scanned"],
+                      "stars": row.get("stars") or 0, "forks": row.get("forks") or 0} for row in rows]
+        try:
+            self.add_star_snapshots(snapshots)
+        except Exception as e:
+            print(f"[DB] Could not record star snapshots: {e}")
+    
+    def add_star_snapshots(self, snapshots: List[Dict]) -> int:
+        """Bulk-append {project_id, captured_at, stars, forks} rows (existing ones are kept)"""
+        chunk_size = DB_CONFIG["upsert_chunk_size"] * 5
+        for i in range(0, len(snapshots), chunk_size):
+            self.backend.insert_star_snapshots(snapshots[i:i + chunk_size])
+        return len(snapshots)
+    
+    def iter_star_snapshots(self, since: str, batch_size: int = 5000) -> Iterator[tuple]:
+        """Stream (project_id, captured_at, stars) captured at or after since"""
+        after = None
+        while True:
+            rows = self.backend.select_star_snapshots(since, after=after, limit=batch_size)
+            for row in rows:
+                yield row["project_id"], row["captured_at"], row["stars"]
+            if len(rows) < batch_size:
+                break
+            after = (rows[-1]["project_id"], rows[-1]["captured_at"])
+    
+    def update_growth(self, history_days: int = None) -> Dict:
+        """Recompute 1d/7d/30d star growth and acceleration for every project in one pass.
+        
+        Returns {"projects": n, "seconds": t}.
+        """
+        start = time.perf_counter()
+        history_days = history_days or DB_CONFIG["growth_history_days"]
+        since = (datetime.now() - timedelta(days=history_days)).isoformat()
+        growth = compute_growth(self.iter_star_snapshots(since))
+        
+        now = datetime.now().isoformat()
+        patches = {pid: dict(fields, growth_updated_at=now) for pid, fields in growth.items()}
+        chunk_size = DB_CONFIG["upsert_chunk_size"]
+        items = list(patches.items())
+        for i in range(0, len(items), chunk_size):
+            self.backend.patch_projects(dict(items[i:i + chunk_size]))
+        # 增长字段出现在列表/详情/排行榜等几乎所有缓存读中，直接整体失效
+        self.cache.clear()
+        elapsed = time.perf_counter() - start
+        print(f"[DB] Star growth updated for {len(patches)} projects in {elapsed:.2f}s")
+        return {"projects": len(patches), "seconds": round(elapsed, 3)}
+    
+    def get_rising_projects(self, window: str = "7d", limit: int = 50, category: str = None,
+                            projection: str = "card") -> List[Dict]:
+        """Fastest-growing projects by star growth over window ("1d", "7d", "30d", "acceleration")"""
+        column = GROWTH_COLUMNS[window]
+        
+        def load():
+            return self.backend.rising_projects(column, limit, category, self._columns(projection))
+        
+        rows = self.cache.get_or_load(
+            f"rising:{window}:{category}:{limit}:{projection}", load,
+            tags=lambda rows: ["stats"] + [f"project:{row['id']}" for row in rows])
+        return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _columns(projection: str) -> str:
+        """Resolve a named projection ("card", "detail") or pass a raw column list through"""
+        return PROJECTIONS.get(projection, projection)
+    
+    def get_all_projects(self, projection: str = "detail") -> List[Dict]:
+        """Get all projects (paged, so it is not truncated at the PostgREST row cap)"""
+        return list(self.iter_projects(columns=projection))
+    
+    def iter_projects(self, batch_size: int = None, columns: str = "detail",
+                      filters: Dict = None, with_content: bool = False) -> Iterator[Dict]:
+        """Stream projects in primary-key order, one page in memory at a time.
+        
+        Uses keyset pagination (id > last_id) so every page is an index range
+        scan. filters maps column -> value (eq) or column -> list (in).
+        with_content fills the requested large text fields (ai_tutorial,
+        readme_content, ai_visual_summary) from the content store, one query
+        per page; export and archive use it so those fields keep their data.
+        """
+        batch_size = batch_size or DB_CONFIG["page_size"]
+        columns = self._columns(columns)
+        if columns != "*" and "id" not in columns.split(","):
+            columns = "id," + columns
+        content_fields = {}
+        if with_content:
+            content_fields = {field: kind for field, kind in CONTENT_FIELDS.items()
+                              if columns == "*" or field in columns.split(",")}
+        
+        last_id = None
+        while True:
+            rows = self.backend.select_projects(columns, filters, limit=batch_size,
+                                                after_id=last_id, order_by_id=True)
+            if content_fields and rows:
+                self._hydrate_content(rows, content_fields)
+            
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1]["id"]
+    
+    def get_projects_by_category(self, category: str, limit: int = 100,
+                                 projection: str = "detail") -> List[Dict]:
+        """Get projects by category (cached; tagged with every project id it contains)"""
+        def load():
+            return self.backend.select_projects(self._columns(projection), {"category": category},
+                                                limit=limit)
+        
+        rows = self.cache.get_or_load(
+            f"category:{category}:{limit}:{projection}", load,
+            tags=lambda rows: [f"category:{category}"] + [f"project:{row['id']}" for row in rows])
+        return [dict(row) for row in rows]
+    
+    def get_project(self, project_id: str, projection: str = "detail") -> Optional[Dict]:
+        """Get single project by ID (cached)"""
+        project_id = str(project_id)
+        
+        def load():
+            rows = self.backend.select_projects(self._columns(projection), {"id": project_id}, limit=1)
+            return rows[0] if rows else None
+        
+        cached = self.cache.get_or_load(f"project:{project_id}:{projection}", load,
+                                        tags=lambda _: [f"project:{project_id}"])
+        if cached is None:
+            return None
+        project = dict(cached)
+        # 叠加写缓冲中尚未刷新的字段，保证读到自己的写入
+        with self._buffer_lock:
+            project.update(self._pending_updates.get(project_id, {}))
+        if projection == "detail":
+            project.update(self._load_content(project_id))
+        return project
+    
+    def _load_content(self, project_id: str) -> Dict[str, str]:
+        """Large text fields of one project from the content store (cached)"""
+        fields = {kind: field for field, kind in CONTENT_FIELDS.items()}
+        bodies = self.cache.get_or_load(f"content:{project_id}", lambda: self.content.get_many(project_id),
+                                        tags=lambda _: [f"content:{project_id}"])
+        return {fields[kind]: body for kind, body in bodies.items() if kind in fields}
+    
+    def _hydrate_content(self, rows: List[Dict], content_fields: Dict[str, str]):
+        """Fill content fields of a page of rows in place (inline legacy values are kept if not yet moved)"""
+        bodies = self.content.get_for_projects([str(row["id"]) for row in rows], list(content_fields.values()))
+        for row in rows:
+            stored = bodies.get(str(row["id"]), {})
+            for field, kind in content_fields.items():
+                if kind in stored:
+                    row[field] = stored[kind]
+    
+    def _put_content(self, project_id: str, kind: str, text: Optional[str]):
+        project_id = str(project_id)
+        self.content.put(project_id, kind, text)
+        self.cache.invalidate_tag(f"content:{project_id}")
     
     def delete_project(self, project_id: str):
         """Delete a project"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").delete().eq("id", str(project_id)).execute()
+        self.backend.delete_project(str(project_id))
+        if self._fingerprints is not None:
+            self._fingerprints.pop(str(project_id), None)
+        self._invalidate([str(project_id)])
+        self._index_write("remove", str(project_id))
     
     def update_project_analysis(self, project_id: str, analysis: dict):
         """Update AI analysis fields"""
-        self._ensure_client()
         now = datetime.now().isoformat()
         
         update_data = {
@@ -92,224 +368,467 @@ class Database:
             "ai_model_name": analysis.get('model_name'),  # Store which model did the analysis
             "last_analyzed": now
         }
-        
-        with self.lock:
-            self.supabase.table("projects").update(update_data).eq("id", str(project_id)).execute()
+        self._patch_project(project_id, update_data)
             
     def update_ai_analysis(self, project_id: str, analysis: dict):
         """Alias for backward compatibility"""
         self.update_project_analysis(project_id, analysis)
     
     def update_project_tutorial(self, project_id: str, tutorial: str):
-        """Update tutorial content"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"ai_tutorial": tutorial}).eq("id", str(project_id)).execute()
+        """Update tutorial content (the body goes to the content store; the row keeps has_tutorial)"""
+        self._put_content(project_id, "tutorial", tutorial)
+        # ai_tutorial 置空: 清除旧版行内副本。正文已直接写入，标志也不经写缓冲，
+        # 否则刷新失败时行上仍是 has_tutorial = 0
+        self._patch_project(project_id, {"ai_tutorial": None, "has_tutorial": bool(tutorial)}, buffer=False)
+    
+    def update_project_readme(self, project_id: str, readme: str):
+        """Store the fetched README in the content store (skipped when unchanged)"""
+        self._put_content(project_id, "readme", readme)
     
     def update_project_rag_summary(self, project_id: str, summary: str):
         """Update RAG summary"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"ai_rag_summary": summary}).eq("id", str(project_id)).execute()
+        self._patch_project(project_id, {"ai_rag_summary": summary})
     
     def update_project_screenshot(self, project_id: str, screenshot_path: str):
         """Update screenshot path"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"screenshot": screenshot_path}).eq("id", str(project_id)).execute()
+        self._patch_project(project_id, {"screenshot": screenshot_path})
     
     def update_project_visual_summary(self, project_id: str, summary: str):
-        """Update visual summary"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"ai_visual_summary": summary}).eq("id", str(project_id)).execute()
+        """Update visual summary (stored in the content store)"""
+        self._put_content(project_id, "visual_summary", summary)
+        self._patch_project(project_id, {"ai_visual_summary": None})
+    
+    # ========== Write-behind Buffer ==========
+    
+    @contextmanager
+    def write_buffer(self):
+        """Coalesce update_project_* calls into one patch per project.
+        
+        Inside the block, field updates are merged per project id and flushed
+        when DB_CONFIG thresholds are hit, and always when the block exits.
+        """
+        with self._buffer_lock:
+            self._buffer_depth += 1
+        try:
+            yield self
+        finally:
+            with self._buffer_lock:
+                self._buffer_depth -= 1
+            self.flush_updates()
+    
+    def _patch_project(self, project_id: str, fields: dict, buffer: bool = True):
+        """Apply a partial update now, or merge it into the write buffer (unless buffer=False).
+        
+        Replicas see the change through projects.row_updated_at, which the
+        store's trigger sets when the patch is actually written.
+        """
+        project_id = str(project_id)
+        fields = dict(fields)
+        self._index_write("update", project_id, dict(fields))
+        with self._buffer_lock:
+            buffered = buffer and self._buffer_depth > 0
+            if buffered:
+                self._pending_updates.setdefault(project_id, {}).update(fields)
+                if self._pending_since is None:
+                    self._pending_since = time.monotonic()
+                if self._flusher is None:
+                    self._start_flusher()
+                full = len(self._pending_updates) >= DB_CONFIG["write_buffer_max_projects"]
+        
+        if not buffered:
+            self.backend.patch_projects({project_id: fields})
+            self._invalidate([project_id])
+        elif full:
+            self.flush_updates()
+    
+    def _start_flusher(self):
+        """Start the age-based flush thread (caller holds _buffer_lock)"""
+        self._flush_stop.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="db-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush_updates)
+    
+    def _stop_flusher(self):
+        with self._buffer_lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is None:
+            return
+        self._flush_stop.set()
+        if flusher is not threading.current_thread():
+            flusher.join(timeout=5)
+        atexit.unregister(self.flush_updates)
+    
+    def _flush_loop(self):
+        """后台线程：缓冲滞留超过 write_buffer_max_age 时刷新"""
+        while not self._flush_stop.wait(1):
+            with self._buffer_lock:
+                since = self._pending_since
+            if since is not None and time.monotonic() - since >= DB_CONFIG["write_buffer_max_age"]:
+                self.flush_updates()
+    
+    def flush_updates(self) -> int:
+        """Write all buffered patches, then mark their analysis jobs done.
+        
+        Returns the number of projects flushed.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                pending = self._pending_updates
+                completions = self._pending_completions
+                self._pending_updates = {}
+                self._pending_completions = {}
+                self._pending_since = None
+            if not pending and not completions:
+                return 0
+            
+            try:
+                if pending:
+                    self.backend.patch_projects(pending)
+            except Exception as e:
+                # 写入失败时放回缓冲区 (较新的字段优先)，避免丢失
+                print(f"[DB] Flush failed, keeping {len(pending)} patches buffered: {e}")
+                with self._buffer_lock:
+                    for pid, fields in pending.items():
+                        merged = dict(fields)
+                        merged.update(self._pending_updates.get(pid, {}))
+                        self._pending_updates[pid] = merged
+                    for pid, worker in completions.items():
+                        self._pending_completions.setdefault(pid, worker)
+                    if self._pending_since is None:
+                        self._pending_since = time.monotonic()
+                return 0
+            
+            self._invalidate(pending.keys())
+            # 字段写入成功后才把任务标记为完成；进程在此之前退出则租约过期后重新分析
+            workers: Dict[str, List[str]] = {}
+            for pid, worker in completions.items():
+                workers.setdefault(worker, []).append(pid)
+            for worker, project_ids in workers.items():
+                self._complete_jobs(project_ids, worker)
+            return len(pending)
+    
+    def close(self):
+        """Stop the flush thread, flush buffered writes, then release the backend's connections"""
+        self._stop_flusher()
+        self.flush_updates()
+        self.backend.close()
+    
+    def clear_database(self):
+        """Remove all projects, queued jobs and scan history (settings and news sources are kept)"""
+        with self._buffer_lock:
+            self._pending_updates = {}
+            self._pending_completions = {}
+            self._pending_since = None
+        self.backend.clear()
+        self.cache.clear()
+        if self._fingerprints is not None:
+            self._fingerprints = {}
+        self.search_index = None
+    
+    def project_exists(self, project_id: str) -> bool:
+        """Check whether a project id is already stored"""
+        return self.get_project(project_id, projection="id") is not None
+    
+    # ========== Analysis Queue ==========
+    
+    def enqueue_analysis(self, project_ids: List[str], target_model: str = None) -> int:
+        """Queue analysis jobs for projects not yet analyzed by the target model.
+        
+        Already-queued projects are left alone. Returns the number of new jobs.
+        """
+        if not project_ids:
+            return 0
+        target_model = target_model or ANALYSIS_CONFIG["target_model"]
+        try:
+            queued = self.backend.enqueue_analysis_jobs([str(pid) for pid in project_ids], target_model)
+        except Exception as e:
+            print(f"[DB] Could not enqueue analysis jobs: {e}")
+            return 0
+        self.cache.invalidate_tag("stats")
+        return queued or 0
+    
+    def claim_analysis_jobs(self, worker_id: str, limit: int = None,
+                            lease_seconds: int = None) -> List[Dict]:
+        """Atomically lease up to limit queued jobs for worker_id and return their projects.
+        
+        Two workers never receive the same project while its lease is live;
+        a job whose lease expired max_attempts times is marked failed.
+        """
+        try:
+            if lease_seconds is None:
+                lease_seconds = ANALYSIS_CONFIG["lease_seconds"]
+            claimed = self.backend.claim_analysis_jobs(worker_id, limit or ANALYSIS_CONFIG["claim_batch"],
+                                                       lease_seconds, ANALYSIS_CONFIG["max_attempts"])
+        except Exception as e:
+            # 队列未部署时退化为旧的扫描方式 (不保证多个 worker 互斥)
+            print(f"[DB] analysis_jobs queue unavailable, scanning for pending projects: {e}")
+            return self.get_projects_needing_analysis(limit=limit or ANALYSIS_CONFIG["claim_batch"])
+        self.cache.invalidate_tag("stats")
+        return claimed
+    
+    def complete_analysis_job(self, project_id: str, worker_id: str):
+        """Mark a leased job done (deferred until buffered patches are flushed)"""
+        with self._buffer_lock:
+            if self._buffer_depth > 0:
+                self._pending_completions[str(project_id)] = worker_id
+                return
+        self._complete_jobs([str(project_id)], worker_id)
+    
+    def fail_analysis_job(self, project_id: str, worker_id: str, error: str = None):
+        """Return a leased job to the queue, or mark it failed after max_attempts"""
+        try:
+            self.backend.fail_analysis_job(str(project_id), worker_id, (error or "")[:1000],
+                                           ANALYSIS_CONFIG["max_attempts"])
+        except Exception as e:
+            print(f"[DB] Could not release analysis job {project_id}: {e}")
+        self.cache.invalidate_tag("stats")
+    
+    def release_analysis_jobs(self, project_ids: List[str], worker_id: str):
+        """Give unfinished leases back (e.g. when a task is stopped)"""
+        if not project_ids:
+            return
+        try:
+            self.backend.set_jobs_status([str(pid) for pid in project_ids], worker_id, "pending")
+        except Exception as e:
+            print(f"[DB] Could not release analysis jobs: {e}")
+        self.cache.invalidate_tag("stats")
+    
+    def _complete_jobs(self, project_ids: List[str], worker_id: str):
+        try:
+            self.backend.set_jobs_status(project_ids, worker_id, "done")
+        except Exception as e:
+            print(f"[DB] Could not complete analysis jobs: {e}")
+        self.cache.invalidate_tag("stats")
     
     def get_projects_needing_analysis(self, limit: int = 10, target_model: str = "120b") -> List[Dict]:
         """
-        Get projects that need analysis.
+        Get projects that need analysis (legacy scan; prefer claim_analysis_jobs).
         Prioritizes projects that have NO analysis or analysis from a different model.
         """
-        self._ensure_client()
-        
-        # 1. First, try to get completely unanalyzed projects
-        response = self.supabase.table("projects").select("*").is_("ai_summary", "null").limit(limit).execute()
-        pending = [dict(row) for row in response.data]
-        
-        # 2. If we still have room, get projects that haven't been analyzed by the target_model
-        if len(pending) < limit:
-            remaining = limit - len(pending)
-            # Use 'not ilike' if possible, or just fetch and filter locally for simplicity since limit is small
-            # Supabase doesn't have a direct 'not ilike' in the basic client wrapper sometimes, 
-            # let's just fetch projects that have a summary but NO model name, or model name != target_model
-            response = self.supabase.table("projects").select("*")\
-                .not_.is_("ai_summary", "null")\
-                .not_.ilike("ai_model_name", f"%{target_model}%")\
-                .limit(remaining).execute()
-            pending.extend([dict(row) for row in response.data])
-            
-        return pending
+        return self.backend.projects_needing_analysis(limit, target_model)
         
     def get_unanalyzed_projects(self, limit: int = 10) -> List[Dict]:
         """Alias for backward compatibility"""
         return self.get_projects_needing_analysis(limit=limit)
     
-    def search_projects(self, query: str) -> List[Dict]:
-        """Full-text search on projects"""
-        self._ensure_client()
-        # Use PostgreSQL ilike for basic search
-        response = self.supabase.table("projects").select("*").or_(
-            f"name.ilike.%{query}%,description.ilike.%{query}%,ai_rag_summary.ilike.%{query}%"
-        ).execute()
-        return [dict(row) for row in response.data]
+    def search_projects(self, query: str, limit: int = 20, offset: int = 0,
+                        projection: str = "detail") -> List[Dict]:
+        """Ranked full-text search (BM25F over name > topics > ai_summary > rag_summary > description).
+        
+        Chinese text is indexed as character bigrams, so mixed queries such as
+        "RAG 知识库" are answered from the index.
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+        
+        if SEARCH_CONFIG["enabled"]:
+            try:
+                index = self._ensure_search_index()
+                hits, _ = index.search(query, limit=limit, offset=offset)
+                if not hits:
+                    return []
+                ids = [doc_id for doc_id, _ in hits]
+                rows = self.backend.get_projects_by_ids(ids, self._columns(projection))
+                by_id = {str(row["id"]): row for row in rows}
+                return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+            except Exception as e:
+                print(f"[DB] Search index unavailable, falling back to ilike: {e}")
+        
+        # Fallback: backend substring scan (unranked)
+        return self.backend.search_projects(query, self._columns(projection), limit=limit, offset=offset)
+    
+    def _ensure_search_index(self) -> SearchIndex:
+        """Build the index on first use; refresh it in the background when stale"""
+        if self.search_index is None:
+            with self._index_lock:
+                if self.search_index is None:
+                    self.rebuild_search_index()
+        elif time.monotonic() - self._index_built_at > SEARCH_CONFIG["refresh_seconds"]:
+            with self._index_lock:
+                if not self._index_rebuilding:
+                    self._index_rebuilding = True
+                    threading.Thread(target=self.rebuild_search_index, daemon=True).start()
+        return self.search_index
+    
+    def rebuild_search_index(self) -> SearchIndex:
+        """Rebuild the search index from a paged scan of the projects table"""
+        start = time.perf_counter()
+        columns = "id," + ",".join(SEARCH_CONFIG["field_weights"])
+        with self._journal_lock:
+            self._index_journal = []
+        try:
+            index = build_index(self.iter_projects(columns=columns), SEARCH_CONFIG["field_weights"],
+                                k1=SEARCH_CONFIG["k1"], b=SEARCH_CONFIG["b"],
+                                tokenizer=SEARCH_CONFIG["tokenizer"])
+            with self._journal_lock:
+                # 扫描期间的写入可能未被读到: 按顺序重放 (幂等)，然后原子交换
+                for op, project_id, args in self._index_journal:
+                    getattr(index, op)(project_id, *args)
+                self.search_index = index
+        finally:
+            with self._journal_lock:
+                self._index_journal = None
+            self._index_rebuilding = False
+        self._index_built_at = time.monotonic()
+        print(f"[DB] Search index built: {len(index)} projects in {time.perf_counter() - start:.2f}s")
+        return index
+    
+    def _index_rows(self, rows: List[Dict]):
+        """Keep the search index in sync with upserted rows (ai_* fields are preserved)"""
+        for row in rows:
+            self._index_write("upsert", row["id"], row)
+    
+    def _index_write(self, op: str, project_id: str, *args):
+        """Apply upsert/update/remove to the live index, journaling it while a rebuild runs"""
+        with self._journal_lock:
+            if self._index_journal is not None:
+                self._index_journal.append((op, project_id, args))
+            index = self.search_index
+        if index is not None:
+            getattr(index, op)(project_id, *args)
     
     def get_pending_count(self) -> int:
         """Get count of projects pending analysis (lacking 120B analysis)"""
-        self._ensure_client()
-        # Strictly count those without 120b analysis
         try:
-            total_res = self.supabase.table("projects").select("id", count="exact").execute()
-            total = total_res.count or 0
-            
-            analyzed_res = self.supabase.table("projects").select("id", count="exact").ilike("ai_model_name", "%120b%").execute()
-            analyzed = analyzed_res.count or 0
-            
-            return max(0, total - analyzed)
+            return self.get_project_stats()["pending"]
         except Exception as e:
             print(f"Error getting pending count: {e}")
             return 0
     
     def get_tutorial(self, project_id: str) -> Optional[str]:
-        """Get tutorial for a project"""
-        project = self.get_project(project_id)
-        if project:
-            return project.get('ai_tutorial')
+        """Get tutorial for a project from the content store"""
+        project_id = str(project_id)
+        tutorial = self._load_content(project_id).get("ai_tutorial")
+        if tutorial:
+            return tutorial
+        # 旧数据: 正文仍在 projects 行内，读取时顺便迁移
+        project = self.get_project(project_id, projection="id," + ",".join(CONTENT_FIELDS))
+        if project and project.get("ai_tutorial"):
+            self._move_project_content(project)
+            return project["ai_tutorial"]
         return None
     
+    def _move_project_content(self, row: Dict):
+        bodies = {kind: row.get(field) for field, kind in CONTENT_FIELDS.items() if row.get(field)}
+        if not bodies:
+            return
+        self.content.put_many(row["id"], bodies)
+        self.cache.invalidate_tag(f"content:{row['id']}")
+        self._patch_project(row["id"], {field: None for field, kind in CONTENT_FIELDS.items() if kind in bodies})
+    
+    def move_inline_content(self) -> int:
+        """Move tutorials/READMEs/visual summaries still stored inline in projects to the content store"""
+        moved = 0
+        for row in self.iter_projects(columns="id," + ",".join(CONTENT_FIELDS)):
+            if any(row.get(field) for field in CONTENT_FIELDS):
+                self._move_project_content(row)
+                moved += 1
+        print(f"[DB] Moved inline content of {moved} projects to the content store")
+        return moved
+    
     def get_stats(self) -> Dict:
         """Get database statistics"""
-        self._ensure_client()
-        
-        # Total projects
-        total = 0
-        try:
-            total_response = self.supabase.table("projects").select("id", count="exact").execute()
-            total = total_response.count if total_response.count is not None else 0
-        except Exception as e:
-            print(f"Error getting total count: {e}")
-            
-        # Analyzed projects
-        analyzed = 0
-        try:
-            # Try to count only those analyzed by 120B model
-            analyzed_response = self.supabase.table("projects").select("id", count="exact")\
-                .ilike("ai_model_name", "%120b%").execute()
-            analyzed = analyzed_response.count if analyzed_response.count is not None else 0
-        except Exception as e:
-            # Fallback: Count any project with an ai_summary
-            print(f"Error getting 120B count (probably column missing): {e}")
-            try:
-                analyzed_response = self.supabase.table("projects").select("id", count="exact").not_.is_("ai_summary", "null").execute()
-                analyzed = analyzed_response.count if analyzed_response.count is not None else 0
-            except Exception as e2:
-                print(f"Error getting basic analyzed count: {e2}")
+        stats = self.get_project_stats()
+        return {
+            "total_projects": stats["total"],
+            "analyzed_projects": stats["analyzed"],
+            "pending_projects": stats["pending"],
+            "categories": len(stats["categories"])
+        }
+    
+    def get_project_stats(self, target_model: str = "120b") -> Dict:
+        """Totals, analyzed/pending counts and per-category counts in one call.
         
-        # Categories
-        cat_count = 0
-        try:
-            categories_response = self.supabase.table("projects").select("category").execute()
-            categories = list(set(row['category'] for row in categories_response.data))
-            cat_count = len(categories)
-        except Exception as e:
-            print(f"Error getting categories: {e}")
-            
+        Served from the read cache (every write invalidates it); on a miss it
+        is one project_stats() RPC round trip.
+        """
+        return self.cache.get_or_load(f"stats:{target_model}",
+                                      lambda: self._load_project_stats(target_model),
+                                      ttl=DB_CONFIG["stats_cache_ttl"], tags=lambda _: ["stats"])
+    
+    def _load_project_stats(self, target_model: str) -> Dict:
+        stats = self.backend.project_stats(target_model)
         return {
-            "total_projects": total,
-            "analyzed_projects": analyzed,
-            "categories": cat_count
+            "total": stats.get("total", 0),
+            "analyzed": stats.get("analyzed", 0),
+            "pending": stats.get("pending", 0),
+            "categories": stats.get("categories") or {},
         }
     
+    def _invalidate(self, project_ids=(), categories=()):
+        """Drop cached reads touched by a write (projects, their lists, and counters)"""
+        for project_id in project_ids:
+            self.cache.invalidate_tag(f"project:{project_id}")
+        for category in categories:
+            self.cache.invalidate_tag(f"category:{category}")
+        self.cache.invalidate_tag("stats")
+    
+    def cache_stats(self) -> Dict:
+        """Read cache hit/miss counters"""
+        return self.cache.stats()
+    
+    def storage_stats(self) -> Dict:
+        """Storage backend metrics (replica lag, read routing)"""
+        return self.backend.stats()
+    
     # ========== Scan History ==========
     
     def log_scan(self, category: str, found: int, new: int, status: str):
         """Log a scan event"""
-        self._ensure_client()
         data = {
             "category": category,
             "projects_found": found,
             "projects_new": new,
             "status": status
         }
-        with self.lock:
-            self.supabase.table("scan_history").insert(data).execute()
+        self.backend.insert_scan(data)
     
     def get_recent_scans(self, limit: int = 20) -> List[Dict]:
         """Get recent scan history"""
-        self._ensure_client()
-        response = self.supabase.table("scan_history").select("*").order("scan_time", desc=True).limit(limit).execute()
-        return [dict(row) for row in response.data]
+        return self.backend.recent_scans(limit)
     
     # ========== Settings ==========
     
     def get_setting(self, key: str, default: str = None) -> Optional[str]:
-        """Get a setting value"""
-        self._ensure_client()
-        response = self.supabase.table("settings").select("value").eq("key", key).execute()
-        if response.data:
-            return response.data[0]['value']
-        return default
+        """Get a setting value (cached)"""
+        def load():
+            # 缓存 "不存在" 也是有效结果，用列表包装避免 None 被当作未命中
+            return [self.backend.get_setting(key)]
+        
+        value = self.cache.get_or_load(f"setting:{key}", load, ttl=CACHE_CONFIG["settings_ttl"])[0]
+        return default if value is None else value
     
     def set_setting(self, key: str, value: str):
         """Set a setting value"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("settings").upsert({"key": key, "value": value}).execute()
+        self.backend.set_setting(key, value)
+        self.cache.invalidate(f"setting:{key}")
     
     # ========== News Sources ==========
     
     def get_news_sources(self) -> List[Dict]:
         """Get all news sources"""
-        self._ensure_client()
-        response = self.supabase.table("news_sources").select("*").execute()
-        return [dict(row) for row in response.data]
+        return self.backend.list_news_sources()
     
     def add_news_source(self, name: str, url: str):
         """Add a news source"""
-        self._ensure_client()
-        data = {
-            "name": name,
-            "url": url
-        }
-        with self.lock:
-            try:
-                self.supabase.table("news_sources").insert(data).execute()
-            except Exception as e:
-                print(f"Error adding news source (may already exist): {e}")
+        try:
+            self.backend.add_news_source(name, url)
+        except Exception as e:
+            print(f"Error adding news source (may already exist): {e}")
     
     def delete_news_source(self, source_id: int):
         """Delete a news source"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("news_sources").delete().eq("id", source_id).execute()
+        self.backend.delete_news_source(source_id)
     
     def update_news_source_scan_time(self, source_id: int):
         """Update last scan time for a news source"""
-        self._ensure_client()
-        with self.lock:
-            self.supabase.table("news_sources").update({"last_scanned": datetime.now().isoformat()}).eq("id", source_id).execute()
+        self.backend.touch_news_source(source_id, datetime.now().isoformat())
     
     def get_all_categories_summary(self) -> Dict:
         """Get summary of projects by category"""
-        self._ensure_client()
         try:
-            response = self.supabase.table("projects").select("category").execute()
-            
-            # Count projects per category
-            category_counts = {}
-            for row in response.data:
-                cat = row.get('category', 'other')
-                category_counts[cat] = category_counts.get(cat, 0) + 1
-            
-            return category_counts
+            return dict(self.get_project_stats()["categories"])
         except Exception as e:
             print(f"Error getting categories summary: {e}")
             return {}
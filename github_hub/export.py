@@ -0,0 +1,121 @@
+# GitHub Hub - 流式导出 (NDJSON 分块传输 / 可选 Parquet、Arrow 列式文件)
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List
+from .storage import JSON_COLUMNS, PROJECT_COLUMNS, parse_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+    print("Warning: pyarrow not found. Parquet/Arrow export is unavailable (pip install pyarrow).")
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", ".ndjson"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", ".arrow"),
+}
+
+INT_COLUMNS = ("stars", "forks", "ai_difficulty", "recent_stars_growth", "stars_growth_1d",
+               "stars_growth_7d", "stars_growth_30d", "stars_acceleration")
+
+
+def normalize(row: Dict) -> Dict:
+    """Decode JSON fields stored as text by legacy rows; lists are left as they are"""
+    for field in JSON_COLUMNS:
+        value = row.get(field)
+        if isinstance(value, str):
+            try:
+                row[field] = json.loads(value)
+            except ValueError:
+                row[field] = []
+    return row
+
+
+def iter_ndjson(rows: Iterable[Dict]) -> Iterator[bytes]:
+    """One JSON document per line; rows are encoded as they arrive"""
+    for row in rows:
+        yield (json.dumps(normalize(row), ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6, min_flush: int = 64 * 1024) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member without buffering it whole.
+
+    Output is flushed (Z_SYNC_FLUSH) every min_flush input bytes so the
+    client keeps receiving data during long exports.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip 头
+    pending = 0
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= min_flush:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def arrow_schema(columns: List[str]):
+    fields = []
+    for name in columns:
+        if name in INT_COLUMNS:
+            fields.append(pa.field(name, pa.int64()))
+        elif name == "has_tutorial":
+            fields.append(pa.field(name, pa.bool_()))
+        elif name in JSON_COLUMNS:
+            fields.append(pa.field(name, pa.list_(pa.string())))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def _arrow_value(name: str, value):
+    if value is None:
+        return None
+    if name in JSON_COLUMNS:
+        return [v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in value]
+    if name in INT_COLUMNS:
+        return int(value)
+    if name == "has_tutorial":
+        return bool(value)
+    return value if isinstance(value, str) else str(value)
+
+
+def write_columnar(rows: Iterable[Dict], path: str, columns: str = "*", fmt: str = "parquet",
+                   batch_size: int = 500) -> int:
+    """Write rows to a Parquet or Arrow IPC file one record batch at a time.
+
+    Columnar files need their footer written last, so they go to path
+    instead of being streamed; memory stays bounded by batch_size.
+    Returns the number of rows written.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow export (pip install pyarrow)")
+    names = [c for c in parse_columns(columns) if c in PROJECT_COLUMNS]
+    schema = arrow_schema(names)
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_file(path, schema)
+        write = writer.write_batch
+
+    count = 0
+    batch: Dict[str, list] = {name: [] for name in names}
+    try:
+        for row in rows:
+            row = normalize(row)
+            for name in names:
+                batch[name].append(_arrow_value(name, row.get(name)))
+            count += 1
+            if count % batch_size == 0:
+                write(pa.RecordBatch.from_pydict(batch, schema=schema))
+                batch = {name: [] for name in names}
+        if count % batch_size:
+            write(pa.RecordBatch.from_pydict(batch, schema=schema))
+    finally:
+        writer.close()
+    return count
@@ -0,0 +1,199 @@
+# GitHub Hub - GH Archive 离线导入 (用 WatchEvent 回填 star 历史，不消耗 GitHub API 配额)
+"""
+Usage:
+    python -m github_hub.gharchive data/gharchive/2024-01-*.json.gz --workers 8
+
+Hourly dumps come from https://www.gharchive.org/ (YYYY-MM-DD-H.json.gz).
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_DUMP_DAY = re.compile(r"(\d{4}-\d{2}-\d{2})-\d{1,2}\.json\.gz$")
+
+# worker 进程内的已跟踪仓库集合 (进程池 initializer 设置一次，避免每个任务重复序列化)
+_TRACKED: Optional[Set[str]] = None
+
+
+def _init_worker(tracked: Set[str]):
+    global _TRACKED
+    _TRACKED = tracked
+
+
+def count_watch_events(path: str, tracked: Set[str] = None) -> Tuple[Dict[Tuple[str, str], int], int]:
+    """Count WatchEvents per (repo full_name, day) in one hourly dump.
+
+    Streams the gzip file line by line; lines without "WatchEvent" are
+    skipped before JSON decoding, which is most of them. Only repos in
+    tracked (lower-cased full names) are counted. Returns (counts, lines).
+    """
+    tracked = tracked if tracked is not None else _TRACKED
+    counts: Dict[Tuple[str, str], int] = {}
+    lines = 0
+    try:
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                lines += 1
+                if b'"WatchEvent"' not in line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("type") != "WatchEvent":
+                    continue
+                name = ((event.get("repo") or {}).get("name") or "").lower()
+                if not name or (tracked is not None and name not in tracked):
+                    continue
+                key = (name, (event.get("created_at") or "")[:10])
+                counts[key] = counts.get(key, 0) + 1
+    except (OSError, EOFError) as e:
+        # 下载不完整的文件: 保留已读取部分
+        print(f"[GHArchive] {os.path.basename(path)} is truncated or unreadable after {lines} lines: {e}")
+    return counts, lines
+
+
+def _count_files(paths: List[str], tracked: Set[str], workers: int) -> Iterable[Tuple[Dict, int]]:
+    if workers <= 1 or len(paths) == 1:
+        for path in paths:
+            yield count_watch_events(path, tracked)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tracked,)) as executor:
+        yield from executor.map(count_watch_events, paths)
+
+
+def _end_of_day(day: str) -> str:
+    # GH Archive 按 UTC 切分小时文件，快照时间也用带时区的 UTC
+    return f"{day}T23:59:59+00:00"
+
+
+def range_end(paths: List[str], daily: Dict[str, Dict[str, int]]) -> Optional[str]:
+    """Last UTC day covered by the dumps (from YYYY-MM-DD-H.json.gz names, else the last event)"""
+    days = [m.group(1) for m in map(_DUMP_DAY.search, paths) if m]
+    if not days:
+        days = [day for counts in daily.values() for day in counts]
+    return max(days) if days else None
+
+
+def find_anchors(db, current: Dict[str, Tuple[str, int]], end_day: str,
+                 max_gap_days: float = 2) -> Dict[str, Tuple[str, int]]:
+    """Star count per repo at the end of the imported range: name -> (project_id, stars).
+
+    When the dumps reach the present (end_day is yesterday or today, UTC),
+    the live star count is the anchor. Otherwise each repo is anchored to
+    its earliest stored snapshot taken within max_gap_days after end_day;
+    repos without one are left out, since stars gained after the range
+    would otherwise be credited to the backfilled days.
+    """
+    end = date.fromisoformat(end_day)
+    if end >= datetime.now(timezone.utc).date() - timedelta(days=1):
+        return dict(current)
+
+    names = {project_id: name for name, (project_id, _) in current.items()}
+    start = datetime.combine(end + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc).timestamp()
+    limit = start + max_gap_days * 86400
+    earliest: Dict[str, Tuple[float, int]] = {}
+    for project_id, captured_at, stars in db.iter_star_snapshots(end_day):
+        name = names.get(project_id)
+        if name is None:
+            continue
+        # 旧的实时快照是本地时间的 naive ISO 字符串，fromisoformat 按本地时间解析
+        ts = datetime.fromisoformat(str(captured_at).replace("Z", "+00:00")).timestamp()
+        if start <= ts <= limit and (name not in earliest or ts < earliest[name][0]):
+            earliest[name] = (ts, stars or 0)
+    return {name: (current[name][0], stars) for name, (_, stars) in earliest.items()}
+
+
+def build_snapshots(daily: Dict[str, Dict[str, int]], anchors: Dict[str, Tuple[str, int]]) -> List[Dict]:
+    """Turn daily WatchEvent counts into end-of-day star snapshots.
+
+    Works backwards from each repo's anchor (its star count at the end of
+    the imported range, see find_anchors): stars at the end of day D are the
+    anchor minus the WatchEvents seen after D. Unstars are not in GH Archive,
+    so older values are a lower-bound estimate. One extra snapshot is written
+    for the day before the first event so growth over the whole imported
+    range has a baseline. Repos without an anchor are skipped.
+    """
+    snapshots = []
+    for name, days in daily.items():
+        if name not in anchors:
+            continue
+        project_id, stars = anchors[name]
+        after = 0
+        for day in sorted(days, reverse=True):
+            snapshots.append({"project_id": project_id, "captured_at": _end_of_day(day),
+                              "stars": max(stars - after, 0), "forks": None})
+            after += days[day]
+        first = date.fromisoformat(min(days)) - timedelta(days=1)
+        snapshots.append({"project_id": project_id, "captured_at": _end_of_day(first.isoformat()),
+                          "stars": max(stars - after, 0), "forks": None})
+    return snapshots
+
+
+def import_gharchive(db, paths: List[str], workers: int = None, update_growth: bool = True) -> Dict:
+    """Backfill star_snapshots for tracked projects from local GH Archive dumps"""
+    start = time.perf_counter()
+    paths = sorted(paths)
+    workers = workers or os.cpu_count() or 1
+
+    current = {}
+    for row in db.iter_projects(columns="id,full_name,stars"):
+        if row.get("full_name"):
+            current[row["full_name"].lower()] = (row["id"], row.get("stars") or 0)
+    print(f"[GHArchive] {len(paths)} files, {len(current)} tracked repos, {workers} worker(s)")
+
+    daily: Dict[str, Dict[str, int]] = {}
+    lines = events = 0
+    for done, (counts, n_lines) in enumerate(_count_files(paths, set(current), workers), 1):
+        lines += n_lines
+        for (name, day), n in counts.items():
+            days = daily.setdefault(name, {})
+            days[day] = days.get(day, 0) + n
+            events += n
+        if done % 24 == 0 or done == len(paths):
+            print(f"[GHArchive] {done}/{len(paths)} files, {lines} events scanned, {events} stars matched")
+
+    end_day = range_end(paths, daily)
+    anchors = find_anchors(db, {name: current[name] for name in daily}, end_day) if end_day else {}
+    unanchored = len(daily) - len(anchors)
+    if unanchored:
+        print(f"[GHArchive] {unanchored} repos have no snapshot shortly after {end_day}; "
+              f"import dumps up to today to backfill them")
+    snapshots = build_snapshots(daily, anchors)
+    db.add_star_snapshots(snapshots)
+    result = {"files": len(paths), "lines": lines, "watch_events": events, "repos": len(anchors),
+              "unanchored": unanchored, "range_end": end_day,
+              "snapshots": len(snapshots), "seconds": round(time.perf_counter() - start, 2)}
+    if update_growth and snapshots:
+        result["growth"] = db.update_growth()
+    print(f"[GHArchive] Imported {len(snapshots)} snapshots for {len(anchors)} repos in {result['seconds']}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill star history from GH Archive hourly dumps")
+    parser.add_argument("paths", nargs="+", help="*.json.gz files or glob patterns")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--db", default=None, help="use a local SQLite database at this path")
+    parser.add_argument("--no-growth", action="store_true", help="skip recomputing growth columns")
+    args = parser.parse_args()
+
+    from .database import Database
+    paths = [p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])]
+    db = Database(args.db)
+    try:
+        import_gharchive(db, paths, workers=args.workers, update_growth=not args.no_growth)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
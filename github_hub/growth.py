@@ -0,0 +1,100 @@
+# GitHub Hub - Star 增长计算 (基于 star_snapshots 时间序列)
+import bisect
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    print("Warning: NumPy not found. Growth computation falls back to pure Python.")
+
+DAY = 86400.0
+
+# 统计窗口 (天)；14 天只用于计算加速度
+HORIZONS = {"1d": 1, "7d": 7, "14d": 14, "30d": 30}
+
+
+def _epoch(ts) -> float:
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    return datetime.fromisoformat(str(ts).replace("Z", "+00:00")).timestamp()
+
+
+def compute_growth(snapshots: Iterable[Tuple[str, object, int]]) -> Dict[str, Dict]:
+    """Star growth per project from (project_id, captured_at, stars) snapshots.
+
+    For each project, growth over N days is latest stars minus the stars of
+    the last snapshot taken at least N days before the latest one (or the
+    earliest snapshot when the history is shorter). Acceleration is this
+    week's growth minus last week's: g7 - (g14 - g7).
+    """
+    ids: Dict[str, int] = {}
+    pids, times, stars = [], [], []
+    for project_id, captured_at, count in snapshots:
+        pids.append(ids.setdefault(project_id, len(ids)))
+        times.append(_epoch(captured_at))
+        stars.append(int(count or 0))
+    if not pids:
+        return {}
+    names = list(ids)
+    if np is not None:
+        growth = _growth_numpy(pids, times, stars)
+    else:
+        growth = _growth_python(pids, times, stars)
+    return {names[idx]: fields for idx, fields in growth.items()}
+
+
+def _result(g: Dict[str, int]) -> Dict:
+    return {
+        "stars_growth_1d": g["1d"],
+        "stars_growth_7d": g["7d"],
+        "stars_growth_30d": g["30d"],
+        "stars_acceleration": 2 * g["7d"] - g["14d"],
+        "recent_stars_growth": g["7d"],
+    }
+
+
+def _growth_numpy(pids: List[int], times: List[float], stars: List[int]) -> Dict[int, Dict]:
+    pid = np.asarray(pids, dtype=np.int64)
+    t = np.asarray(times, dtype=np.float64)
+    s = np.asarray(stars, dtype=np.int64)
+    order = np.lexsort((t, pid))
+    pid, t, s = pid[order], t[order], s[order]
+
+    # 每个项目在排序后数组中的 [start, end] 区间
+    ends = np.flatnonzero(np.diff(pid) != 0)
+    starts = np.concatenate(([0], ends + 1))
+    ends = np.concatenate((ends, [len(pid) - 1]))
+    latest_t, latest_s = t[ends], s[ends]
+
+    # (项目, 时间) 合成单调键，一次 searchsorted 找到每个项目各窗口的基准快照
+    t0 = t.min()
+    span = t.max() - t0 + 2 * HORIZONS["30d"] * DAY
+    key = pid * span + (t - t0)
+    growth = {}
+    for label, days in HORIZONS.items():
+        target = pid[ends] * span + (latest_t - days * DAY - t0)
+        pos = np.searchsorted(key, target, side="right") - 1
+        pos = np.maximum(pos, starts)
+        growth[label] = (latest_s - s[pos]).tolist()
+
+    return {int(p): _result({label: values[i] for label, values in growth.items()})
+            for i, p in enumerate(pid[ends].tolist())}
+
+
+def _growth_python(pids: List[int], times: List[float], stars: List[int]) -> Dict[int, Dict]:
+    series: Dict[int, List[Tuple[float, int]]] = {}
+    for p, ts, count in zip(pids, times, stars):
+        series.setdefault(p, []).append((ts, count))
+    results = {}
+    for p, points in series.items():
+        points.sort()
+        stamps = [ts for ts, _ in points]
+        latest_t, latest_s = points[-1]
+        growth = {}
+        for label, days in HORIZONS.items():
+            pos = max(bisect.bisect_right(stamps, latest_t - days * DAY) - 1, 0)
+            growth[label] = latest_s - points[pos][1]
+        results[p] = _result(growth)
+    return results
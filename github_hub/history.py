@@ -0,0 +1,224 @@
+# GitHub Hub - 归档时间旅行查询 (按天的列式 .npy 索引，内存映射读取)
+import bisect
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+from .archive import ArchiveEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    print("Warning: NumPy not found. History queries (/api/history) are unavailable.")
+
+# 列式字段及其 dtype；-1 表示该项目当天不在数据集中
+NUMERIC_FIELDS = {"stars": "int32", "forks": "int32"}
+MISSING = -1
+
+# update() 在进程内串行执行；查询端共享只读实例，meta.json 变化后才重新加载
+_update_lock = threading.Lock()
+_open_lock = threading.Lock()
+_opened: Dict[str, tuple] = {}  # archive root -> (meta.json 签名, HistoryIndex)
+
+
+class HistoryIndex:
+    """Columnar index over the daily archives.
+
+    <archive>/_history/meta.json holds the indexed days and the global project
+    order (ids, full names, category codes); <archive>/_history/<day>/<field>.npy
+    holds one array per field aligned to that order. Projects are only ever
+    appended, so a day's arrays stay valid as the dataset grows and shorter
+    arrays are padded with MISSING on read. update() indexes new archive days
+    (and re-indexes the last one, which may have been re-archived); it is run
+    by the archiver, while readers use HistoryIndex.open() and never write.
+    """
+
+    def __init__(self, archive: ArchiveEngine = None, read_only: bool = False):
+        if np is None:
+            raise RuntimeError("NumPy is required for history queries (pip install numpy)")
+        self.archive = archive or ArchiveEngine()
+        self.root = os.path.join(self.archive.root, "_history")
+        self.read_only = read_only
+        self._columns: Dict[tuple, "np.ndarray"] = {}
+        self._load_meta()
+
+    @classmethod
+    def open(cls, archive: ArchiveEngine = None) -> "HistoryIndex":
+        """Shared read-only index for queries, reloaded only after update() rewrites meta.json"""
+        archive = archive or ArchiveEngine()
+        path = os.path.join(archive.root, "_history", "meta.json")
+        try:
+            st = os.stat(path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            signature = None
+        with _open_lock:
+            cached = _opened.get(archive.root)
+            if cached is None or cached[0] != signature:
+                cached = _opened[archive.root] = (signature, cls(archive, read_only=True))
+            return cached[1]
+
+    def _load_meta(self):
+        path = os.path.join(self.root, "meta.json")
+        meta = {"days": [], "ids": [], "full_names": [], "categories": [], "stamp": None}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+        self.days: List[str] = meta["days"]
+        self.ids: List[str] = meta["ids"]
+        self.full_names: List[str] = meta["full_names"]
+        self.categories: List[str] = meta["categories"]
+        self.stamp = meta.get("stamp")  # 最后索引日 _stats.json 的 mtime，用于判断是否需要更新
+        self.positions = {pid: i for i, pid in enumerate(self.ids)}
+        self._columns.clear()
+
+    def _save_meta(self):
+        path = os.path.join(self.root, "meta.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"days": self.days, "ids": self.ids, "full_names": self.full_names,
+                       "categories": self.categories, "stamp": self.stamp}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    # ---------- build ----------
+
+    def update(self) -> Dict:
+        """Index archive days not yet indexed. Returns {"indexed": [...], "projects": n}"""
+        if self.read_only:
+            raise RuntimeError("HistoryIndex opened read-only")
+        with _update_lock:
+            # 其他实例可能已更新过索引，以磁盘上的 meta 为准
+            self._load_meta()
+            return self._update()
+
+    def _update(self) -> Dict:
+        archived = self.archive.days()
+        if not archived:
+            return {"indexed": [], "projects": len(self.ids)}
+        stamp = self._stamp(archived[-1][0])
+        if self.days and self.days[-1] == archived[-1][0] and self.stamp == stamp:
+            return {"indexed": [], "projects": len(self.ids)}
+
+        since = self.days[-1] if self.days else None
+        indexed = []
+        for day, rows in self.archive.replay(since):
+            self._write_day(day, rows)
+            indexed.append(day)
+        if indexed:
+            self.days = sorted(set(self.days) | set(indexed))
+            self.stamp = stamp
+            self._save_meta()
+            self._columns.clear()
+            print(f"[History] Indexed {len(indexed)} day(s), {len(self.ids)} projects")
+        return {"indexed": indexed, "projects": len(self.ids)}
+
+    def _stamp(self, day: str) -> Optional[float]:
+        path = os.path.join(self.archive.root, day, "_stats.json")
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    def _write_day(self, day: str, rows: Dict[str, Dict]):
+        for pid, row in rows.items():
+            if pid not in self.positions:
+                self.positions[pid] = len(self.ids)
+                self.ids.append(pid)
+                self.full_names.append(row.get("full_name") or "")
+            else:
+                self.full_names[self.positions[pid]] = row.get("full_name") or self.full_names[self.positions[pid]]
+
+        n = len(self.ids)
+        columns = {field: np.full(n, MISSING, dtype=dtype) for field, dtype in NUMERIC_FIELDS.items()}
+        columns["category"] = np.full(n, MISSING, dtype="int16")
+        codes = {name: i for i, name in enumerate(self.categories)}
+        for pid, row in rows.items():
+            pos = self.positions[pid]
+            for field in NUMERIC_FIELDS:
+                columns[field][pos] = row.get(field) or 0
+            category = row.get("category") or "other"
+            if category not in codes:
+                codes[category] = len(self.categories)
+                self.categories.append(category)
+            columns["category"][pos] = codes[category]
+
+        day_dir = os.path.join(self.root, day)
+        os.makedirs(day_dir, exist_ok=True)
+        for field, values in columns.items():
+            # np.save 会自动补 .npy 后缀，临时文件名需以 .npy 结尾
+            tmp = os.path.join(day_dir, f"{field}.{os.getpid()}.tmp.npy")
+            np.save(tmp, values)
+            os.replace(tmp, os.path.join(day_dir, f"{field}.npy"))
+
+    # ---------- query ----------
+
+    def resolve_day(self, day: str) -> Optional[str]:
+        """Latest indexed day on or before day (dates between archives map to the prior one)"""
+        pos = bisect.bisect_right(self.days, day) - 1
+        return self.days[pos] if pos >= 0 else None
+
+    def column(self, day: str, field: str = "stars") -> "np.ndarray":
+        """field values for every project on day, padded to the current project count"""
+        resolved = self.resolve_day(day)
+        if resolved is None:
+            raise KeyError(f"No history on or before {day}")
+        key = (resolved, field)
+        values = self._columns.get(key)
+        if values is None:
+            values = np.load(os.path.join(self.root, resolved, f"{field}.npy"), mmap_mode="r")
+            if len(values) < len(self.ids):
+                padded = np.full(len(self.ids), MISSING, dtype=values.dtype)
+                padded[:len(values)] = values
+                values = padded
+            self._columns[key] = values
+        return values
+
+    def top_gainers(self, start: str, end: str, field: str = "stars", category: str = None,
+                    limit: int = 20) -> List[Dict]:
+        """Projects with the largest field increase between start and end.
+
+        Only projects present on both days are ranked; category filters on
+        the project's category at end.
+        """
+        if field not in NUMERIC_FIELDS:
+            raise KeyError(f"Unknown field: {field}")
+        before, after = self.column(start, field), self.column(end, field)
+        mask = (before != MISSING) & (after != MISSING)
+        if category:
+            if category not in self.categories:
+                return []
+            mask &= self.column(end, "category") == self.categories.index(category)
+        candidates = np.flatnonzero(mask)
+        gain = after[candidates].astype(np.int64) - before[candidates]
+        top = candidates[np.argsort(-gain, kind="stable")[:limit]]
+        return [{"id": self.ids[i], "full_name": self.full_names[i],
+                 "category": self.categories[self.column(end, "category")[i]],
+                 "start": int(before[i]), "end": int(after[i]), "gain": int(after[i] - before[i])}
+                for i in top]
+
+    def series(self, project_id: str, field: str = "stars") -> List[Dict]:
+        """(day, value) for every indexed day the project was in the dataset"""
+        if field not in NUMERIC_FIELDS:
+            raise KeyError(f"Unknown field: {field}")
+        pos = self.positions.get(project_id)
+        if pos is None:
+            return []
+        points = []
+        for day in self.days:
+            value = int(self.column(day, field)[pos])
+            if value != MISSING:
+                points.append({"date": day, field: value})
+        return points
+
+    def first_seen(self, project_id: str) -> Optional[str]:
+        """First indexed day the project appears in the archives"""
+        points = self.series(project_id)
+        return points[0]["date"] if points else None
+
+    def find(self, name: str) -> Optional[str]:
+        """Project id for an id or a full_name (case-insensitive)"""
+        if name in self.positions:
+            return name
+        name = name.lower()
+        for pid, full_name in zip(self.ids, self.full_names):
+            if full_name.lower() == name:
+                return pid
+        return None
@@ -0,0 +1,198 @@
+# GitHub Hub - HTTP 条件请求缓存 (ETag / Last-Modified，磁盘持久化，按大小淘汰)
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from .config import HTTP_CACHE_CONFIG
+from .ratelimit import governor
+
+# 缓存命中时还原到响应上的头
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Link")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class HttpCache:
+    """On-disk cache of GET responses keyed by URL, params and Accept header.
+
+    Responses within their Cache-Control max-age are served without a
+    request ("hit"); older ones are revalidated with If-None-Match /
+    If-Modified-Since, and a 304 ("revalidated") is answered from disk.
+    GitHub does not count 304s against the rate limit. The directory is kept
+    under max_bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, root: str = None, max_bytes: int = None, fetch: Callable = None):
+        self.root = root or HTTP_CACHE_CONFIG["dir"]
+        self.max_bytes = max_bytes or HTTP_CACHE_CONFIG["max_bytes"]
+        self.fetch = fetch or governor.get
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # 首次写入时扫描目录得到
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "uncacheable": 0, "evicted": 0}
+
+    # ---------- keys / files ----------
+
+    @staticmethod
+    def key(url: str, params: Dict = None, headers: Dict = None) -> str:
+        accept = (headers or {}).get("Accept", "")
+        payload = json.dumps([url, sorted((params or {}).items()), accept], default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".json.gz")
+
+    def _load(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, url: str, response) -> None:
+        entry = {
+            "url": url,
+            "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            "body": response.content.decode("utf-8", errors="replace"),
+            "stored_at": time.time(),
+        }
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+            json.dump(entry, f, ensure_ascii=False)
+        self._replace(tmp, path)
+
+    def _touch(self, key: str, entry: Dict):
+        # 刷新 stored_at (重新计算 max-age) 并更新 mtime (LRU)
+        entry["stored_at"] = time.time()
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+            json.dump(entry, f, ensure_ascii=False)
+        self._replace(tmp, path)
+
+    def _replace(self, tmp: str, path: str):
+        """Move a written entry into place and account for the change in its size"""
+        # 锁内读取旧大小与替换，并发写同一条目时增量不会重复计算
+        with self._lock:
+            old = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+            delta = os.path.getsize(path) - old
+        self._account(delta)
+
+    # ---------- size bound ----------
+
+    def _scan(self) -> int:
+        total = 0
+        if os.path.isdir(self.root):
+            for shard in os.scandir(self.root):
+                if shard.is_dir():
+                    total += sum(f.stat().st_size for f in os.scandir(shard.path) if f.is_file())
+        return total
+
+    def _account(self, delta: int):
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()
+            else:
+                self._size += delta
+            if self._size <= self.max_bytes:
+                return
+            # 按 mtime 淘汰最久未使用的条目，降到上限的 90%
+            files = []
+            for shard in os.scandir(self.root):
+                if shard.is_dir():
+                    files.extend((f.stat().st_mtime, f.stat().st_size, f.path)
+                                 for f in os.scandir(shard.path) if f.is_file())
+            files.sort()
+            target = self.max_bytes * 0.9
+            for _, size, path in files:
+                if self._size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._size -= size
+                self.counters["evicted"] += 1
+
+    # ---------- requests ----------
+
+    @staticmethod
+    def _response(url: str, entry: Dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.from_cache = True
+        return response
+
+    @staticmethod
+    def _max_age(entry: Dict) -> int:
+        match = _MAX_AGE.search(entry["headers"].get("Cache-Control", ""))
+        return int(match.group(1)) if match else 0
+
+    def get(self, url: str, params: Dict = None, headers: Dict = None, **kwargs) -> requests.Response:
+        """GET with conditional revalidation; cached answers come back as 200 responses"""
+        key = self.key(url, params, headers)
+        entry = self._load(key)
+        if entry is not None and time.time() - entry["stored_at"] < self._max_age(entry):
+            self._count("hits")
+            os.utime(self._path(key))
+            return self._response(url, entry)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if "ETag" in entry["headers"]:
+                request_headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                request_headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = self.fetch(url, params=params, headers=request_headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            self._touch(key, entry)
+            return self._response(url, entry)
+        if response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+            self._count("misses")
+            try:
+                self._store(key, url, response)
+            except OSError as e:
+                print(f"[HttpCache] Failed to store {url}: {e}")
+        else:
+            self._count("uncacheable")
+        return response
+
+    # ---------- stats ----------
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self.counters, "bytes": self._size}
+
+    def delta(self, before: Dict) -> Dict:
+        """Counters accumulated since a previous stats() snapshot (per-scan report)"""
+        now = self.stats()
+        result = {k: now[k] - before.get(k, 0) for k in self.counters}
+        requests_made = result["revalidated"] + result["misses"] + result["uncacheable"]
+        served = result["hits"] + result["revalidated"] + result["misses"] + result["uncacheable"]
+        # 304 与 max-age 命中都不消耗额度
+        result["quota_saved"] = round((result["hits"] + result["revalidated"]) / served, 3) if served else 0.0
+        result["requests"] = requests_made
+        return result
+
+
+# 进程内共享
+http_cache = HttpCache()
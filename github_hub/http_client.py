@@ -0,0 +1,208 @@
+# GitHub Hub - 共享 HTTP 客户端 (按主机复用 keep-alive 连接池，5xx/连接错误退避重试，连接耗时统计)
+import random
+import socket
+import threading
+import time
+from typing import Dict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from .config import HTTP_CLIENT_CONFIG
+
+
+class ConnectionMetrics:
+    """Per-host counters: requests, new connections, DNS / connect / TTFB seconds"""
+
+    FIELDS = ("requests", "connections", "retries", "dns_seconds", "connect_seconds", "ttfb_seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict] = {}
+
+    def add(self, host: str, **values):
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                entry = self._hosts[host] = dict.fromkeys(self.FIELDS, 0)
+            for name, value in values.items():
+                entry[name] += value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hosts = {host: dict(entry) for host, entry in self._hosts.items()}
+        for entry in hosts.values():
+            requests_made, connections = entry["requests"], entry["connections"]
+            entry["reused"] = max(requests_made - connections, 0)
+            entry["reuse_ratio"] = round(entry["reused"] / requests_made, 3) if requests_made else 0.0
+            for phase, count in (("dns", connections), ("connect", connections), ("ttfb", requests_made)):
+                total = entry.pop(f"{phase}_seconds")
+                entry[f"avg_{phase}_ms"] = round(total * 1000 / count, 1) if count else 0.0
+        return hosts
+
+
+metrics = ConnectionMetrics()
+
+
+class _MeteredConnection:
+    """Mixin timing DNS resolution, TCP (+TLS) connect and time to first byte"""
+
+    _dns_seconds = 0.0
+    _sent_at = None
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            addresses = [info[4][0] for info in
+                         socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)]
+        except OSError:
+            # 解析失败交给 urllib3 处理，保持原有异常类型
+            return super()._new_conn()
+        self._dns_seconds = time.perf_counter() - started
+        host = self._dns_host
+        error = None
+        try:
+            for address in dict.fromkeys(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = host
+
+    def connect(self):
+        started = time.perf_counter()
+        self._dns_seconds = 0.0
+        super().connect()
+        elapsed = time.perf_counter() - started
+        metrics.add(self.host, connections=1, dns_seconds=self._dns_seconds,
+                    connect_seconds=max(elapsed - self._dns_seconds, 0.0))
+
+    def request(self, *args, **kwargs):
+        super().request(*args, **kwargs)
+        self._sent_at = time.perf_counter()
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        if self._sent_at is not None:
+            metrics.add(self.host, requests=1, ttfb_seconds=time.perf_counter() - self._sent_at)
+            self._sent_at = None
+        return response
+
+
+class MeteredHTTPConnection(_MeteredConnection, HTTPConnection):
+    pass
+
+
+class MeteredHTTPSConnection(_MeteredConnection, HTTPSConnection):
+    pass
+
+
+class _TimedPool:
+    """Mixin bounding the wait for a free connection when the pool blocks"""
+
+    pool_timeout = None
+
+    def _get_conn(self, timeout=None):
+        # requests 不传 pool_timeout: 默认会无限期等待空闲连接
+        return super()._get_conn(timeout=self.pool_timeout if timeout is None else timeout)
+
+
+class MeteredHTTPConnectionPool(_TimedPool, HTTPConnectionPool):
+    ConnectionCls = MeteredHTTPConnection
+
+
+class MeteredHTTPSConnectionPool(_TimedPool, HTTPSConnectionPool):
+    ConnectionCls = MeteredHTTPSConnection
+
+
+class JitterRetry(Retry):
+    """urllib3 Retry with exponential backoff plus random jitter, counted per host"""
+
+    jitter = 0.0
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, self.jitter) if backoff else 0.0
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.jitter = self.jitter
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if _pool is not None:
+            metrics.add(_pool.host, retries=1)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class MeteredAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools use the metered connection classes"""
+
+    def __init__(self, *args, pool_timeout: float = None, **kwargs):
+        self.pool_timeout = pool_timeout  # init_poolmanager 在父类构造函数中调用
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # 每个 adapter 一组子类，pool_timeout 不在多个客户端之间共享
+        extra = {"pool_timeout": getattr(self, "pool_timeout", None)}
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("MeteredHTTPConnectionPool", (MeteredHTTPConnectionPool,), extra),
+            "https": type("MeteredHTTPSConnectionPool", (MeteredHTTPSConnectionPool,), extra),
+        }
+
+
+class HttpClient:
+    """Process-wide requests.Session with per-host keep-alive pools.
+
+    Each host gets up to pool_maxsize kept-alive connections; with
+    pool_block set, that is also the cap on concurrent requests per host,
+    and a request waits at most pool_timeout seconds for a free connection.
+    Connection errors and 5xx responses are retried with jittered
+    exponential backoff (403/429 are left to the rate-limit governor).
+    Responses are gzip/deflate (and brotli, if installed) decoded transparently.
+    """
+
+    def __init__(self, config: Dict = None):
+        self.config = {**HTTP_CLIENT_CONFIG, **(config or {})}
+        cfg = self.config
+        retry = JitterRetry(total=cfg["retries"], connect=cfg["retries"], read=cfg["retries"],
+                            status=cfg["retries"], backoff_factor=cfg["backoff_factor"],
+                            backoff_max=cfg["backoff_max"], status_forcelist=cfg["retry_statuses"],
+                            allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+                            raise_on_status=False, respect_retry_after_header=False)
+        retry.jitter = cfg["backoff_jitter"]
+        adapter = MeteredAdapter(pool_connections=cfg["pool_connections"], pool_maxsize=cfg["pool_maxsize"],
+                                 pool_block=cfg["pool_block"], pool_timeout=cfg["pool_timeout"],
+                                 max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(make_headers(accept_encoding=True))
+        self.timeout = (cfg["connect_timeout"], cfg["read_timeout"])
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict:
+        return metrics.stats()
+
+    def close(self):
+        self.session.close()
+
+
+# 进程内共享: 爬虫、GitHub API 缓存与速率限制共用同一组连接池
+http_client = HttpClient()
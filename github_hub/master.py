@@ -1,28 +1,39 @@
 # GitHub Hub - Master Agent (任务调度)
+import os
+import socket
 import threading
 import traceback
 import time
 from datetime import datetime
-from typing import Dict, Callable
+from typing import Dict, Callable, Optional
 from .database import Database
 from .crawler import CrawlerAgent
 from .analyzer import AnalyzerAgent, ContentAgent
-from .config import CATEGORIES, DISCOVERY_URLS
+from .archive import ArchiveEngine
+from .history import HistoryIndex
+from .http_cache import http_cache
+from .ratelimit import governor
+from .config import CATEGORIES, DISCOVERY_URLS, ANALYSIS_CONFIG, SCAN_CONFIG
 
 class MasterAgent:
     """主控 Agent - 调度所有子任务"""
     
     def __init__(self, db_path: str = None):
-        # db_path is now ignored - Database class uses Supabase
+        # db_path 指定时使用本地 SQLite 后端，否则按 DB_BACKEND 配置
         self.db = Database(db_path)
         self.crawler = CrawlerAgent()
         self.analyzer = AnalyzerAgent()
         self.content = ContentAgent()
         self.is_running = False
         self.current_task = None
+        # stop_task 置位，用于中断并行爬取
+        self._cancel = threading.Event()
+        self._scan_thread: Optional[threading.Thread] = None
         self.progress = {"total": 0, "done": 0, "current": ""}
         self.callbacks = []
         self.auto_analysis_timer = None
+        # 分析任务队列中的租约持有者标识
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
         
         # Start auto-analysis scheduler
         self.start_auto_analysis_scheduler()
@@ -70,10 +81,20 @@ class MasterAgent:
             except:
                 pass
 
+    def _notify_write_stats(self, label: str, write: Dict):
+        """推送批量写入耗时"""
+        seconds = sum(c["seconds"] for c in write["chunks"])
+        self._notify(f"Saved {write['written']}/{write['rows']} rows for {label} "
+                     f"({write['skipped']} unchanged) in {len(write['chunks'])} chunk(s), {seconds:.2f}s", "info")
+
     def stop_task(self):
         """停止当前任务"""
-        if self.is_running:
+        scanning = self._scan_thread is not None and self._scan_thread.is_alive()
+        if self.is_running or scanning:
             self.is_running = False
+            # 取消进行中的并行爬取: 正在等待额度的请求立即放弃
+            self._cancel.set()
+            governor.wake()
             self._notify("🛑 Update: Stopping current task... (Waiting for current step to finish)", "warning")
             return {"status": "stopping"}
         return {"status": "not_running"}
@@ -85,11 +106,17 @@ class MasterAgent:
         
         self.is_running = True
         self.current_task = "full_scan"
-        results = {"crawl": {}, "analyze": 0, "content": 0}
+        self._scan_thread = threading.current_thread()
+        self._cancel.clear()
+        results = {"crawl": {}, "written": 0, "skipped": 0, "analyze": 0, "content": 0}
         
         try:
-            # Step 0: 每日新闻发现 (News Discovery)
-            self.run_news_scan()
+            # 一次性载入内容指纹，未变化的项目只刷新 last_scanned
+            self.db.load_fingerprints()
+            http_before = http_cache.stats()
+            
+            # Step 0: 每日新闻发现 (News Discovery)；不经过 run_news_scan，避免它结束时清掉 is_running
+            results["news"] = self._scan_news_sources()
 
             # Step 1: 爬取所有分类 (优先爬取项目少的分类)
             self._notify("Starting full scan (Priority: Low Count First)...", "info")
@@ -101,51 +128,90 @@ class MasterAgent:
             # 排序：数量少的排前面
             sorted_cats = []
             for cat_id, cat_config in CATEGORIES.items():
-                count = cat_counts.get(cat_id, {}).get('count', 0)
+                count = cat_counts.get(cat_id, 0)
                 sorted_cats.append((cat_id, cat_config, count))
             
             sorted_cats.sort(key=lambda x: x[2])
             
-            for cat_id, cat_config, count in sorted_cats:
-                self.progress["current"] = f"Crawling: {cat_config['name']} (Current: {count})"
-                self._notify(f"Scanning {cat_config['name']} (Current: {count})...", "info")
-                
-                if cat_id == "trending":
-                    projects = self.crawler.get_trending()
-                elif cat_id == "new_releases":
-                    projects = self.crawler.get_new_releases()
-                else:
-                    projects = self.crawler.search_by_keywords(cat_config["keywords"], cat_id)
-                
-                for project in projects:
-                    self.db.upsert_project(project)
+            # 分类并行获取 (按上面的顺序启动)，每个分类的结果一到就在当前线程写入
+            workers = min(SCAN_CONFIG["crawl_workers"], len(sorted_cats))
+            self.progress["current"] = f"Crawling {len(sorted_cats)} categories ({workers} in parallel)"
+            for cat_id, projects in self.crawler.iter_categories([c[0] for c in sorted_cats], self._cancel, workers):
+                cat_config = CATEGORIES[cat_id]
+                if projects:
+                    write = self.db.upsert_projects(projects)
+                    self._notify_write_stats(cat_config['name'], write)
+                    results["written"] += write["written"]
+                    results["skipped"] += write["skipped"]
                 
                 results["crawl"][cat_id] = len(projects)
                 self.progress["done"] += 1
                 self._notify(f"Found {len(projects)} in {cat_config['name']}", "success")
             
-            # Step 2: AI 分析未处理的项目
+            # 本次扫描的 GitHub API 缓存效果 (命中/304 不消耗额度)
+            results["http_cache"] = http_cache.delta(http_before)
+            self._notify(
+                "GitHub API cache: {hits} fresh, {revalidated} revalidated (304), {misses} downloaded, "
+                "{quota_saved:.0%} of calls free".format(**results["http_cache"]), "info")
+            
+            if self._cancel.is_set():
+                # 已停止: 不再计算增长、分析或归档 (只爬了部分分类的快照不应进入归档)
+                results["cancelled"] = True
+                self._notify("Full scan stopped after crawling; growth, analysis and archive skipped", "warning")
+                return results
+            
+            # Step 1.5: 根据 star 快照计算增长 (一次性向量化计算全部项目)
+            try:
+                results["growth"] = self.db.update_growth()
+            except Exception as e:
+                self._notify(f"Growth computation failed: {e}", "warning")
+            
+            # Step 2: AI 分析未处理的项目 (从任务队列领取)
             self._notify("Starting AI analysis...", "info")
-            pending = self.db.get_projects_needing_analysis(limit=50)
-            self.progress = {"total": len(pending), "done": 0, "current": "Analyzing"}
+            self.progress = {"total": min(self.db.get_pending_count(), 50), "done": 0, "current": "Analyzing"}
             
-            for project in pending:
-                self.progress["current"] = f"Analyzing: {project['name']}"
+            with self.db.write_buffer():
+                while self.is_running and results["analyze"] < 50:
+                    batch = self.db.claim_analysis_jobs(self.worker_id)
+                    if not batch:
+                        break
+                    # 一次 GraphQL 查询取回整批 README，逐个分析时直接命中缓存
+                    self.crawler.prefetch_readmes([p['full_name'] for p in batch])
+                    handled = 0
+                    try:
+                        for project in batch:
+                            if not self.is_running:
+                                break
+                            self.progress["current"] = f"Analyzing: {project['name']}"
+                            
+                            try:
+                                # 获取 README
+                                readme = self._get_readme(project)
+                                
+                                # AI 分析
+                                analysis = self.analyzer.analyze_project(project, readme)
+                                self.db.update_ai_analysis(project['id'], analysis)
+                            except Exception as e:
+                                self.db.fail_analysis_job(project['id'], self.worker_id, str(e))
+                                handled += 1
+                                continue
+                            self.db.complete_analysis_job(project['id'], self.worker_id)
+                            handled += 1
+                            
+                            results["analyze"] += 1
+                            self.progress["done"] += 1
+                            self._notify(f"Analyzed: {project['name']}", "success")
+                            
+                            # 避免 API 限制
+                            time.sleep(0.5)
+                    finally:
+                        # 停止或出错时归还尚未处理的租约，不必等租约过期
+                        self.db.release_analysis_jobs([p['id'] for p in batch[handled:]], self.worker_id)
                 
-                # 获取 README
-                readme = self.crawler.get_readme(project['full_name'])
-                
-                # AI 分析
-                analysis = self.analyzer.analyze_project(project, readme)
-                self.db.update_ai_analysis(project['id'], analysis)
-                
-                results["analyze"] += 1
-                self.progress["done"] += 1
-                self._notify(f"Analyzed: {project['name']}", "success")
-                
-                # 避免 API 限制
-                time.sleep(0.5)
-            
+            if self._cancel.is_set():
+                results["cancelled"] = True
+                self._notify("Full scan stopped; archive skipped", "warning")
+                return results
             self._notify("Full scan completed!", "success")
             
             # Step 3: 自动归档数据到本地文件夹
@@ -155,53 +221,38 @@ class MasterAgent:
             self._notify(f"Error during scan: {e}", "error")
             results["error"] = str(e)
         finally:
+            self.db.drop_fingerprints()
             self.is_running = False
             self.current_task = None
+            self._scan_thread = None
         
         return results
     
     def archive_data(self):
-        """归档数据到本地文件夹"""
-        import os
-        import json
-        
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        archive_dir = f"data/archive/{date_str}"
-        os.makedirs(archive_dir, exist_ok=True)
-        
-        self._notify(f"Archiving data to {archive_dir}...", "info")
+        """归档数据到本地文件夹 (压缩 JSONL: base 快照 + 每日 delta)"""
+        engine = ArchiveEngine()
+        self._notify(f"Archiving data to {engine.root}...", "info")
         
         try:
-            # 1. 导出所有数据
-            all_projects = self.db.get_projects_by_category("all", limit=10000) # Hack to get all? No, need new DB method or iterate categories
-            # Better: iterate categories
-            
-            summary_stats = {"total": 0, "breakdown": {}}
-            
-            for cat_id, cat_config in CATEGORIES.items():
-                projects = self.db.get_projects_by_category(cat_id, limit=1000)
-                if not projects:
-                    continue
-                    
-                # 保存每个分类的 JSON
-                file_path = f"{archive_dir}/{cat_id}.json"
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump([dict(p) for p in projects], f, ensure_ascii=False, indent=2)
-                
-                summary_stats["breakdown"][cat_id] = len(projects)
-                summary_stats["total"] += len(projects)
-            
-            # 保存统计信息
-            with open(f"{archive_dir}/_stats.json", 'w', encoding='utf-8') as f:
-                json.dump(summary_stats, f, ensure_ascii=False, indent=2)
-                
-            self._notify(f"Data archived successfully to {archive_dir}", "success")
+            # 流式读取 (keyset 分页)，同一遍完成写入、变更检测与统计
+            stats = engine.archive(self.db.iter_projects(with_content=True))
+            self._notify(
+                f"Data archived ({stats['kind']}, {stats['total']} projects, "
+                f"+{stats['added']} ~{stats['changed']} -{stats['removed']}, {stats['bytes']} bytes)",
+                "success")
             
         except Exception as e:
             print(f"Archive error: {e}")
             self._notify(f"Archive error: {e}", "error")
+            return
+        
+        try:
+            # 新的归档日加入列式历史索引
+            HistoryIndex(engine).update()
+        except Exception as e:
+            print(f"[History] Index update failed: {e}")
 
-    def run_batch_analysis(self) -> Dict:
+    def run_batch_analysis(self, limit: int = 100) -> Dict:
         """批量分析所有未分析的项目 (使用 120B 大模型)"""
         if self.is_running:
             return {"error": "Task already running"}
@@ -210,70 +261,47 @@ class MasterAgent:
         self.current_task = "batch_analysis"
         
         try:
-            # 获取需要分析的项目 (缺 120B 结果的)
-            pending = self.db.get_projects_needing_analysis(limit=100)
+            # 从 analysis_jobs 队列按批领取任务 (带租约，多个 worker 不会重复分析同一项目)
+            total = min(self.db.get_pending_count(), limit)
             
-            self._notify(f"Starting batch analysis for {len(pending)} projects using High-Quality Model...", "info")
-            self.progress = {"total": len(pending), "done": 0, "current": "Batch Analysis"}
+            self._notify(f"Starting batch analysis for {total} projects using High-Quality Model...", "info")
+            self.progress = {"total": total, "done": 0, "current": "Batch Analysis"}
             
             analyzed_count = 0
-            total = len(pending)
+            idx = 0
             
-            for idx, project in enumerate(pending, 1):
-                if not self.is_running: break
-                
-                progress_tag = f"[{idx}/{total}]"
-                self.progress["current"] = f"Analyzing: {project['name']}"
-                self._notify(f"{progress_tag} 正在分析 {project['name']}...", "info")
-                
-                # 始终获取 README (分析需要)
-                readme = self.crawler.get_readme(project['full_name'])
-                
-                # 1. 生成 AI Analysis (如果不是 120B 生成的或还没生成)
-                is_120b = project.get('ai_model_name') and '120b' in project['ai_model_name'].lower()
-                
-                if not is_120b:
-                    analysis = self.analyzer.analyze_project(project, readme)
-                    self.db.update_project_analysis(project['id'], analysis)
-                else:
-                    analysis = {"summary": project.get('ai_summary')}
-                
-                # 1.1 生成 RAG Summary (如果缺失)
-                if not project.get('ai_rag_summary') or not is_120b:
-                    rag_summary = self.analyzer.generate_rag_summary(project, readme)
-                    if rag_summary:
-                        self.db.update_project_rag_summary(project['id'], rag_summary)
-                
-                # 2. 抓取截图 (如果缺失)
-                screenshot_path = project.get('screenshot')
-                if not screenshot_path:
-                    self._notify(f"{progress_tag} 正在截图 {project['name']}...", "info")
-                    screenshot_path = self.crawler.capture_screenshot(project['url'], project['id'])
-                    if screenshot_path:
-                        self.db.update_project_screenshot(project['id'], screenshot_path)
-                
-                # 3. 视觉分析 (OCR & UI)
-                visual_summary = ""
-                if screenshot_path:
-                    self._notify(f"{progress_tag} 视觉分析 (OCR) {project['name']}...", "info")
-                    visual_summary = self.analyzer.analyze_with_vision(project, screenshot_path)
-                    # 视觉摘要也需要更新
-                    self.db.update_project_visual_summary(project['id'], visual_summary)
-
-                # 4. 生成深度教程
-                self._notify(f"{progress_tag} 生成深度教程...", "info")
-                tutorial = self.content.generate_tutorial(project, readme, visual_summary)
-                
-                # Update DB
-                self.db.update_project_tutorial(project['id'], tutorial)
-                
-                analyzed_count += 1
-                self.progress["done"] += 1
-                self._notify(f"{progress_tag} ✅ {project['name']} 处理完成", "success")
+            # 合并每个项目的多次字段更新，按阈值批量写回
+            with self.db.write_buffer():
+                while self.is_running and idx < limit:
+                    batch = self.db.claim_analysis_jobs(self.worker_id, limit=min(ANALYSIS_CONFIG["claim_batch"], limit - idx))
+                    if not batch:
+                        break
+                    self.crawler.prefetch_readmes([p['full_name'] for p in batch])
+                    
+                    for pos, project in enumerate(batch):
+                        if not self.is_running:
+                            # 停止时归还尚未处理的租约
+                            self.db.release_analysis_jobs([p['id'] for p in batch[pos:]], self.worker_id)
+                            break
+                        
+                        idx += 1
+                        progress_tag = f"[{idx}/{max(total, idx)}]"
+                        try:
+                            self._process_project(project, progress_tag)
+                        except Exception as e:
+                            self._notify(f"{progress_tag} ❌ {project['name']} 分析失败: {e}", "error")
+                            traceback.print_exc()
+                            self.db.fail_analysis_job(project['id'], self.worker_id, str(e))
+                            continue
+                        
+                        self.db.complete_analysis_job(project['id'], self.worker_id)
+                        analyzed_count += 1
+                        self.progress["done"] += 1
+                        self._notify(f"{progress_tag} ✅ {project['name']} 处理完成", "success")
+                        
+                        # 稍微延时避免请求过快
+                        time.sleep(1)
                 
-                # 稍微延时避免请求过快
-                time.sleep(1)
-            
             self._notify(f"🎉 批量分析完成！共处理 {analyzed_count} 个项目", "success")
             return {"status": "completed", "count": analyzed_count}
             
@@ -286,6 +314,52 @@ class MasterAgent:
             self.is_running = False
             self.current_task = None
 
+    def _process_project(self, project: Dict, progress_tag: str):
+        """单个项目的完整分析流程: 分析 → RAG 总结 → 截图 → 视觉分析 → 教程"""
+        self.progress["current"] = f"Analyzing: {project['name']}"
+        self._notify(f"{progress_tag} 正在分析 {project['name']}...", "info")
+        
+        # 始终获取 README (分析需要，同一次处理的各阶段共用)
+        readme = self._get_readme(project)
+        
+        # 1. 生成 AI Analysis (如果不是 120B 生成的或还没生成)
+        is_120b = project.get('ai_model_name') and '120b' in project['ai_model_name'].lower()
+        
+        if not is_120b:
+            analysis = self.analyzer.analyze_project(project, readme)
+            self.db.update_project_analysis(project['id'], analysis)
+        else:
+            analysis = {"summary": project.get('ai_summary')}
+        
+        # 1.1 生成 RAG Summary (如果缺失)
+        if not project.get('ai_rag_summary') or not is_120b:
+            rag_summary = self.analyzer.generate_rag_summary(project, readme)
+            if rag_summary:
+                self.db.update_project_rag_summary(project['id'], rag_summary)
+        
+        # 2. 抓取截图 (如果缺失)
+        screenshot_path = project.get('screenshot')
+        if not screenshot_path:
+            self._notify(f"{progress_tag} 正在截图 {project['name']}...", "info")
+            screenshot_path = self.crawler.capture_screenshot(project['url'], project['id'])
+            if screenshot_path:
+                self.db.update_project_screenshot(project['id'], screenshot_path)
+        
+        # 3. 视觉分析 (OCR & UI)
+        visual_summary = ""
+        if screenshot_path:
+            self._notify(f"{progress_tag} 视觉分析 (OCR) {project['name']}...", "info")
+            visual_summary = self.analyzer.analyze_with_vision(project, screenshot_path)
+            # 视觉摘要也需要更新
+            self.db.update_project_visual_summary(project['id'], visual_summary)
+
+        # 4. 生成深度教程
+        self._notify(f"{progress_tag} 生成深度教程...", "info")
+        tutorial = self.content.generate_tutorial(project, readme, visual_summary)
+        
+        # Update DB
+        self.db.update_project_tutorial(project['id'], tutorial)
+
     def run_category_scan(self, category: str) -> Dict:
         """扫描单个分类"""
         if category not in CATEGORIES:
@@ -294,23 +368,33 @@ class MasterAgent:
         cat_config = CATEGORIES[category]
         self._notify(f"Scanning {cat_config['name']}...", "info")
         
-        if category == "trending":
-            projects = self.crawler.get_trending()
-        elif category == "new_releases":
-            projects = self.crawler.get_new_releases()
-        else:
-            projects = self.crawler.search_by_keywords(cat_config["keywords"], category)
+        projects = self.crawler.fetch_category(category)
         
-        for project in projects:
-            self.db.upsert_project(project)
+        write = {"written": 0, "skipped": 0}
+        if projects:
+            self.db.load_fingerprints(filters={"category": category})
+            try:
+                write = self.db.upsert_projects(projects)
+            finally:
+                self.db.drop_fingerprints()
+            self._notify_write_stats(cat_config['name'], write)
         
         self._notify(f"Found {len(projects)} projects", "success")
-        return {"category": category, "count": len(projects)}
+        return {"category": category, "count": len(projects),
+                "written": write["written"], "skipped": write["skipped"]}
     
     def run_news_scan(self) -> Dict:
         """扫描每日发现源 (News Discovery)"""
         self.is_running = True
         self.current_task = "news_scan"
+        try:
+            return self._scan_news_sources()
+        finally:
+            self.is_running = False
+            self.current_task = None
+
+    def _scan_news_sources(self) -> Dict:
+        """News Discovery 主体 (不改动 is_running，供 run_full_scan 复用)"""
         results = {"total_found": 0, "sources": {}}
         
         try:
@@ -327,15 +411,18 @@ class MasterAgent:
                 # But our frontend needs to support 'news' category ID if we use it.
                 # Let's check config.py... yes, 'news' category exists!
                 
-                source_count = 0
+                new_projects = []
                 for p in projects:
                     # 如果库里没有，才算新发现
                     if not self.db.get_project(p['id']):
                         p['category'] = 'news' # Force category
-                        self.db.upsert_project(p)
-                        source_count += 1
+                        new_projects.append(p)
                         self._notify(f"Found new project: {p['name']}", "success")
                 
+                if new_projects:
+                    self.db.upsert_projects(new_projects)
+                source_count = len(new_projects)
+                
                 results["sources"][url] = source_count
                 total_found += source_count
                 
@@ -346,9 +433,6 @@ class MasterAgent:
         except Exception as e:
             self._notify(f"News scan error: {e}", "error")
             return {"error": str(e)}
-        finally:
-            self.is_running = False
-            self.current_task = None
 
     def add_project_by_link(self, url: str) -> Dict:
         """从链接添加项目"""
@@ -375,64 +459,49 @@ class MasterAgent:
         except Exception as e:
             return {"error": str(e)}
 
+    def _get_readme(self, project: Dict) -> Optional[str]:
+        """README via the crawler's cache; also kept in the content store as readme_content"""
+        readme = self.crawler.get_readme(project['full_name'])
+        if readme:
+            try:
+                self.db.update_project_readme(project['id'], readme)
+            except Exception as e:
+                print(f"[DB] Failed to store README for {project['full_name']}: {e}")
+        return readme
+    
     def analyze_single(self, project_id: str) -> Dict:
         """分析单个项目"""
-        cursor = self.db.conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        )
-        row = cursor.fetchone()
-        if not row:
+        project = self.db.get_project(project_id)
+        if not project:
             return {"error": "Project not found"}
         
-        project = dict(row)
-        
         # 抓取截图
         if not project.get('screenshot'):
             screenshot_path = self.crawler.capture_screenshot(project['url'], project_id)
             if screenshot_path:
-                self.db.update_screenshot(project_id, screenshot_path)
+                self.db.update_project_screenshot(project_id, screenshot_path)
         
-        readme = self.crawler.get_readme(project['full_name'])
+        readme = self._get_readme(project)
         analysis = self.analyzer.analyze_project(project, readme)
         self.db.update_ai_analysis(project_id, analysis)
         
         # Generate RAG Summary
         rag_summary = self.analyzer.generate_rag_summary(project, readme)
-        self.db.conn.execute("UPDATE projects SET ai_rag_summary = ? WHERE id = ?", (rag_summary, project_id))
-        self.db.conn.commit()
+        self.db.update_project_rag_summary(project_id, rag_summary)
         
         return analysis
     
     def generate_tutorial(self, project_id: str) -> str:
         """生成项目教程"""
-        cursor = self.db.conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        )
-        row = cursor.fetchone()
-        if not row:
+        project = self.db.get_project(project_id)
+        if not project:
             return "Project not found"
         
-        project = dict(row)
-        readme = self.crawler.get_readme(project['full_name'])
+        readme = self._get_readme(project)
         tutorial = self.content.generate_tutorial(project, readme)
         
-        # 保存教程
-        self.db.conn.execute(
-            "UPDATE projects SET ai_tutorial = ? WHERE id = ?",
-            (tutorial, project_id)
-        )
-        self.db.conn.commit()
-        
-        # 同时保存为 Markdown 文件
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d")
-            filename = f"data/tutorials/{project['name']}_{timestamp}.md"
-            import os
-            os.makedirs("data/tutorials", exist_ok=True)
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(tutorial)
-        except:
-            pass
+        # 保存教程 (正文存入 content store，不再另写 data/tutorials/*.md 副本)
+        self.db.update_project_tutorial(project_id, tutorial)
         
         return tutorial
     
@@ -451,7 +520,7 @@ class MasterAgent:
         results = {"local": [], "remote": []}
         
         # 1. 本地搜索
-        local_results = self.db.search_projects(query, limit=limit)
+        local_results = self.db.search_projects(query, limit=limit, projection="card")
         results["local"] = local_results
         
         # 2. 如果本地结果很少，或者强制混合，则搜索 GitHub
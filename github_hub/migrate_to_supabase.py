@@ -1,101 +1,230 @@
 """
-Data Migration Script: SQLite -> Supabase
-Run this ONCE to migrate existing data.
+Migration / sync tool: SQLite <-> Supabase
+
+    python -m github_hub.migrate_to_supabase                      # SQLite -> Supabase
+    python -m github_hub.migrate_to_supabase --direction pull     # Supabase -> SQLite
+    python -m github_hub.migrate_to_supabase --diff --dry-run     # only report changed rows
+    python -m github_hub.migrate_to_supabase --diff               # move changed rows only
+
+Rows are read in primary-key pages and upserted in multi-row chunks by a small
+thread pool. The resume cursor (last key whose chunk and all earlier chunks
+were written) is saved to MIGRATE_CONFIG["state_path"], so an interrupted run
+continues where it stopped; --reset starts over.
 """
-import sqlite3
+import argparse
+import hashlib
 import json
 import os
-import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from .config import DATABASE_PATH, MIGRATE_CONFIG
+from .storage import PROJECT_COLUMNS, TABLE_KEYS, StorageBackend
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TABLES = ("projects", "news_sources", "settings")
 
-from supabase import create_client
-from config import SUPABASE_URL, SUPABASE_KEY, DATABASE_PATH
+# 自增主键在两端各自分配，按自然键合并 (迁移时不复制 id)
+NATURAL_KEYS = {"news_sources": "url"}
 
-def migrate():
-    # Connect to local SQLite
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    sqlite_path = os.path.join(base_dir, DATABASE_PATH)
-    
-    if not os.path.exists(sqlite_path):
-        print(f"SQLite DB not found at {sqlite_path}")
-        return
-    
-    print(f"Connecting to SQLite: {sqlite_path}")
-    conn = sqlite3.connect(sqlite_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Connect to Supabase
-    print(f"Connecting to Supabase: {SUPABASE_URL}")
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    
-    # Migrate Projects
-    print("\n--- Migrating Projects ---")
-    cursor.execute("SELECT * FROM projects")
-    projects = cursor.fetchall()
-    print(f"Found {len(projects)} projects")
-    
-    for row in projects:
-        data = dict(row)
-        # Parse JSON fields
-        for field in ['topics', 'ai_tech_stack', 'ai_use_cases']:
-            if data.get(field):
+# 两端时间戳格式不同 (TEXT vs TIMESTAMPTZ)，不参与差异比较；content_fingerprint 由内容派生
+DIFF_EXCLUDE = {"created_at", "updated_at", "last_scanned", "last_analyzed", "growth_updated_at",
+                "row_updated_at", "content_fingerprint"}
+
+
+def row_hash(row: Dict) -> str:
+    """Content hash of a row for --diff (timestamps and NULLs ignored)"""
+    stable = {k: v for k, v in row.items() if k not in DIFF_EXCLUDE and v is not None}
+    payload = json.dumps(stable, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Migrator:
+    """Copy tables from source to target backend in parallel, resumable chunks"""
+
+    def __init__(self, source: StorageBackend, target: StorageBackend, direction: str,
+                 chunk_size: int = None, workers: int = None, state_path: str = None,
+                 diff: bool = False, dry_run: bool = False):
+        self.source = source
+        self.target = target
+        self.direction = direction
+        self.chunk_size = chunk_size or MIGRATE_CONFIG["chunk_size"]
+        self.workers = workers or MIGRATE_CONFIG["workers"]
+        self.state_path = state_path or MIGRATE_CONFIG["state_path"]
+        self.diff = diff
+        self.dry_run = dry_run
+        self.state = self._load_state()
+
+    # ---------- resume cursor ----------
+
+    def _load_state(self) -> Dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self):
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def _cursor_name(self, table: str) -> str:
+        return f"{self.direction}:{table}"
+
+    def reset(self, tables: List[str]):
+        for table in tables:
+            self.state.pop(self._cursor_name(table), None)
+        self._save_state()
+
+    # ---------- copy ----------
+
+    def _prepare(self, table: str, row: Dict) -> Dict:
+        if table == "projects":
+            # 旧 SQLite 库可能残留 schema 之外的列
+            row = {k: v for k, v in row.items() if k in PROJECT_COLUMNS}
+        if table in NATURAL_KEYS:
+            row.pop(TABLE_KEYS[table], None)
+        return row
+
+    def _target_hashes(self, table: str, merge_key: str) -> Dict:
+        hashes = {}
+        after = None
+        key = TABLE_KEYS[table]
+        while True:
+            rows = self.target.select_changed(table, after_key=after, limit=self.chunk_size)
+            for row in rows:
+                after = row[key]
+                row = self._prepare(table, row)
+                hashes[row[merge_key]] = row_hash(row)
+            if len(rows) < self.chunk_size:
+                return hashes
+
+    def migrate_table(self, table: str) -> Dict:
+        key = TABLE_KEYS[table]
+        merge_key = NATURAL_KEYS.get(table, key)
+        name = self._cursor_name(table)
+        cursor = self.state.get(name)
+        if cursor is not None:
+            print(f"[Migrate] {table}: resuming after {key}={cursor}")
+        stats = {"read": 0, "added": 0, "changed": 0, "written": 0, "chunks": 0, "failed": 0}
+        target_hashes = self._target_hashes(table, merge_key) if self.diff else None
+        start = time.perf_counter()
+
+        # 按提交顺序排队；游标只推进到最长的已全部写入前缀，失败后续跑不会漏行
+        pending = deque()
+        error: Optional[Exception] = None
+
+        def settle(keep: int):
+            nonlocal error
+            while pending and (len(pending) > keep or pending[0][0].done()):
+                future, last_key, count = pending.popleft()
                 try:
-                    data[field] = json.loads(data[field])
-                except:
-                    data[field] = []
-            else:
-                data[field] = []
-        
-        # Convert id to string
-        data['id'] = str(data['id'])
-        
-        try:
-            supabase.table("projects").upsert(data).execute()
-            print(f"  Migrated: {data['name']}")
-        except Exception as e:
-            print(f"  Error migrating {data['name']}: {e}")
-    
-    # Migrate News Sources
-    print("\n--- Migrating News Sources ---")
-    try:
-        cursor.execute("SELECT * FROM news_sources")
-        sources = cursor.fetchall()
-        print(f"Found {len(sources)} news sources")
-        
-        for row in sources:
-            data = dict(row)
-            # Remove auto-increment id (Supabase will generate new one)
-            del data['id']
-            try:
-                supabase.table("news_sources").upsert(data, on_conflict="url").execute()
-                print(f"  Migrated: {data['name']}")
-            except Exception as e:
-                print(f"  Error migrating {data['name']}: {e}")
-    except Exception as e:
-        print(f"  No news_sources table or error: {e}")
-    
-    # Migrate Settings
-    print("\n--- Migrating Settings ---")
+                    future.result()
+                except Exception as e:
+                    error = error or e
+                    stats["failed"] += count
+                    continue
+                stats["written"] += count
+                if error is None:
+                    self.state[name] = last_key
+                    self._save_state()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while error is None:
+                rows = self.source.select_changed(table, after_key=cursor, limit=self.chunk_size)
+                if not rows:
+                    break
+                cursor = rows[-1][key]
+                stats["read"] += len(rows)
+                batch = []
+                for row in rows:
+                    row = self._prepare(table, row)
+                    if target_hashes is not None:
+                        old = target_hashes.get(row[merge_key])
+                        if old == row_hash(row):
+                            continue
+                        stats["added" if old is None else "changed"] += 1
+                    batch.append(row)
+                if self.dry_run or not batch:
+                    if len(rows) < self.chunk_size:
+                        break
+                    continue
+                stats["chunks"] += 1
+                pending.append((pool.submit(self.target.replace_rows, table, batch, merge_key),
+                                cursor, len(batch)))
+                # 限制在途分块数，读取不会远远领先于写入
+                settle(keep=self.workers * 2)
+                if len(rows) < self.chunk_size:
+                    break
+            settle(keep=0)
+
+        stats["seconds"] = round(time.perf_counter() - start, 2)
+        if error is not None:
+            print(f"[Migrate] {table}: stopped after {stats['written']} rows: {error}")
+            print(f"[Migrate] {table}: re-run to resume after {key}={self.state.get(name)}")
+            stats["error"] = str(error)
+        elif not self.dry_run:
+            # 完整跑完后清除游标，下次同步从头开始 (配合 --diff 只传变化的行)
+            self.state.pop(name, None)
+            self._save_state()
+        verb = "would move" if self.dry_run else "wrote"
+        if not self.dry_run:
+            moved = stats["written"]
+        else:
+            moved = stats["added"] + stats["changed"] if self.diff else stats["read"]
+        print(f"[Migrate] {table}: read {stats['read']}, {verb} {moved} "
+              f"(+{stats['added']} ~{stats['changed']}) in {stats['seconds']}s")
+        return stats
+
+    def run(self, tables: List[str] = DEFAULT_TABLES) -> Dict[str, Dict]:
+        results = {}
+        for table in tables:
+            results[table] = self.migrate_table(table)
+            if "error" in results[table]:
+                break
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate or sync data between SQLite and Supabase")
+    parser.add_argument("--direction", choices=("push", "pull"), default="push",
+                        help="push: SQLite -> Supabase (default); pull: Supabase -> SQLite")
+    parser.add_argument("--sqlite", default=DATABASE_PATH, help="SQLite database path")
+    parser.add_argument("--tables", default=",".join(DEFAULT_TABLES),
+                        help=f"comma-separated tables (default: {','.join(DEFAULT_TABLES)})")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--diff", action="store_true", help="only move rows whose content differs")
+    parser.add_argument("--dry-run", action="store_true", help="read and compare, write nothing")
+    parser.add_argument("--reset", action="store_true", help="ignore saved resume cursors")
+    args = parser.parse_args()
+
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+    unknown = [t for t in tables if t not in DEFAULT_TABLES]
+    if unknown:
+        parser.error(f"unsupported tables: {', '.join(unknown)}")
+    if args.direction == "push" and not os.path.exists(args.sqlite):
+        print(f"SQLite DB not found at {args.sqlite}")
+        return
+
+    from .sqlite_backend import SQLiteBackend
+    from .supabase_backend import SupabaseBackend
+    sqlite, supabase = SQLiteBackend(args.sqlite), SupabaseBackend()
+    source, target = (sqlite, supabase) if args.direction == "push" else (supabase, sqlite)
+    migrator = Migrator(source, target, args.direction, args.chunk_size, args.workers,
+                        diff=args.diff, dry_run=args.dry_run)
+    if args.reset:
+        migrator.reset(tables)
     try:
-        cursor.execute("SELECT * FROM settings")
-        settings = cursor.fetchall()
-        print(f"Found {len(settings)} settings")
-        
-        for row in settings:
-            data = dict(row)
-            try:
-                supabase.table("settings").upsert(data).execute()
-                print(f"  Migrated: {data['key']}")
-            except Exception as e:
-                print(f"  Error migrating {data['key']}: {e}")
-    except Exception as e:
-        print(f"  No settings table or error: {e}")
-    
-    conn.close()
-    print("\n✅ Migration complete!")
+        results = migrator.run(tables)
+    finally:
+        sqlite.close()
+    if not any("error" in r for r in results.values()):
+        print("\n✅ Migration complete!" if not args.dry_run else "\n✅ Dry run complete")
+
 
 if __name__ == "__main__":
-    migrate()
+    main()
@@ -0,0 +1,176 @@
+# GitHub Hub - GitHub API 速率限制调度 (按响应头中的剩余额度/重置时间等待，替代固定 sleep)
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+from .config import RATELIMIT_CONFIG
+from .http_client import http_client
+
+
+class RateLimitExceeded(Exception):
+    """The wait for budget would exceed max_wait"""
+
+    def __init__(self, resource: str, wait: float):
+        super().__init__(f"GitHub {resource} rate limit exhausted, resets in {wait:.0f}s")
+        self.resource = resource
+        self.wait = wait
+
+
+class RequestCancelled(Exception):
+    """The calling thread's cancel event was set while waiting for budget"""
+
+
+def resource_for(url: str) -> str:
+    """GitHub rate-limit bucket a request URL counts against"""
+    if "/search/code" in url:
+        return "code_search"
+    if "/search/" in url:
+        return "search"
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+class RateLimitGovernor:
+    """Shared per-resource GitHub budget, driven by X-RateLimit-* and Retry-After headers.
+
+    acquire() returns immediately while the last response reported budget
+    left and otherwise blocks until the reset time (or Retry-After), so
+    callers go as fast as GitHub allows. While a bucket's budget is unknown,
+    only one request probes it at a time.
+    """
+
+    def __init__(self, session=None, max_wait: float = None):
+        self.session = session or http_client
+        self.max_wait = max_wait if max_wait is not None else RATELIMIT_CONFIG["max_wait_seconds"]
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, Dict] = {}
+        self._local = threading.local()
+
+    def _bucket(self, resource: str) -> Dict:
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            bucket = {"remaining": None, "limit": None, "reset": 0.0, "blocked_until": 0.0,
+                      "probing": False, "requests": 0, "waits": 0, "waited_seconds": 0.0}
+            self._buckets[resource] = bucket
+        return bucket
+
+    def _delay(self, bucket: Dict, now: float) -> float:
+        if bucket["blocked_until"] > now:
+            return bucket["blocked_until"] - now
+        if bucket["remaining"] is not None and bucket["reset"] <= now:
+            bucket["remaining"] = None  # 窗口已重置，额度未知，等下一个响应
+        if bucket["remaining"] is not None and bucket["remaining"] <= RATELIMIT_CONFIG["reserve"]:
+            return bucket["reset"] - now + RATELIMIT_CONFIG["reset_margin"]
+        return 0.0
+
+    def acquire(self, resource: str = "core", max_wait: float = None):
+        """Block until a request on resource is allowed and reserve one unit of budget.
+
+        Raises RateLimitExceeded instead when the wait would exceed max_wait,
+        and RequestCancelled once the event from cancel_on() is set.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        cancel = getattr(self._local, "cancel", None)
+        with self._cond:
+            bucket = self._bucket(resource)
+            while True:
+                if cancel is not None and cancel.is_set():
+                    raise RequestCancelled(f"GitHub {resource} request cancelled")
+                now = time.time()
+                delay = self._delay(bucket, now)
+                if delay <= 0 and bucket["remaining"] is None and bucket["probing"]:
+                    # 额度未知时只放行一个探测请求，其余等待它的响应头
+                    self._cond.wait(timeout=5)
+                    continue
+                if delay <= 0:
+                    if bucket["remaining"] is None:
+                        bucket["probing"] = True
+                    else:
+                        bucket["remaining"] -= 1
+                    bucket["requests"] += 1
+                    return
+                if delay > max_wait:
+                    raise RateLimitExceeded(resource, delay)
+                print(f"[RateLimit] {resource} budget exhausted, waiting {delay:.1f}s")
+                bucket["waits"] += 1
+                bucket["waited_seconds"] += delay
+                self._cond.wait(timeout=delay)
+
+    def update(self, resource: str, response) -> bool:
+        """Record budget headers from a response. Returns True if it was rate limited."""
+        headers = response.headers
+        now = time.time()
+        limited = False
+        with self._cond:
+            self._bucket(resource)["probing"] = False
+            # 以 GitHub 返回的 X-RateLimit-Resource 为准 (URL 推断可能不准)
+            bucket = self._bucket(headers.get("X-RateLimit-Resource", resource))
+            bucket["probing"] = False
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                bucket["remaining"] = int(remaining)
+                bucket["limit"] = int(headers.get("X-RateLimit-Limit") or 0) or bucket["limit"]
+                bucket["reset"] = float(headers.get("X-RateLimit-Reset") or now)
+            if response.status_code in (403, 429):
+                retry_after = headers.get("Retry-After")
+                if retry_after is not None:
+                    bucket["blocked_until"] = now + float(retry_after)
+                    limited = True
+                elif remaining == "0":
+                    limited = True
+                elif response.status_code == 429 or "rate limit" in (response.text or "").lower():
+                    # 次级限流且无 Retry-After: GitHub 建议至少等待一分钟
+                    bucket["blocked_until"] = now + RATELIMIT_CONFIG["secondary_backoff"]
+                    limited = True
+            self._cond.notify_all()
+        return limited
+
+    @contextmanager
+    def cancel_on(self, event: threading.Event):
+        """Make this thread's waits for budget abort when event is set (call wake() after setting it)"""
+        self._local.cancel = event
+        try:
+            yield
+        finally:
+            self._local.cancel = None
+
+    def wake(self):
+        """Wake all waiting threads so they re-check their cancel events"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def release(self, resource: str):
+        """Clear a probe that ended without a response (network error)"""
+        with self._cond:
+            self._bucket(resource)["probing"] = False
+            self._cond.notify_all()
+
+    def request(self, method: str, url: str, retries: int = 1, max_wait: float = None, **kwargs):
+        """session.request through the governor; a rate-limited response is retried after the wait"""
+        resource = resource_for(url)
+        for attempt in range(retries + 1):
+            self.acquire(resource, max_wait)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except Exception:
+                self.release(resource)
+                raise
+            if not self.update(resource, response) or attempt == retries:
+                return response
+        return response
+
+    def get(self, url: str, retries: int = 1, max_wait: float = None, **kwargs):
+        return self.request("GET", url, retries, max_wait, **kwargs)
+
+    def post(self, url: str, retries: int = 1, max_wait: float = None, **kwargs):
+        return self.request("POST", url, retries, max_wait, **kwargs)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {name: {k: v for k, v in bucket.items() if k != "probing"}
+                    for name, bucket in self._buckets.items()}
+
+
+# 进程内共享: 所有 CrawlerAgent 实例共用同一份额度
+governor = RateLimitGovernor()
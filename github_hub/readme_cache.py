@@ -0,0 +1,87 @@
+# GitHub Hub - README 缓存 (按 full_name，记录 GitHub blob SHA 与 ETag，条件请求重新验证)
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from .config import README_CONFIG
+
+
+class ReadmeCache:
+    """README text per repo, persisted as gzip JSON files with GitHub's blob SHA and ETag.
+
+    Entries checked within README_CONFIG["revalidate_hours"] are served without
+    a request; older ones are revalidated by the crawler (If-None-Match).
+    A bounded in-memory LRU sits in front of the files.
+    """
+
+    def __init__(self, root: str = None, revalidate_hours: float = None, max_memory: int = None):
+        self.root = root or README_CONFIG["cache_dir"]
+        self.ttl = (revalidate_hours if revalidate_hours is not None else README_CONFIG["revalidate_hours"]) * 3600
+        self.max_memory = max_memory or README_CONFIG["memory_entries"]
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "fetched": 0, "unchanged": 0}
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + ".json.gz")
+
+    def _remember(self, key: str, entry: Dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+
+    def get(self, full_name: str) -> Optional[Dict]:
+        """{"text", "sha", "etag", "checked_at"} or None"""
+        key = full_name.lower()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Crawler] Ignoring unreadable README cache entry for {full_name}: {e}")
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry.get("checked_at", 0) < self.ttl
+
+    def put(self, full_name: str, text: Optional[str], sha: str = None, etag: str = None) -> Dict:
+        """Store a README (text None records that the repo has none)"""
+        key = full_name.lower()
+        entry = {"full_name": full_name, "text": text, "sha": sha, "etag": etag, "checked_at": time.time()}
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._remember(key, entry)
+        return entry
+
+    def touch(self, full_name: str, entry: Dict) -> Dict:
+        """Mark an entry as just revalidated (304 Not Modified / same SHA)"""
+        return self.put(full_name, entry.get("text"), entry.get("sha"), entry.get("etag"))
+
+    def count(self, name: str):
+        """Bump a counter (get_readme runs on the crawl thread pool)"""
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self.counters, "memory_entries": len(self._memory)}
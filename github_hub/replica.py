@@ -0,0 +1,405 @@
+# GitHub Hub - 本地只读副本 (Supabase -> SQLite 增量同步)
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from .config import REPLICA_CONFIG
+from .storage import StorageBackend, TABLE_KEYS
+from .sqlite_backend import SQLiteBackend
+
+# 增量同步流: (表, 时间戳列)。projects.row_updated_at 由主库触发器在每次写入时设置，
+# 覆盖爬取、AI 写入、增长计算等所有变更
+STREAMS = [
+    ("projects", "row_updated_at"),
+    ("analysis_jobs", "updated_at"),
+]
+
+# 小表每次整表镜像
+MIRRORED_TABLES = ["settings", "news_sources"]
+
+
+def _rewind(ts: str, seconds: float) -> str:
+    """Move an ISO timestamp back by seconds (unparseable values are returned as-is)"""
+    try:
+        return (datetime.fromisoformat(ts) - timedelta(seconds=seconds)).isoformat()
+    except (TypeError, ValueError):
+        return ts
+
+
+class ReplicaSync:
+    """Keeps a local SQLite copy of the primary store up to date.
+
+    The first pass copies every table in key order. Later passes only pull
+    rows whose watermark column moved past the last value seen, paging on
+    (timestamp, key) so batches that share one timestamp are not cut short.
+    Deletes are picked up by a periodic id reconciliation.
+    """
+
+    def __init__(self, primary: StorageBackend, replica: SQLiteBackend, config: Dict = None):
+        self.primary = primary
+        self.replica = replica
+        self.config = dict(REPLICA_CONFIG, **(config or {}))
+        self._stop = threading.Event()
+        self._thread = None
+        self._sync_lock = threading.Lock()
+        self.passes = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_success = None       # time.time() of the last completed pass
+        self.last_duration = 0.0
+        self.last_rows = 0
+        self.total_rows = 0
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        """Run sync_once every sync_interval seconds in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="replica-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _loop(self):
+        while True:
+            self.sync_once()
+            if self._stop.wait(self.config["sync_interval"]):
+                break
+
+    # ---------- freshness ----------
+
+    def lag(self) -> Optional[float]:
+        """Seconds since the last successful pass (None before the first one)"""
+        if self.last_success is None:
+            return None
+        return time.time() - self.last_success
+
+    def is_fresh(self) -> bool:
+        lag = self.lag()
+        return lag is not None and lag <= self.config["max_lag_seconds"]
+
+    def stats(self) -> Dict:
+        lag = self.lag()
+        return {
+            "fresh": self.is_fresh(),
+            "lag_seconds": round(lag, 1) if lag is not None else None,
+            "last_sync_at": datetime.fromtimestamp(self.last_success).isoformat() if self.last_success else None,
+            "last_sync_seconds": round(self.last_duration, 3),
+            "last_sync_rows": self.last_rows,
+            "total_rows": self.total_rows,
+            "passes": self.passes,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "watermarks": {f"{table}.{column}": self._watermark(table, column)[0]
+                           for table, column in STREAMS},
+        }
+
+    # ---------- sync ----------
+
+    def sync_once(self) -> int:
+        """One sync pass; returns the number of rows copied (errors are recorded, not raised)"""
+        with self._sync_lock:
+            start = time.perf_counter()
+            try:
+                if self.replica.get_state("initialized") is None:
+                    rows = self._full_copy()
+                else:
+                    rows = sum(self._pull(table, column) for table, column in STREAMS)
+                    rows += self._pull_scan_history()
+                    rows += sum(self._mirror(table) for table in MIRRORED_TABLES)
+                    if self.passes % self.config["reconcile_every"] == 0:
+                        rows += self.reconcile()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                print(f"[Replica] Sync failed (lag {self.lag() or 0:.0f}s): {e}")
+                return 0
+            self.passes += 1
+            self.last_duration = time.perf_counter() - start
+            self.last_rows = rows
+            self.total_rows += rows
+            self.last_success = time.time()
+            if rows:
+                print(f"[Replica] Synced {rows} rows in {self.last_duration * 1000:.0f} ms")
+            return rows
+
+    def _full_copy(self) -> int:
+        """Initial copy of every table in key order; seeds the stream watermarks"""
+        print("[Replica] Initial copy from primary...")
+        rows = 0
+        latest: Dict[tuple, tuple] = {}
+        for table in ["projects", "analysis_jobs", "scan_history"] + MIRRORED_TABLES:
+            key = TABLE_KEYS[table]
+            after = None
+            while True:
+                page = self.primary.select_changed(table, after_key=after, limit=self.config["page_size"])
+                if not page:
+                    break
+                self._store(table, page)
+                rows += len(page)
+                for stream_table, column in STREAMS:
+                    if stream_table != table:
+                        continue
+                    for row in page:
+                        mark = (row.get(column), row[key])
+                        current = latest.get((table, column))
+                        if mark[0] is not None and (current is None or mark > current):
+                            latest[(table, column)] = mark
+                after = page[-1][key]
+                if len(page) < self.config["page_size"]:
+                    break
+        for (table, column), mark in latest.items():
+            self._set_watermark(table, column, mark)
+        self.replica.set_state("initialized", datetime.now().isoformat())
+        print(f"[Replica] Initial copy done: {rows} rows")
+        return rows
+
+    def _pull(self, table: str, column: str) -> int:
+        """Copy rows whose column moved past the stored watermark"""
+        since, _ = self._watermark(table, column)
+        key = TABLE_KEYS[table]
+        # 回退一小段时间重新拉取，避免主库上提交顺序与时间戳顺序不一致时漏行
+        since = _rewind(since, self.config["overlap_seconds"]) if since else None
+        after = None
+        rows = 0
+        while True:
+            page = self.primary.select_changed(table, column, since=since, after_key=after,
+                                               limit=self.config["page_size"])
+            if not page:
+                break
+            self._store(table, page)
+            rows += len(page)
+            since, after = page[-1][column], page[-1][key]
+            self._set_watermark(table, column, (since, after))
+            if len(page) < self.config["page_size"]:
+                break
+        return rows
+
+    def _pull_scan_history(self) -> int:
+        """scan_history is append-only: copy ids above the local maximum"""
+        ids = self.replica.list_keys("scan_history")
+        after = max(ids) if ids else None
+        rows = 0
+        while True:
+            page = self.primary.select_changed("scan_history", after_key=after, limit=self.config["page_size"])
+            if not page:
+                break
+            self._store("scan_history", page)
+            rows += len(page)
+            after = page[-1]["id"]
+            if len(page) < self.config["page_size"]:
+                break
+        return rows
+
+    def _mirror(self, table: str) -> int:
+        """Replace a small table with the primary's copy"""
+        key = TABLE_KEYS[table]
+        page = self.primary.select_changed(table, limit=10000)
+        keys = {row[key] for row in page}
+        stale = [k for k in self.replica.list_keys(table) if k not in keys]
+        if stale:
+            self.replica.delete_rows(table, stale)
+        self._store(table, page)
+        return 0  # 小表每轮都镜像，不计入同步行数
+
+    def reconcile(self) -> int:
+        """Delete replica projects that no longer exist on the primary"""
+        primary_ids = set()
+        after = None
+        page_size = self.config["page_size"] * 10
+        while True:
+            page = self.primary.select_projects("id", limit=page_size, after_id=after, order_by_id=True)
+            primary_ids.update(row["id"] for row in page)
+            if len(page) < page_size:
+                break
+            after = page[-1]["id"]
+        stale = [pid for pid in self.replica.list_keys("projects") if pid not in primary_ids]
+        if stale:
+            # analysis_jobs 通过外键 ON DELETE CASCADE 一并删除
+            self.replica.delete_rows("projects", stale)
+            print(f"[Replica] Removed {len(stale)} projects deleted on primary")
+        return len(stale)
+
+    def _store(self, table: str, rows: List[Dict]):
+        if table == "analysis_jobs":
+            # 对应项目尚未同步过来的任务留到下一轮 (外键约束)
+            present = {row["id"] for row in self.replica.get_projects_by_ids(
+                [row["project_id"] for row in rows], "id")}
+            rows = [row for row in rows if row["project_id"] in present]
+        self.replica.replace_rows(table, rows)
+
+    def _watermark(self, table: str, column: str) -> tuple:
+        value = self.replica.get_state(f"watermark:{table}.{column}")
+        return tuple(json.loads(value)) if value else (None, None)
+
+    def _set_watermark(self, table: str, column: str, mark: tuple):
+        self.replica.set_state(f"watermark:{table}.{column}", json.dumps(list(mark)))
+
+
+class ReplicatedBackend(StorageBackend):
+    """Primary store with an in-process SQLite read replica.
+
+    Reads are served by the replica while it is fresh (last successful sync
+    within max_lag_seconds) and by the primary otherwise. Writes go to the
+    primary and are then applied to the replica too, so this process reads
+    its own writes before the next sync pass.
+    """
+
+    name = "replicated"
+
+    def __init__(self, primary: StorageBackend, replica: SQLiteBackend = None,
+                 config: Dict = None, start: bool = True):
+        self.primary = primary
+        self.replica = replica or SQLiteBackend(REPLICA_CONFIG["path"])
+        self.sync = ReplicaSync(self.primary, self.replica, config)
+        self.replica_reads = 0
+        self.primary_reads = 0
+        if start:
+            self.sync.start()
+
+    def _reader(self) -> StorageBackend:
+        if self.sync.is_fresh():
+            self.replica_reads += 1
+            return self.replica
+        self.primary_reads += 1
+        return self.primary
+
+    def _mirror(self, method: str, *args):
+        """Apply a write the primary accepted to the replica (best effort; sync repairs misses)"""
+        try:
+            getattr(self.replica, method)(*args)
+        except Exception as e:
+            print(f"[Replica] Could not mirror {method}: {e}")
+
+    # ---------- projects ----------
+
+    def upsert_projects(self, rows: List[Dict]):
+        self.primary.upsert_projects(rows)
+        self._mirror("upsert_projects", rows)
+
+    def update_projects(self, project_ids: List[str], fields: Dict):
+        self.primary.update_projects(project_ids, fields)
+        self._mirror("update_projects", project_ids, fields)
+
+    def patch_projects(self, patches: Dict[str, Dict]):
+        self.primary.patch_projects(patches)
+        self._mirror("patch_projects", patches)
+
+    def delete_project(self, project_id: str):
+        self.primary.delete_project(project_id)
+        self._mirror("delete_project", project_id)
+
+    def select_projects(self, columns: str = "*", filters: Dict = None, limit: int = None,
+                        after_id: str = None, order_by_id: bool = False) -> List[Dict]:
+        return self._reader().select_projects(columns, filters, limit, after_id, order_by_id)
+
+    def get_projects_by_ids(self, project_ids: List[str], columns: str = "*") -> List[Dict]:
+        return self._reader().get_projects_by_ids(project_ids, columns)
+
+    def search_projects(self, query: str, columns: str = "*", limit: int = 20,
+                        offset: int = 0) -> List[Dict]:
+        return self._reader().search_projects(query, columns, limit, offset)
+
+    def project_stats(self, target_model: str) -> Dict:
+        return self._reader().project_stats(target_model)
+
+    def projects_needing_analysis(self, limit: int, target_model: str) -> List[Dict]:
+        return self.primary.projects_needing_analysis(limit, target_model)
+
+    def rising_projects(self, column: str, limit: int, category: str = None,
+                        columns: str = "*") -> List[Dict]:
+        return self._reader().rising_projects(column, limit, category, columns)
+
+    # ---------- star history (kept on the primary only) ----------
+
+    def insert_star_snapshots(self, rows: List[Dict]):
+        self.primary.insert_star_snapshots(rows)
+
+    def select_star_snapshots(self, since: str, after: tuple = None, limit: int = 5000) -> List[Dict]:
+        return self.primary.select_star_snapshots(since, after, limit)
+
+    # 正文只在主库: 按单个项目读取，不进入副本
+    def put_content(self, rows: List[Dict]):
+        self.primary.put_content(rows)
+
+    def get_content(self, project_id: str, kinds: List[str] = None, with_data: bool = True) -> List[Dict]:
+        return self.primary.get_content(project_id, kinds, with_data)
+
+    def get_content_for(self, project_ids: List[str], kinds: List[str] = None) -> List[Dict]:
+        return self.primary.get_content_for(project_ids, kinds)
+
+    def delete_content(self, project_id: str, kinds: List[str]):
+        self.primary.delete_content(project_id, kinds)
+
+    # ---------- analysis queue (leases are only ever taken on the primary) ----------
+
+    def enqueue_analysis_jobs(self, project_ids: List[str], target_model: str) -> int:
+        queued = self.primary.enqueue_analysis_jobs(project_ids, target_model)
+        self._mirror("enqueue_analysis_jobs", project_ids, target_model)
+        return queued
+
+    def claim_analysis_jobs(self, worker: str, n: int, lease_seconds: int,
+                            max_attempts: int) -> List[Dict]:
+        return self.primary.claim_analysis_jobs(worker, n, lease_seconds, max_attempts)
+
+    def fail_analysis_job(self, project_id: str, worker: str, error: str, max_attempts: int):
+        self.primary.fail_analysis_job(project_id, worker, error, max_attempts)
+
+    def set_jobs_status(self, project_ids: List[str], worker: str, status: str):
+        self.primary.set_jobs_status(project_ids, worker, status)
+
+    # ---------- scan history / settings / news sources ----------
+
+    def insert_scan(self, data: Dict):
+        self.primary.insert_scan(data)
+
+    def recent_scans(self, limit: int) -> List[Dict]:
+        return self._reader().recent_scans(limit)
+
+    def get_setting(self, key: str) -> Optional[str]:
+        return self._reader().get_setting(key)
+
+    def set_setting(self, key: str, value: str):
+        self.primary.set_setting(key, value)
+        self._mirror("set_setting", key, value)
+
+    def list_news_sources(self) -> List[Dict]:
+        return self._reader().list_news_sources()
+
+    def add_news_source(self, name: str, url: str):
+        self.primary.add_news_source(name, url)
+
+    def delete_news_source(self, source_id: int):
+        self.primary.delete_news_source(source_id)
+
+    def touch_news_source(self, source_id: int, now: str):
+        self.primary.touch_news_source(source_id, now)
+
+    # ---------- change feed / lifecycle ----------
+
+    def select_changed(self, table: str, ts_column: str = None, since: str = None,
+                       after_key=None, limit: int = 500) -> List[Dict]:
+        return self.primary.select_changed(table, ts_column, since, after_key, limit)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "primary": self.primary.name,
+            "replica": dict(self.sync.stats(), path=self.replica.db_path,
+                            reads=self.replica_reads, primary_reads=self.primary_reads),
+        }
+
+    def clear(self):
+        self.primary.clear()
+        self._mirror("clear")
+
+    def close(self):
+        self.sync.stop()
+        self.primary.close()
+        self.replica.close()
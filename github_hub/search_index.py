@@ -0,0 +1,215 @@
+# GitHub Hub - 本地全文检索索引 (BM25F 倒排索引)
+import bisect
+import math
+import re
+import threading
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_WORD_RE = re.compile(r"\w+")
+
+# 中日韩文字 (CJK 统一表意文字及扩展 A、兼容表意文字、假名、谚文)
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"
+_CJK_RE = re.compile(f"([{_CJK}]+)|([^\\W{_CJK}]+)")
+
+
+def tokenize_words(text: str) -> List[str]:
+    """Lower-cased word tokens (whitespace/punctuation split)"""
+    if not text:
+        return []
+    return _WORD_RE.findall(text.lower())
+
+
+def tokenize(text: str) -> List[str]:
+    """CJK-aware tokens: character bigrams for CJK runs, words for everything else.
+    
+    Unsegmented Chinese has no spaces, so "本地知识库" becomes
+    ["本地", "地知", "知识", "识库"] and a query for "知识库" matches on its
+    bigrams. Single-character runs are kept as unigrams.
+    """
+    if not text:
+        return []
+    tokens = []
+    for cjk, word in _CJK_RE.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+TOKENIZERS = {
+    "cjk_bigram": tokenize,
+    "word": tokenize_words,
+}
+
+
+def _field_text(value) -> str:
+    """Flatten list fields (topics) into plain text"""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return value or ""
+
+
+class SearchIndex:
+    """In-memory inverted index with BM25F ranking over weighted fields.
+
+    Each document keeps its raw field texts so partial updates (e.g. only
+    ai_summary changed) can re-index one document without a database read.
+    Postings store raw per-field term frequencies; field weights and length
+    normalisation against the current average field length are applied at
+    query time, so scores do not depend on insertion order. A query only
+    walks the postings of its own terms.
+    """
+
+    def __init__(self, field_weights: Dict[str, float], k1: float = 1.2, b: float = 0.75,
+                 tokenizer: str = "cjk_bigram"):
+        self.tokenize = TOKENIZERS[tokenizer]
+        self.fields = list(field_weights)
+        self.weights = [field_weights[f] for f in self.fields]
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs: Dict[str, List[str]] = {}           # doc_id -> field texts
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}  # doc_id -> indexed terms
+        self._postings: Dict[str, Dict[str, Tuple[int, ...]]] = {}  # term -> {doc_id: per-field tf}
+        self._len_sums = [0] * len(self.fields)
+        self._doc_lens: Dict[str, List[int]] = {}
+        self._vocab: Optional[List[str]] = None           # sorted terms for prefix lookups
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id: str, doc: Dict):
+        """Index (or re-index) a document from a row dict"""
+        texts = [_field_text(doc.get(f)) for f in self.fields]
+        with self._lock:
+            self._remove(doc_id)
+            self._index(doc_id, texts)
+
+    def upsert(self, doc_id: str, fields: Dict):
+        """Add a new document, or re-index only the given fields of a known one"""
+        with self._lock:
+            if doc_id in self._docs:
+                self.update(doc_id, fields)
+            else:
+                self.add(doc_id, fields)
+
+    def update(self, doc_id: str, fields: Dict):
+        """Re-index only the given fields of a known document"""
+        if not any(f in fields for f in self.fields):
+            return
+        with self._lock:
+            texts = self._docs.get(doc_id)
+            if texts is None:
+                return
+            texts = list(texts)
+            for i, f in enumerate(self.fields):
+                if f in fields:
+                    texts[i] = _field_text(fields[f])
+            self._remove(doc_id)
+            self._index(doc_id, texts)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove(doc_id)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[Tuple[str, float]], int]:
+        """Return ([(doc_id, score), ...] for the requested page, total matches)"""
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return [], 0
+            avg_lens = [s / n_docs or 1 for s in self._len_sums]
+            scores: Dict[str, float] = {}
+            for term in set(self.tokenize(query)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    weighted = {doc_id: self._weighted_tf(doc_id, tfs, avg_lens)
+                                for doc_id, tfs in postings.items()}
+                else:
+                    weighted = self._prefix_postings(term, avg_lens)
+                if not weighted:
+                    continue
+                df = len(weighted)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                k1 = self.k1
+                for doc_id, wtf in weighted.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * wtf * (k1 + 1) / (wtf + k1)
+
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda kv: kv[1])
+        return top[offset:], len(scores)
+
+    # ---------- internals ----------
+
+    def _weighted_tf(self, doc_id: str, tfs: Tuple[int, ...], avg_lens: List[float]) -> float:
+        """BM25F pseudo term frequency: field weights times length-normalised tf"""
+        lens = self._doc_lens[doc_id]
+        b = self.b
+        return sum(self.weights[i] * tf / (1 - b + b * lens[i] / avg_lens[i])
+                   for i, tf in enumerate(tfs) if tf)
+
+    def _index(self, doc_id: str, texts: List[str]):
+        field_tokens = [self.tokenize(t) for t in texts]
+        lens = [len(tokens) for tokens in field_tokens]
+        for i, length in enumerate(lens):
+            self._len_sums[i] += length
+
+        n_fields = len(self.fields)
+        counts: Dict[str, List[int]] = {}
+        for i, tokens in enumerate(field_tokens):
+            for term in tokens:
+                tfs = counts.get(term)
+                if tfs is None:
+                    tfs = counts[term] = [0] * n_fields
+                tfs[i] += 1
+
+        for term, tfs in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocab = None
+            postings[doc_id] = tuple(tfs)
+        self._docs[doc_id] = texts
+        self._doc_terms[doc_id] = tuple(counts)
+        self._doc_lens[doc_id] = lens
+
+    def _remove(self, doc_id: str):
+        if doc_id not in self._docs:
+            return
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+                    self._vocab = None
+        for i, length in enumerate(self._doc_lens.pop(doc_id)):
+            self._len_sums[i] -= length
+        del self._docs[doc_id]
+
+    def _prefix_postings(self, prefix: str, avg_lens: List[float], max_terms: int = 50) -> Dict[str, float]:
+        """Merge weighted tfs of vocabulary terms starting with prefix (e.g. 'lang' -> 'langchain')"""
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        merged: Dict[str, float] = {}
+        i = bisect.bisect_left(self._vocab, prefix)
+        for term in self._vocab[i:i + max_terms]:
+            if not term.startswith(prefix):
+                break
+            for doc_id, tfs in self._postings[term].items():
+                wtf = self._weighted_tf(doc_id, tfs, avg_lens)
+                if wtf > merged.get(doc_id, 0.0):
+                    merged[doc_id] = wtf
+        return merged
+
+
+def build_index(rows: Iterable[Dict], field_weights: Dict[str, float],
+                k1: float = 1.2, b: float = 0.75, tokenizer: str = "cjk_bigram") -> SearchIndex:
+    """Build a fresh index from an iterable of project rows"""
+    index = SearchIndex(field_weights, k1=k1, b=b, tokenizer=tokenizer)
+    for row in rows:
+        index.add(str(row["id"]), row)
+    return index
@@ -1,11 +1,21 @@
 # GitHub Hub - Flask Web Server
-from flask import Flask, jsonify, request, send_from_directory, Response
+from flask import Flask, jsonify, request, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import json
+import os
 import queue
+import tempfile
 import threading
 from .master import MasterAgent
+from .archive import ArchiveEngine
+from .database import Database
+from .export import FORMATS, iter_ndjson, gzip_chunks, write_columnar
+from .history import HistoryIndex
 from .config import CATEGORIES
+from .storage import parse_columns
+from .ratelimit import governor
+from .http_cache import http_cache
+from .http_client import http_client
 
 app = Flask(__name__, static_folder='static')
 CORS(app)
@@ -42,50 +52,130 @@ def get_categories():
 def get_projects(category):
     """获取某分类的项目列表"""
     limit = request.args.get('limit', 100, type=int)
-    projects = master.db.get_projects_by_category(category, limit)
+    # 列表只返回卡片字段，教程等大文本在打开项目时再加载
+    projects = master.db.get_projects_by_category(category, limit, projection="card")
     
     # Supabase JSONB fields are already Python objects, no parsing needed
     return jsonify(projects)
 
+@app.route('/api/rising')
+def get_rising():
+    """获取增长最快的项目 (基于 star 快照，无需调用 GitHub API)"""
+    window = request.args.get('window', '7d')
+    limit = request.args.get('limit', 50, type=int)
+    category = request.args.get('category')
+    try:
+        projects = master.db.get_rising_projects(window, limit, category)
+    except KeyError:
+        return jsonify({"error": f"Unknown window: {window}"}), 400
+    return jsonify(projects)
+
 @app.route('/api/export')
 def export_data():
-    """导出所有数据到 JSON"""
+    """流式导出项目: ?format=ndjson|parquet|arrow&fields=card|detail|<列,...>&gzip=1"""
+    fmt = request.args.get('format', 'ndjson')
+    fields = request.args.get('fields', 'detail')
+    compress = request.args.get('gzip', '0') in ('1', 'true')
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Unknown format: {fmt}"}), 400
     try:
-        projects = master.db.get_all_projects()
-        
-        # 解析 JSON 字段
-        for p in projects:
-            for field in ['topics', 'ai_tech_stack', 'ai_use_cases']:
-                if p.get(field):
-                    try:
-                        p[field] = json.loads(p[field])
-                    except:
-                        p[field] = []
+        parse_columns(Database._columns(fields))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    mimetype, suffix = FORMATS[fmt]
+    filename = "github_projects_export" + suffix
+    headers = {}
+    # 分页迭代读取，内存占用不随数据量增长
+    # 教程/README 等正文存放在 content store，逐页合并回导出行
+    rows = master.db.iter_projects(columns=fields, with_content=True)
+    
+    if fmt == "ndjson":
+        chunks = iter_ndjson(rows)
+        if compress:
+            chunks = gzip_chunks(chunks)
+            filename += ".gz"
+            mimetype = "application/gzip"
+    else:
+        # 列式文件需最后写 footer，先写临时文件再分块发送
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        try:
+            write_columnar(rows, path, Database._columns(fields), fmt)
+        except Exception as e:
+            os.remove(path)
+            return jsonify({"error": str(e)}), 503 if isinstance(e, RuntimeError) else 500
         
-        # 保存到文件
-        export_path = "github_projects_export.json"
-        with open(export_path, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, ensure_ascii=False, indent=2)
-            
-        return jsonify({
-            "status": "success", 
-            "message": f"已导出 {len(projects)} 个项目到 {export_path}",
-            "path": export_path,
-            "count": len(projects)
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        def chunks():
+            try:
+                with open(path, 'rb') as f:
+                    while True:
+                        block = f.read(256 * 1024)
+                        if not block:
+                            break
+                        yield block
+            finally:
+                os.remove(path)
+        chunks = chunks()
+    
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    # 不设置 Content-Length，按 chunked 传输，首字节立即返回
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+@app.route('/api/archive')
+def list_archives():
+    """列出已归档的日期"""
+    engine = ArchiveEngine()
+    return jsonify([{"date": day, "kind": kind} for day, kind in engine.days()])
+
+@app.route('/api/archive/<day>')
+def get_archive(day):
+    """按日期重建归档的项目列表 (base + delta 回放)"""
+    category = request.args.get('category')
+    try:
+        rows = ArchiveEngine().iter_day(day)
+        projects = [p for p in rows if not category or p.get('category') == category]
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify(projects)
+
+
+@app.route('/api/history')
+def get_history():
+    """归档历史查询: ?project=<id|full_name> 返回 star 曲线；?start=&end=[&category=] 返回区间增长榜"""
+    try:
+        # 只读打开；索引由 archive_data 在归档后更新
+        history = HistoryIndex.open()
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    field = request.args.get('field', 'stars')
+    project = request.args.get('project')
+    start, end = request.args.get('start'), request.args.get('end')
+    try:
+        if project:
+            project_id = history.find(project)
+            if project_id is None:
+                return jsonify({"error": "Not found"}), 404
+            return jsonify({"id": project_id, "first_seen": history.first_seen(project_id),
+                            "series": history.series(project_id, field)})
+        if start and end:
+            return jsonify(history.top_gainers(start, end, field, request.args.get('category'),
+                                               request.args.get('limit', 20, type=int)))
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0])}), 400
+    return jsonify({"days": history.days, "projects": len(history.ids)})
 
 
 @app.route('/api/project/<project_id>')
 def get_project(project_id):
     """获取单个项目详情"""
-    project = master.db.get_project(project_id)
+    project = master.db.get_project(project_id, projection="detail")
     if not project:
         return jsonify({"error": "Not found"}), 404
-    # 解析 JSON 字段
+    # 解析 JSON 字段 (Supabase JSONB 已是列表，只处理旧数据中的字符串)
     for field in ['topics', 'ai_tech_stack', 'ai_use_cases']:
-        if project.get(field):
+        if isinstance(project.get(field), str):
             try:
                 project[field] = json.loads(project[field])
             except:
@@ -212,8 +302,9 @@ def search_local():
     data = request.json
     query = data.get('query', '')
     limit = data.get('limit', 20)
+    offset = data.get('offset', 0)
     
-    results = master.db.search_projects(query, limit=limit)
+    results = master.db.search_projects(query, limit=limit, offset=offset, projection="card")
     return jsonify({"results": results})
 
 @app.route('/api/search/remote', methods=['POST'])
@@ -364,6 +455,22 @@ def get_stats():
     """获取统计信息"""
     return jsonify(master.db.get_stats())
 
+@app.route('/api/cache')
+def get_cache_stats():
+    """获取读缓存命中统计"""
+    return jsonify(master.db.cache_stats())
+
+@app.route('/api/storage')
+def get_storage_stats():
+    """获取存储后端状态 (本地副本同步延迟等)"""
+    return jsonify(master.db.storage_stats())
+
+@app.route('/api/ratelimit')
+def get_ratelimit():
+    """获取 GitHub API 各额度 (core/search) 的剩余量、等待统计、响应缓存命中与连接复用情况"""
+    return jsonify({"ratelimit": governor.stats(), "http_cache": http_cache.stats(),
+                    "connections": http_client.stats()})
+
 @app.route('/api/pending')
 def get_pending():
     """获取待分析项目数量"""
@@ -0,0 +1,628 @@
+# GitHub Hub - SQLite Storage Backend (本地嵌入式，WAL 模式)
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from .config import SQLITE_CONFIG, ANALYSIS_CONFIG
+from .storage import StorageBackend, PROJECT_COLUMNS, JSON_COLUMNS, TABLE_KEYS, parse_columns
+
+# 与 supabase_schema.sql 对应的表结构 (JSONB -> JSON 文本, TIMESTAMPTZ -> ISO 文本)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    stars INTEGER DEFAULT 0,
+    forks INTEGER DEFAULT 0,
+    description TEXT,
+    url TEXT,
+    homepage TEXT,
+    language TEXT,
+    topics TEXT DEFAULT '[]',
+    created_at TEXT,
+    updated_at TEXT,
+    readme_content TEXT,
+    ai_summary TEXT,
+    ai_tech_stack TEXT DEFAULT '[]',
+    ai_use_cases TEXT DEFAULT '[]',
+    ai_difficulty INTEGER,
+    ai_quick_start TEXT,
+    ai_tutorial TEXT,
+    has_tutorial INTEGER DEFAULT 0,
+    last_scanned TEXT,
+    last_analyzed TEXT,
+    recent_stars_growth INTEGER DEFAULT 0,
+    ai_rag_summary TEXT,
+    ai_visual_summary TEXT,
+    screenshot TEXT,
+    ai_model_name TEXT,
+    content_fingerprint TEXT,
+    stars_growth_1d INTEGER DEFAULT 0,
+    stars_growth_7d INTEGER DEFAULT 0,
+    stars_growth_30d INTEGER DEFAULT 0,
+    stars_acceleration INTEGER DEFAULT 0,
+    growth_updated_at TEXT,
+    row_updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS star_snapshots (
+    project_id TEXT NOT NULL,
+    captured_at TEXT NOT NULL,
+    stars INTEGER NOT NULL,
+    forks INTEGER,
+    PRIMARY KEY (project_id, captured_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS project_content (
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    codec TEXT NOT NULL DEFAULT 'zlib',
+    data BLOB NOT NULL,
+    size INTEGER,
+    updated_at TEXT,
+    PRIMARY KEY (project_id, kind)
+);
+
+CREATE TABLE IF NOT EXISTS scan_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT,
+    scan_time TEXT,
+    projects_found INTEGER,
+    projects_new INTEGER,
+    status TEXT
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS news_sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    last_scanned TEXT,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    project_id TEXT PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'pending',
+    priority INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    enqueued_at TEXT,
+    updated_at TEXT
+);
+
+-- 仅本地使用: 同步水位等元数据 (不存在于 Supabase)
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 列补齐之后再建索引 (旧版 data/projects.db 缺少 ai_model_name 等列)
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_projects_category ON projects(category);
+CREATE INDEX IF NOT EXISTS idx_projects_model_name ON projects(ai_model_name);
+CREATE INDEX IF NOT EXISTS idx_projects_growth_7d ON projects(stars_growth_7d DESC);
+CREATE INDEX IF NOT EXISTS idx_star_snapshots_captured ON star_snapshots(captured_at);
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_pending ON analysis_jobs(priority DESC, enqueued_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_lease ON analysis_jobs(lease_expires_at) WHERE status = 'leased';
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs(status);
+CREATE INDEX IF NOT EXISTS idx_projects_row_updated ON projects(row_updated_at, id);
+
+-- row_updated_at: 每次写入时由触发器打上 (UTC)，作为副本/迁移的变更水位。
+-- 写入方显式给出的值 (从主库复制来的行) 保持不变；recursive_triggers 默认关闭，内部 UPDATE 不会再触发
+CREATE TRIGGER IF NOT EXISTS projects_row_updated_insert AFTER INSERT ON projects
+WHEN NEW.row_updated_at IS NULL
+BEGIN
+    UPDATE projects SET row_updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.id;
+END;
+"""
+
+# UPDATE 触发器按列表生成 (UPDATE OF 除这两列外的所有列): 扫描时只刷新 last_scanned
+# 的批量 touch 不算行变更，否则副本每次扫描后都要重新拷贝整张表
+_TOUCH_ONLY_COLUMNS = ("last_scanned", "row_updated_at")
+_ROW_UPDATED_TRIGGER = """
+DROP TRIGGER IF EXISTS projects_row_updated_update;
+CREATE TRIGGER projects_row_updated_update AFTER UPDATE OF {columns} ON projects
+WHEN NEW.row_updated_at IS OLD.row_updated_at
+BEGIN
+    UPDATE projects SET row_updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now') WHERE id = NEW.id;
+END;
+"""
+
+_COLUMN_TYPES = {"stars": "INTEGER DEFAULT 0", "forks": "INTEGER DEFAULT 0", "ai_difficulty": "INTEGER",
+                 "has_tutorial": "INTEGER DEFAULT 0", "recent_stars_growth": "INTEGER DEFAULT 0",
+                 "stars_growth_1d": "INTEGER DEFAULT 0", "stars_growth_7d": "INTEGER DEFAULT 0",
+                 "stars_growth_30d": "INTEGER DEFAULT 0", "stars_acceleration": "INTEGER DEFAULT 0"}
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded SQLite store for offline runs and local benchmarks.
+
+    One connection per thread (sqlite3 connections are not shareable), WAL so
+    readers never block the single writer, and fixed parameterised SQL so each
+    connection's statement cache reuses the prepared statements.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        # 线程 -> 连接; 新连接打开时关闭已结束线程留下的连接
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._conn_lock = threading.Lock()
+        self._table_columns: Dict[str, set] = {}
+        self._init_schema()
+        print(f"[DB] Using SQLite database: {db_path}")
+
+    # ---------- connections ----------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False,
+                                   timeout=SQLITE_CONFIG["busy_timeout_ms"] / 1000,
+                                   cached_statements=SQLITE_CONFIG["cached_statements"])
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(SQLITE_CONFIG['busy_timeout_ms'])}")
+            conn.execute(f"PRAGMA cache_size=-{int(SQLITE_CONFIG['cache_size_kb'])}")
+            conn.execute(f"PRAGMA mmap_size={int(SQLITE_CONFIG['mmap_size'])}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._conn_lock:
+                dead = [t for t in self._connections if not t.is_alive()]
+                stale = [self._connections.pop(t) for t in dead]
+                self._connections[threading.current_thread()] = conn
+            self._close_all(stale)
+        return conn
+
+    @staticmethod
+    def _close_all(connections: List[sqlite3.Connection]):
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"[DB] Error closing SQLite connection: {e}")
+
+    def connection_count(self) -> int:
+        """Open per-thread connections (dead threads are pruned on the next connect)"""
+        with self._conn_lock:
+            return len(self._connections)
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT: takes the write lock up front (no upgrade deadlocks)"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _init_schema(self):
+        conn = self._conn()
+        has_queue = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analysis_jobs'").fetchone()
+        conn.executescript(SCHEMA)
+        # 旧版本地库: 补齐缺失列
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(projects)")}
+        for column in PROJECT_COLUMNS:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE projects ADD COLUMN {column} {_COLUMN_TYPES.get(column, 'TEXT')}")
+                if column == "has_tutorial":
+                    conn.execute("UPDATE projects SET has_tutorial = (ai_tutorial IS NOT NULL AND ai_tutorial <> '')")
+                print(f"[DB] Added missing column projects.{column}")
+        conn.executescript(INDEXES)
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(projects)")
+                   if row["name"] not in _TOUCH_ONLY_COLUMNS]
+        conn.executescript(_ROW_UPDATED_TRIGGER.format(columns=", ".join(columns)))
+        if not has_queue:
+            # 新建队列表: 回填所有尚未被目标模型分析的项目 (未分析的优先)
+            now = _now()
+            conn.execute(
+                "INSERT OR IGNORE INTO analysis_jobs (project_id, priority, enqueued_at, updated_at) "
+                "SELECT id, CASE WHEN ai_summary IS NULL THEN 10 ELSE 0 END, ?, ? FROM projects "
+                "WHERE ai_model_name IS NULL OR ai_model_name NOT LIKE ?",
+                (now, now, f"%{ANALYSIS_CONFIG['target_model']}%"))
+
+    # ---------- row conversion ----------
+
+    @staticmethod
+    def _encode(column: str, value):
+        if column in JSON_COLUMNS and value is not None and not isinstance(value, str):
+            return json.dumps(value, ensure_ascii=False)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict:
+        data = dict(row)
+        for column in JSON_COLUMNS:
+            value = data.get(column)
+            if isinstance(value, str):
+                try:
+                    data[column] = json.loads(value) if value else []
+                except ValueError:
+                    pass
+        if "has_tutorial" in data:
+            data["has_tutorial"] = bool(data["has_tutorial"])
+        return data
+
+    @staticmethod
+    def _where(filters: Dict, clauses: List[str], params: List):
+        for column, value in (filters or {}).items():
+            parse_columns(column)
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                clauses.append(f"{column} IN ({','.join('?' * len(value))})" if value else "0")
+                params.extend(value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+    def _select(self, sql: str, params=()) -> List[Dict]:
+        return [self._decode(row) for row in self._conn().execute(sql, params)]
+
+    # ---------- projects ----------
+
+    def upsert_projects(self, rows: List[Dict]):
+        # 按列集合分组，同一组复用同一条预编译语句 (executemany)
+        groups: Dict[tuple, List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+        with self._transaction() as conn:
+            for columns, group in groups.items():
+                parse_columns(",".join(columns))
+                updates = ",".join(f"{c}=excluded.{c}" for c in columns if c != "id")
+                sql = (f"INSERT INTO projects ({','.join(columns)}) VALUES ({','.join('?' * len(columns))}) "
+                       f"ON CONFLICT(id) DO UPDATE SET {updates}")
+                conn.executemany(sql, [[self._encode(c, row[c]) for c in columns] for row in group])
+
+    def update_projects(self, project_ids: List[str], fields: Dict):
+        columns = parse_columns(",".join(fields))
+        sql = f"UPDATE projects SET {','.join(f'{c}=?' for c in columns)} WHERE id = ?"
+        values = [self._encode(c, fields[c]) for c in columns]
+        with self._transaction() as conn:
+            conn.executemany(sql, [values + [pid] for pid in project_ids])
+
+    def patch_projects(self, patches: Dict[str, Dict]):
+        with self._transaction() as conn:
+            for pid, fields in patches.items():
+                columns = parse_columns(",".join(fields))
+                conn.execute(f"UPDATE projects SET {','.join(f'{c}=?' for c in columns)} WHERE id = ?",
+                             [self._encode(c, fields[c]) for c in columns] + [pid])
+
+    def delete_project(self, project_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    def select_projects(self, columns: str = "*", filters: Dict = None, limit: int = None,
+                        after_id: str = None, order_by_id: bool = False) -> List[Dict]:
+        clauses, params = [], []
+        self._where(filters, clauses, params)
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        sql = f"SELECT {','.join(parse_columns(columns))} FROM projects"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by_id:
+            sql += " ORDER BY id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._select(sql, params)
+
+    def get_projects_by_ids(self, project_ids: List[str], columns: str = "*") -> List[Dict]:
+        return self.select_projects(columns, filters={"id": list(project_ids)})
+
+    def search_projects(self, query: str, columns: str = "*", limit: int = 20,
+                        offset: int = 0) -> List[Dict]:
+        pattern = f"%{query}%"
+        return self._select(
+            f"SELECT {','.join(parse_columns(columns))} FROM projects "
+            "WHERE name LIKE ? OR description LIKE ? OR ai_rag_summary LIKE ? LIMIT ? OFFSET ?",
+            (pattern, pattern, pattern, limit, offset))
+
+    def project_stats(self, target_model: str) -> Dict:
+        conn = self._conn()
+        # 与 Supabase 版本一致: 子串匹配只作用于少量不同的模型名 (走索引)，计数用等值条件
+        categories = {row["category"]: row["n"] for row in conn.execute(
+            "SELECT category, COUNT(*) AS n FROM projects GROUP BY category")}
+        models = [row[0] for row in conn.execute(
+            "SELECT DISTINCT ai_model_name FROM projects WHERE ai_model_name LIKE ?", (f"%{target_model}%",))]
+        analyzed = conn.execute(
+            f"SELECT COUNT(*) FROM projects WHERE ai_model_name IN ({','.join('?' * len(models))})",
+            models).fetchone()[0] if models else 0
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM analysis_jobs WHERE status IN ('pending', 'leased')").fetchone()[0]
+        return {"total": sum(categories.values()), "analyzed": analyzed,
+                "pending": pending, "categories": categories}
+
+    def projects_needing_analysis(self, limit: int, target_model: str) -> List[Dict]:
+        pending = self._select("SELECT * FROM projects WHERE ai_summary IS NULL LIMIT ?", (limit,))
+        if len(pending) < limit:
+            pending.extend(self._select(
+                "SELECT * FROM projects WHERE ai_summary IS NOT NULL "
+                "AND (ai_model_name IS NULL OR ai_model_name NOT LIKE ?) LIMIT ?",
+                (f"%{target_model}%", limit - len(pending))))
+        return pending
+
+    def rising_projects(self, column: str, limit: int, category: str = None,
+                        columns: str = "*") -> List[Dict]:
+        parse_columns(column)
+        sql = f"SELECT {','.join(parse_columns(columns))} FROM projects WHERE {column} > 0"
+        params: List = []
+        if category:
+            sql += " AND category = ?"
+            params.append(category)
+        params.append(limit)
+        return self._select(f"{sql} ORDER BY {column} DESC, stars DESC LIMIT ?", params)
+
+    # ---------- star history ----------
+
+    def insert_star_snapshots(self, rows: List[Dict]):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO star_snapshots (project_id, captured_at, stars, forks) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(project_id, captured_at) DO NOTHING",
+                [(r["project_id"], r["captured_at"], r["stars"], r.get("forks")) for r in rows])
+
+    def select_star_snapshots(self, since: str, after: tuple = None, limit: int = 5000) -> List[Dict]:
+        if after is None:
+            return self._select(
+                "SELECT project_id, captured_at, stars FROM star_snapshots WHERE captured_at >= ? "
+                "ORDER BY project_id, captured_at LIMIT ?", (since, limit))
+        project_id, captured_at = after
+        return self._select(
+            "SELECT project_id, captured_at, stars FROM star_snapshots WHERE captured_at >= ? "
+            "AND (project_id > ? OR (project_id = ? AND captured_at > ?)) "
+            "ORDER BY project_id, captured_at LIMIT ?", (since, project_id, project_id, captured_at, limit))
+
+    # ---------- content store ----------
+
+    def put_content(self, rows: List[Dict]):
+        now = _now()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO project_content (project_id, kind, content_hash, codec, data, size, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(project_id, kind) DO UPDATE SET "
+                "content_hash = excluded.content_hash, codec = excluded.codec, data = excluded.data, "
+                "size = excluded.size, updated_at = excluded.updated_at",
+                [(r["project_id"], r["kind"], r["content_hash"], r["codec"], r["data"], r["size"], now)
+                 for r in rows])
+
+    def get_content(self, project_id: str, kinds: List[str] = None, with_data: bool = True) -> List[Dict]:
+        columns = "project_id, kind, content_hash, codec, size" + (", data" if with_data else "")
+        sql, params = f"SELECT {columns} FROM project_content WHERE project_id = ?", [project_id]
+        if kinds:
+            sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params += list(kinds)
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def get_content_for(self, project_ids: List[str], kinds: List[str] = None) -> List[Dict]:
+        if not project_ids:
+            return []
+        sql = ("SELECT project_id, kind, content_hash, codec, size, data FROM project_content "
+               f"WHERE project_id IN ({','.join('?' * len(project_ids))})")
+        params = list(project_ids)
+        if kinds:
+            sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params += list(kinds)
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def delete_content(self, project_id: str, kinds: List[str]):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM project_content WHERE project_id = ? AND kind = ?",
+                             [(project_id, kind) for kind in kinds])
+
+    # ---------- analysis queue ----------
+
+    def enqueue_analysis_jobs(self, project_ids: List[str], target_model: str) -> int:
+        now = _now()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO analysis_jobs (project_id, priority, enqueued_at, updated_at) "
+                "SELECT id, CASE WHEN ai_summary IS NULL THEN 10 ELSE 0 END, ?, ? FROM projects "
+                "WHERE id = ? AND (ai_model_name IS NULL OR ai_model_name NOT LIKE ?) "
+                "ON CONFLICT(project_id) DO NOTHING",
+                [(now, now, pid, f"%{target_model}%") for pid in project_ids])
+            return conn.total_changes - before
+
+    def claim_analysis_jobs(self, worker: str, n: int, lease_seconds: int,
+                            max_attempts: int) -> List[Dict]:
+        now = datetime.now()
+        expires = (now + timedelta(seconds=lease_seconds)).isoformat()
+        now = now.isoformat()
+        # BEGIN IMMEDIATE 持有写锁，选取与租约更新之间不会被其他进程插入 (等价于 SKIP LOCKED)
+        with self._transaction() as conn:
+            # 租约过期且已用完重试次数的任务不再重新领取
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'failed', lease_owner = NULL, lease_expires_at = NULL, "
+                "last_error = 'lease expired', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= ?",
+                (now, now, max_attempts))
+            ids = [row[0] for row in conn.execute(
+                "SELECT project_id FROM analysis_jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires_at < ? AND attempts < ?) "
+                "ORDER BY priority DESC, enqueued_at LIMIT ?", (now, max_attempts, n))]
+            conn.executemany(
+                "UPDATE analysis_jobs SET status = 'leased', lease_owner = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE project_id = ?",
+                [(worker, expires, now, pid) for pid in ids])
+        if not ids:
+            return []
+        by_id = {row["id"]: row for row in self.get_projects_by_ids(ids)}
+        return [by_id[pid] for pid in ids if pid in by_id]
+
+    def fail_analysis_job(self, project_id: str, worker: str, error: str, max_attempts: int):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_expires_at = NULL, last_error = ?, updated_at = ? "
+                "WHERE project_id = ? AND lease_owner = ?",
+                (max_attempts, error, _now(), project_id, worker))
+
+    def set_jobs_status(self, project_ids: List[str], worker: str, status: str):
+        now = _now()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE analysis_jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE project_id = ? AND lease_owner = ?",
+                [(status, now, pid, worker) for pid in project_ids])
+
+    # ---------- scan history / settings / news sources ----------
+
+    def insert_scan(self, data: Dict):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO scan_history (category, scan_time, projects_found, projects_new, status) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (data.get("category"), data.get("scan_time") or _now(), data.get("projects_found"),
+                 data.get("projects_new"), data.get("status")))
+
+    def recent_scans(self, limit: int) -> List[Dict]:
+        return self._select("SELECT * FROM scan_history ORDER BY scan_time DESC LIMIT ?", (limit,))
+
+    def get_setting(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, key: str, value: str):
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO settings (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def list_news_sources(self) -> List[Dict]:
+        return self._select("SELECT * FROM news_sources ORDER BY id")
+
+    def add_news_source(self, name: str, url: str):
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO news_sources (name, url, created_at) VALUES (?, ?, ?)",
+                         (name, url, _now()))
+
+    def delete_news_source(self, source_id: int):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM news_sources WHERE id = ?", (source_id,))
+
+    def touch_news_source(self, source_id: int, now: str):
+        with self._transaction() as conn:
+            conn.execute("UPDATE news_sources SET last_scanned = ? WHERE id = ?", (now, source_id))
+
+    # ---------- change feed / mirroring ----------
+
+    def select_changed(self, table: str, ts_column: str = None, since: str = None,
+                       after_key=None, limit: int = 500) -> List[Dict]:
+        key = TABLE_KEYS[table]
+        clauses, params = [], []
+        if ts_column:
+            self._check_columns(table, [ts_column])
+            if since is not None and after_key is not None:
+                clauses.append(f"({ts_column} > ? OR ({ts_column} = ? AND {key} > ?))")
+                params += [since, since, after_key]
+            elif since is not None:
+                clauses.append(f"{ts_column} > ?")
+                params.append(since)
+            else:
+                clauses.append(f"{ts_column} IS NOT NULL")
+            order = f"{ts_column}, {key}"
+        else:
+            if after_key is not None:
+                clauses.append(f"{key} > ?")
+                params.append(after_key)
+            order = key
+        sql = f"SELECT * FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        params.append(limit)
+        return self._select(f"{sql} ORDER BY {order} LIMIT ?", params)
+
+    def replace_rows(self, table: str, rows: List[Dict], on_conflict: str = None) -> int:
+        """Insert-or-update rows copied from another store (unknown columns are dropped)"""
+        if not rows:
+            return 0
+        key = on_conflict or TABLE_KEYS[table]
+        known = self._columns_of(table)
+        groups: Dict[tuple, List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(tuple(c for c in row if c in known), []).append(row)
+        with self._transaction() as conn:
+            for columns, group in groups.items():
+                updates = ",".join(f"{c}=excluded.{c}" for c in columns if c != key)
+                sql = (f"INSERT INTO {table} ({','.join(columns)}) VALUES ({','.join('?' * len(columns))}) "
+                       f"ON CONFLICT({key}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"))
+                conn.executemany(sql, [[self._encode(c, row.get(c)) for c in columns] for row in group])
+        return len(rows)
+
+    def delete_rows(self, table: str, keys: List):
+        key = TABLE_KEYS[table]
+        with self._transaction() as conn:
+            conn.executemany(f"DELETE FROM {table} WHERE {key} = ?", [(k,) for k in keys])
+
+    def list_keys(self, table: str) -> List:
+        key = TABLE_KEYS[table]
+        return [row[0] for row in self._conn().execute(f"SELECT {key} FROM {table}")]
+
+    def get_state(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def _columns_of(self, table: str) -> set:
+        columns = self._table_columns.get(table)
+        if columns is None:
+            if table not in TABLE_KEYS:
+                raise ValueError(f"Unknown table: {table}")
+            columns = {row["name"] for row in self._conn().execute(f"PRAGMA table_info({table})")}
+            self._table_columns[table] = columns
+        return columns
+
+    def _check_columns(self, table: str, columns: List[str]):
+        unknown = [c for c in columns if c not in self._columns_of(table)]
+        if unknown:
+            raise ValueError(f"Unknown {table} columns: {', '.join(unknown)}")
+
+    # ---------- lifecycle ----------
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM analysis_jobs")
+            conn.execute("DELETE FROM projects")
+            conn.execute("DELETE FROM scan_history")
+
+    def close(self):
+        """Close every per-thread connection (checkpoints the WAL on the last one)"""
+        with self._conn_lock:
+            connections, self._connections = list(self._connections.values()), {}
+        self._close_all(connections)
+        self._local = threading.local()
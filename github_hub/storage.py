@@ -0,0 +1,221 @@
+# GitHub Hub - Storage Backend Interface
+from typing import Dict, List, Optional
+
+# projects 表的全部列 (与 supabase_schema.sql 保持一致)
+PROJECT_COLUMNS = (
+    "id", "name", "full_name", "category", "stars", "forks", "description", "url",
+    "homepage", "language", "topics", "created_at", "updated_at", "readme_content",
+    "ai_summary", "ai_tech_stack", "ai_use_cases", "ai_difficulty", "ai_quick_start",
+    "ai_tutorial", "has_tutorial", "last_scanned", "last_analyzed", "recent_stars_growth",
+    "ai_rag_summary", "ai_visual_summary", "screenshot", "ai_model_name", "content_fingerprint",
+    "stars_growth_1d", "stars_growth_7d", "stars_growth_30d", "stars_acceleration", "growth_updated_at",
+    "row_updated_at",
+)
+
+# 增长榜可排序的列 (window -> column)
+GROWTH_COLUMNS = {
+    "1d": "stars_growth_1d",
+    "7d": "stars_growth_7d",
+    "30d": "stars_growth_30d",
+    "acceleration": "stars_acceleration",
+}
+
+# JSONB 列 (SQLite 中以 JSON 文本存储，读取时解码)
+JSON_COLUMNS = ("topics", "ai_tech_stack", "ai_use_cases")
+
+# 大文本列 -> content store 中的 kind；列表查询不读取，详情/教程按需从 content store 加载
+CONTENT_FIELDS = {"ai_tutorial": "tutorial", "readme_content": "readme", "ai_visual_summary": "visual_summary"}
+
+# 可整表同步的表及其主键 (本地副本 / 迁移使用)
+TABLE_KEYS = {
+    "projects": "id",
+    "analysis_jobs": "project_id",
+    "scan_history": "id",
+    "settings": "key",
+    "news_sources": "id",
+}
+
+
+class StorageBackend:
+    """Raw table access used by Database.
+
+    Database owns caching, the write buffer, the search index and fingerprints;
+    a backend only moves rows in and out of its store. Project rows are plain
+    dicts keyed by PROJECT_COLUMNS. columns arguments are "*" or a
+    comma-separated column list; filters map column -> value (=) or
+    column -> list (IN).
+    """
+
+    name = "base"
+
+    # ---------- projects ----------
+
+    def upsert_projects(self, rows: List[Dict]):
+        """Insert rows, or update the given columns of existing ids"""
+        raise NotImplementedError
+
+    def update_projects(self, project_ids: List[str], fields: Dict):
+        """Set the same fields on every listed project"""
+        raise NotImplementedError
+
+    def patch_projects(self, patches: Dict[str, Dict]):
+        """Apply per-project partial updates (project_id -> fields)"""
+        raise NotImplementedError
+
+    def delete_project(self, project_id: str):
+        raise NotImplementedError
+
+    def select_projects(self, columns: str = "*", filters: Dict = None, limit: int = None,
+                        after_id: str = None, order_by_id: bool = False) -> List[Dict]:
+        """Select project rows; after_id/order_by_id drive keyset pagination"""
+        raise NotImplementedError
+
+    def get_projects_by_ids(self, project_ids: List[str], columns: str = "*") -> List[Dict]:
+        raise NotImplementedError
+
+    def search_projects(self, query: str, columns: str = "*", limit: int = 20,
+                        offset: int = 0) -> List[Dict]:
+        """Unranked substring search (fallback when the local index is unavailable)"""
+        raise NotImplementedError
+
+    def project_stats(self, target_model: str) -> Dict:
+        """{"total", "analyzed", "pending", "categories": {category: count}}"""
+        raise NotImplementedError
+
+    def projects_needing_analysis(self, limit: int, target_model: str) -> List[Dict]:
+        """Unanalyzed projects first, then ones not analyzed by target_model"""
+        raise NotImplementedError
+
+    def rising_projects(self, column: str, limit: int, category: str = None,
+                        columns: str = "*") -> List[Dict]:
+        """Projects with positive growth in column, fastest first"""
+        raise NotImplementedError
+
+    # ---------- star history ----------
+
+    def insert_star_snapshots(self, rows: List[Dict]):
+        """Append {project_id, captured_at, stars, forks} rows (duplicates are ignored)"""
+        raise NotImplementedError
+
+    def select_star_snapshots(self, since: str, after: tuple = None, limit: int = 5000) -> List[Dict]:
+        """One page of snapshots captured at or after since, in (project_id, captured_at) order"""
+        raise NotImplementedError
+
+    # ---------- content store (大文本正文，不在 projects 行内) ----------
+
+    def put_content(self, rows: List[Dict]):
+        """Insert-or-replace {project_id, kind, content_hash, codec, data (bytes), size} rows"""
+        raise NotImplementedError
+
+    def get_content(self, project_id: str, kinds: List[str] = None, with_data: bool = True) -> List[Dict]:
+        """Content rows of a project (all kinds by default); with_data=False skips the blob"""
+        raise NotImplementedError
+
+    def get_content_for(self, project_ids: List[str], kinds: List[str] = None) -> List[Dict]:
+        """Content rows (with data) of several projects, for bulk readers such as export/archive"""
+        raise NotImplementedError
+
+    def delete_content(self, project_id: str, kinds: List[str]):
+        raise NotImplementedError
+
+    # ---------- analysis queue ----------
+
+    def enqueue_analysis_jobs(self, project_ids: List[str], target_model: str) -> int:
+        raise NotImplementedError
+
+    def claim_analysis_jobs(self, worker: str, n: int, lease_seconds: int,
+                            max_attempts: int) -> List[Dict]:
+        """Lease up to n jobs; expired leases at max_attempts are marked failed instead"""
+        raise NotImplementedError
+
+    def fail_analysis_job(self, project_id: str, worker: str, error: str, max_attempts: int):
+        raise NotImplementedError
+
+    def set_jobs_status(self, project_ids: List[str], worker: str, status: str):
+        """Clear the lease of worker's jobs and set their status (pending/done)"""
+        raise NotImplementedError
+
+    # ---------- scan history / settings / news sources ----------
+
+    def insert_scan(self, data: Dict):
+        raise NotImplementedError
+
+    def recent_scans(self, limit: int) -> List[Dict]:
+        raise NotImplementedError
+
+    def get_setting(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set_setting(self, key: str, value: str):
+        raise NotImplementedError
+
+    def list_news_sources(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def add_news_source(self, name: str, url: str):
+        raise NotImplementedError
+
+    def delete_news_source(self, source_id: int):
+        raise NotImplementedError
+
+    def touch_news_source(self, source_id: int, now: str):
+        raise NotImplementedError
+
+    # ---------- change feed ----------
+
+    def select_changed(self, table: str, ts_column: str = None, since: str = None,
+                       after_key=None, limit: int = 500) -> List[Dict]:
+        """One page of table rows in (ts_column, key) order, strictly after (since, after_key).
+
+        With ts_column=None the page is plain keyset order on the primary key
+        (after_key only). Rows whose ts_column is NULL are never returned.
+        """
+        raise NotImplementedError
+
+    def replace_rows(self, table: str, rows: List[Dict], on_conflict: str = None) -> int:
+        """Insert-or-update rows copied from another store, merging on on_conflict
+        (default: the table's primary key). Returns the number of rows sent."""
+        raise NotImplementedError
+
+    # ---------- lifecycle ----------
+
+    def stats(self) -> Dict:
+        """Backend health/metrics for the dashboard"""
+        return {"backend": self.name}
+
+    def clear(self):
+        """Delete all projects, queue jobs and scan history (settings are kept)"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def parse_columns(columns: str) -> List[str]:
+    """Validate a comma-separated projection against the projects schema"""
+    if columns == "*":
+        return list(PROJECT_COLUMNS)
+    names = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in names if c not in PROJECT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown project columns: {', '.join(unknown)}")
+    return names
+
+
+def create_backend(kind: str = None, db_path: str = None) -> StorageBackend:
+    """Build a backend by name ("supabase" or "sqlite").
+
+    Supabase is wrapped with the local read replica when REPLICA_CONFIG is enabled.
+    """
+    from .config import DB_BACKEND, DATABASE_PATH, REPLICA_CONFIG
+    kind = kind or DB_BACKEND
+    if kind == "sqlite":
+        from .sqlite_backend import SQLiteBackend
+        return SQLiteBackend(db_path or DATABASE_PATH)
+    if kind == "supabase":
+        from .supabase_backend import SupabaseBackend
+        if REPLICA_CONFIG["enabled"]:
+            from .replica import ReplicatedBackend
+            return ReplicatedBackend(SupabaseBackend())
+        return SupabaseBackend()
+    raise ValueError(f"Unknown storage backend: {kind}")
@@ -0,0 +1,308 @@
+# GitHub Hub - Supabase (PostgreSQL via PostgREST) Storage Backend
+import base64
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from .config import SUPABASE_URL, SUPABASE_KEY
+from .storage import StorageBackend, TABLE_KEYS
+
+try:
+    from supabase import create_client
+    HAS_SUPABASE = True
+except ImportError:
+    HAS_SUPABASE = False
+    print("[DB] supabase not installed; the supabase backend is unavailable (pip install supabase)")
+
+
+class SupabaseBackend(StorageBackend):
+    """Projects stored in Supabase; batch operations use the RPCs in supabase_schema.sql"""
+
+    name = "supabase"
+
+    def __init__(self, url: str = None, key: str = None):
+        self.lock = threading.RLock()  # serialize writes through the shared client
+        self.client = None
+        url = url or SUPABASE_URL
+        if not HAS_SUPABASE:
+            return
+        try:
+            self.client = create_client(url, key or SUPABASE_KEY)
+            print(f"Connected to Supabase: {url}")
+        except Exception as e:
+            print(f"Error connecting to Supabase: {e}")
+
+    def _table(self, name: str):
+        if not self.client:
+            raise Exception("Supabase client not initialized")
+        return self.client.table(name)
+
+    def _rpc(self, name: str, params: Dict):
+        if not self.client:
+            raise Exception("Supabase client not initialized")
+        return self.client.rpc(name, params).execute().data
+
+    @staticmethod
+    def _apply_filters(query, filters: Dict):
+        for column, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                query = query.in_(column, list(value))
+            else:
+                query = query.eq(column, value)
+        return query
+
+    # ---------- projects ----------
+
+    def upsert_projects(self, rows: List[Dict]):
+        with self.lock:
+            self._table("projects").upsert(rows).execute()
+
+    def update_projects(self, project_ids: List[str], fields: Dict):
+        with self.lock:
+            self._table("projects").update(fields).in_("id", list(project_ids)).execute()
+
+    def patch_projects(self, patches: Dict[str, Dict]):
+        with self.lock:
+            if len(patches) == 1:
+                project_id, fields = next(iter(patches.items()))
+                self._table("projects").update(fields).eq("id", project_id).execute()
+                return
+            try:
+                self._rpc("patch_projects", {"patches": [{"id": pid, **fields} for pid, fields in patches.items()]})
+            except Exception as e:
+                # patch_projects 函数未部署时，退化为逐个项目单次 patch
+                print(f"[DB] patch_projects RPC unavailable, patching per project: {e}")
+                for pid, fields in patches.items():
+                    self._table("projects").update(fields).eq("id", pid).execute()
+
+    def delete_project(self, project_id: str):
+        with self.lock:
+            self._table("projects").delete().eq("id", project_id).execute()
+
+    def select_projects(self, columns: str = "*", filters: Dict = None, limit: int = None,
+                        after_id: str = None, order_by_id: bool = False) -> List[Dict]:
+        query = self._apply_filters(self._table("projects").select(columns), filters)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        if order_by_id:
+            query = query.order("id")
+        if limit:
+            query = query.limit(limit)
+        return [dict(row) for row in query.execute().data]
+
+    def get_projects_by_ids(self, project_ids: List[str], columns: str = "*") -> List[Dict]:
+        response = self._table("projects").select(columns).in_("id", list(project_ids)).execute()
+        return [dict(row) for row in response.data]
+
+    def search_projects(self, query: str, columns: str = "*", limit: int = 20,
+                        offset: int = 0) -> List[Dict]:
+        response = self._table("projects").select(columns).or_(
+            f"name.ilike.%{query}%,description.ilike.%{query}%,ai_rag_summary.ilike.%{query}%"
+        ).range(offset, offset + limit - 1).execute()
+        return [dict(row) for row in response.data]
+
+    def project_stats(self, target_model: str) -> Dict:
+        try:
+            return self._rpc("project_stats", {"target_model": target_model})
+        except Exception as e:
+            print(f"[DB] project_stats RPC unavailable, counting client-side: {e}")
+            return self._count_project_stats(target_model)
+
+    def _count_project_stats(self, target_model: str) -> Dict:
+        """Fallback for project_stats() when the SQL function is not deployed"""
+        categories = {}
+        last_id = None
+        while True:
+            rows = self.select_projects("id,category", limit=1000, after_id=last_id, order_by_id=True)
+            for row in rows:
+                cat = row.get('category', 'other')
+                categories[cat] = categories.get(cat, 0) + 1
+            if len(rows) < 1000:
+                break
+            last_id = rows[-1]["id"]
+        total = sum(categories.values())
+
+        analyzed = 0
+        try:
+            analyzed_response = self._table("projects").select("id", count="exact")\
+                .ilike("ai_model_name", f"%{target_model}%").limit(1).execute()
+            analyzed = analyzed_response.count or 0
+        except Exception as e:
+            print(f"Error getting {target_model} count: {e}")
+
+        pending = max(0, total - analyzed)
+        try:
+            queued_response = self._table("analysis_jobs").select("project_id", count="exact")\
+                .in_("status", ["pending", "leased"]).limit(1).execute()
+            pending = queued_response.count or 0
+        except Exception as e:
+            print(f"Error counting analysis queue (using total - analyzed): {e}")
+
+        return {"total": total, "analyzed": analyzed, "pending": pending, "categories": categories}
+
+    def projects_needing_analysis(self, limit: int, target_model: str) -> List[Dict]:
+        # 1. First, try to get completely unanalyzed projects
+        response = self._table("projects").select("*").is_("ai_summary", "null").limit(limit).execute()
+        pending = [dict(row) for row in response.data]
+
+        # 2. If we still have room, get projects that haven't been analyzed by the target_model
+        if len(pending) < limit:
+            response = self._table("projects").select("*")\
+                .not_.is_("ai_summary", "null")\
+                .not_.ilike("ai_model_name", f"%{target_model}%")\
+                .limit(limit - len(pending)).execute()
+            pending.extend([dict(row) for row in response.data])
+        return pending
+
+    def rising_projects(self, column: str, limit: int, category: str = None,
+                        columns: str = "*") -> List[Dict]:
+        query = self._table("projects").select(columns).gt(column, 0)
+        if category:
+            query = query.eq("category", category)
+        response = query.order(column, desc=True).order("stars", desc=True).limit(limit).execute()
+        return [dict(row) for row in response.data]
+
+    # ---------- star history ----------
+
+    def insert_star_snapshots(self, rows: List[Dict]):
+        with self.lock:
+            self._table("star_snapshots").upsert(rows, ignore_duplicates=True).execute()
+
+    def select_star_snapshots(self, since: str, after: tuple = None, limit: int = 5000) -> List[Dict]:
+        query = self._table("star_snapshots").select("project_id,captured_at,stars").gte("captured_at", since)
+        if after is not None:
+            project_id, captured_at = after
+            query = query.or_(f'project_id.gt."{project_id}",'
+                              f'and(project_id.eq."{project_id}",captured_at.gt."{captured_at}")')
+        response = query.order("project_id").order("captured_at").limit(limit).execute()
+        return [dict(row) for row in response.data]
+
+    # ---------- content store ----------
+
+    def put_content(self, rows: List[Dict]):
+        # PostgREST 不便传 bytea，压缩后的正文以 base64 文本存储
+        payload = [{**row, "data": base64.b64encode(row["data"]).decode("ascii"),
+                    "updated_at": datetime.now().isoformat()} for row in rows]
+        with self.lock:
+            self._table("project_content").upsert(payload).execute()
+
+    def get_content(self, project_id: str, kinds: List[str] = None, with_data: bool = True) -> List[Dict]:
+        columns = "project_id,kind,content_hash,codec,size" + (",data" if with_data else "")
+        query = self._table("project_content").select(columns).eq("project_id", project_id)
+        if kinds:
+            query = query.in_("kind", list(kinds))
+        rows = [dict(row) for row in query.execute().data]
+        for row in rows:
+            if with_data:
+                row["data"] = base64.b64decode(row["data"])
+        return rows
+
+    def get_content_for(self, project_ids: List[str], kinds: List[str] = None) -> List[Dict]:
+        rows = []
+        # 每个项目最多 len(CONTENT_FIELDS) 行，分块查询以免超过 PostgREST max-rows
+        for i in range(0, len(project_ids), 200):
+            query = (self._table("project_content").select("project_id,kind,content_hash,codec,size,data")
+                     .in_("project_id", list(project_ids[i:i + 200])))
+            if kinds:
+                query = query.in_("kind", list(kinds))
+            rows.extend(dict(row) for row in query.execute().data)
+        for row in rows:
+            row["data"] = base64.b64decode(row["data"])
+        return rows
+
+    def delete_content(self, project_id: str, kinds: List[str]):
+        with self.lock:
+            self._table("project_content").delete().eq("project_id", project_id).in_("kind", list(kinds)).execute()
+
+    # ---------- analysis queue ----------
+
+    def enqueue_analysis_jobs(self, project_ids: List[str], target_model: str) -> int:
+        return self._rpc("enqueue_analysis_jobs", {"project_ids": project_ids,
+                                                   "target_model": target_model}) or 0
+
+    def claim_analysis_jobs(self, worker: str, n: int, lease_seconds: int,
+                            max_attempts: int) -> List[Dict]:
+        rows = self._rpc("claim_analysis_jobs", {"worker": worker, "n": n, "lease_seconds": lease_seconds,
+                                                 "max_attempts": max_attempts})
+        return [dict(row) for row in rows]
+
+    def fail_analysis_job(self, project_id: str, worker: str, error: str, max_attempts: int):
+        self._rpc("fail_analysis_job", {"pid": project_id, "worker": worker,
+                                        "error": error, "max_attempts": max_attempts})
+
+    def set_jobs_status(self, project_ids: List[str], worker: str, status: str):
+        with self.lock:
+            self._table("analysis_jobs").update({
+                "status": status, "lease_owner": None, "lease_expires_at": None,
+                "updated_at": datetime.now().isoformat(),
+            }).in_("project_id", list(project_ids)).eq("lease_owner", worker).execute()
+
+    # ---------- scan history / settings / news sources ----------
+
+    def insert_scan(self, data: Dict):
+        with self.lock:
+            self._table("scan_history").insert(data).execute()
+
+    def recent_scans(self, limit: int) -> List[Dict]:
+        response = self._table("scan_history").select("*").order("scan_time", desc=True).limit(limit).execute()
+        return [dict(row) for row in response.data]
+
+    def get_setting(self, key: str) -> Optional[str]:
+        response = self._table("settings").select("value").eq("key", key).execute()
+        return response.data[0]['value'] if response.data else None
+
+    def set_setting(self, key: str, value: str):
+        with self.lock:
+            self._table("settings").upsert({"key": key, "value": value}).execute()
+
+    def list_news_sources(self) -> List[Dict]:
+        return [dict(row) for row in self._table("news_sources").select("*").execute().data]
+
+    def add_news_source(self, name: str, url: str):
+        with self.lock:
+            self._table("news_sources").insert({"name": name, "url": url}).execute()
+
+    def delete_news_source(self, source_id: int):
+        with self.lock:
+            self._table("news_sources").delete().eq("id", source_id).execute()
+
+    def touch_news_source(self, source_id: int, now: str):
+        with self.lock:
+            self._table("news_sources").update({"last_scanned": now}).eq("id", source_id).execute()
+
+    # ---------- change feed ----------
+
+    def select_changed(self, table: str, ts_column: str = None, since: str = None,
+                       after_key=None, limit: int = 500) -> List[Dict]:
+        key = TABLE_KEYS[table]
+        query = self._table(table).select("*")
+        if ts_column:
+            if since is not None and after_key is not None:
+                # (ts, key) > (since, after_key)；值加引号，时间戳中的 ':' '+' 不会被 PostgREST 误解析
+                query = query.or_(f'{ts_column}.gt."{since}",'
+                                  f'and({ts_column}.eq."{since}",{key}.gt."{after_key}")')
+            elif since is not None:
+                query = query.gt(ts_column, since)
+            else:
+                query = query.not_.is_(ts_column, "null")
+            query = query.order(ts_column).order(key)
+        else:
+            if after_key is not None:
+                query = query.gt(key, after_key)
+            query = query.order(key)
+        return [dict(row) for row in query.limit(limit).execute().data]
+
+    def replace_rows(self, table: str, rows: List[Dict], on_conflict: str = None) -> int:
+        if not rows:
+            return 0
+        # 不加 self.lock: 每次调用新建请求，底层 httpx 连接池线程安全，迁移工具并发写入分块
+        self._table(table).upsert(rows, on_conflict=on_conflict or TABLE_KEYS[table]).execute()
+        return len(rows)
+
+    # ---------- lifecycle ----------
+
+    def clear(self):
+        with self.lock:
+            # PostgREST 拒绝无条件 DELETE，用恒真条件删除全部行
+            self._table("analysis_jobs").delete().neq("project_id", "").execute()
+            self._table("projects").delete().neq("id", "").execute()
+            self._table("scan_history").delete().gte("id", 0).execute()
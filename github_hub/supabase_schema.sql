@@ -23,13 +23,21 @@ CREATE TABLE IF NOT EXISTS projects (
     ai_difficulty INTEGER,
     ai_quick_start TEXT,
     ai_tutorial TEXT,
+    has_tutorial BOOLEAN DEFAULT FALSE,
     last_scanned TIMESTAMPTZ,
     last_analyzed TIMESTAMPTZ,
     recent_stars_growth INTEGER DEFAULT 0,
     ai_rag_summary TEXT,
     ai_visual_summary TEXT,
     screenshot TEXT,
-    ai_model_name TEXT
+    ai_model_name TEXT,
+    content_fingerprint TEXT,
+    stars_growth_1d INTEGER DEFAULT 0,
+    stars_growth_7d INTEGER DEFAULT 0,
+    stars_growth_30d INTEGER DEFAULT 0,
+    stars_acceleration INTEGER DEFAULT 0,
+    growth_updated_at TIMESTAMPTZ,
+    row_updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
 -- Scan history table
@@ -60,15 +68,239 @@ CREATE TABLE IF NOT EXISTS news_sources (
 -- Create index for faster category queries
 CREATE INDEX IF NOT EXISTS idx_projects_category ON projects(category);
 
+-- Migration for existing tables: lightweight flag so list ("card") queries never select ai_tutorial
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS has_tutorial BOOLEAN DEFAULT FALSE;
+UPDATE projects SET has_tutorial = (ai_tutorial IS NOT NULL AND ai_tutorial <> '');
+
+-- Migration for existing tables: hash of crawled fields, lets scans skip unchanged rows
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS content_fingerprint TEXT;
+
+-- Migration for existing tables: star growth computed from star_snapshots (growth.py)
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS stars_growth_1d INTEGER DEFAULT 0;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS stars_growth_7d INTEGER DEFAULT 0;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS stars_growth_30d INTEGER DEFAULT 0;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS stars_acceleration INTEGER DEFAULT 0;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS growth_updated_at TIMESTAMPTZ;
+CREATE INDEX IF NOT EXISTS idx_projects_growth_7d ON projects(stars_growth_7d DESC);
+
+-- Migration for existing tables: row-level change stamp for replica sync and migrations.
+-- Set by trigger on every insert/update except last_scanned-only touches
+-- (updated_at is GitHub's own repo timestamp).
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS row_updated_at TIMESTAMPTZ DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS idx_projects_row_updated ON projects(row_updated_at, id);
+
+CREATE OR REPLACE FUNCTION touch_row_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- 只刷新 last_scanned 的批量 touch 不算行变更，否则副本每次扫描后都要重新拷贝整张表
+    IF TG_OP = 'UPDATE'
+       AND (to_jsonb(NEW) - 'last_scanned' - 'row_updated_at') = (to_jsonb(OLD) - 'last_scanned' - 'row_updated_at') THEN
+        NEW.row_updated_at := OLD.row_updated_at;
+        RETURN NEW;
+    END IF;
+    -- clock_timestamp(): 语句执行时刻，而不是事务开始时刻
+    NEW.row_updated_at := clock_timestamp();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS projects_row_updated_at ON projects;
+CREATE TRIGGER projects_row_updated_at
+    BEFORE INSERT OR UPDATE ON projects
+    FOR EACH ROW EXECUTE FUNCTION touch_row_updated_at();
+
+-- Star history: one row per project per scan (append-only, written with each crawl upsert)
+CREATE TABLE IF NOT EXISTS star_snapshots (
+    project_id TEXT NOT NULL,
+    captured_at TIMESTAMPTZ NOT NULL,
+    stars INTEGER NOT NULL,
+    forks INTEGER,
+    PRIMARY KEY (project_id, captured_at)
+);
+CREATE INDEX IF NOT EXISTS idx_star_snapshots_captured ON star_snapshots(captured_at);
+
+-- Large text bodies (tutorial, README, visual summary) kept out of the projects row.
+-- data is the zlib-compressed body, base64-encoded; content_hash is of the uncompressed text.
+CREATE TABLE IF NOT EXISTS project_content (
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    codec TEXT NOT NULL DEFAULT 'zlib',
+    data TEXT NOT NULL,
+    size INTEGER,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (project_id, kind)
+);
+
+-- Batched partial updates: patches is a JSON array of {"id": ..., <column>: <value>, ...}.
+-- Columns missing from a patch keep their current value (used by Database.flush_updates).
+CREATE OR REPLACE FUNCTION patch_projects(patches JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    UPDATE projects p
+    SET (ai_summary, ai_tech_stack, ai_use_cases, ai_difficulty, ai_quick_start,
+         ai_model_name, ai_tutorial, has_tutorial, ai_rag_summary, ai_visual_summary, readme_content,
+         screenshot, last_analyzed, recent_stars_growth, stars_growth_1d, stars_growth_7d,
+         stars_growth_30d, stars_acceleration, growth_updated_at)
+      = (SELECT r.ai_summary, r.ai_tech_stack, r.ai_use_cases, r.ai_difficulty, r.ai_quick_start,
+                r.ai_model_name, r.ai_tutorial, r.has_tutorial, r.ai_rag_summary, r.ai_visual_summary,
+                r.readme_content, r.screenshot, r.last_analyzed, r.recent_stars_growth, r.stars_growth_1d, r.stars_growth_7d,
+                r.stars_growth_30d, r.stars_acceleration, r.growth_updated_at
+         FROM jsonb_populate_record(p, x.patch) r)
+    FROM (SELECT e->>'id' AS id, e AS patch FROM jsonb_array_elements(patches) e) x
+    WHERE p.id = x.id;
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+-- Analysis work queue: one job per project that still needs a target-model analysis.
+-- Workers claim jobs atomically (FOR UPDATE SKIP LOCKED) and hold a lease until they finish.
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    project_id TEXT PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | failed
+    priority INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    enqueued_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_pending ON analysis_jobs(priority DESC, enqueued_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_lease ON analysis_jobs(lease_expires_at) WHERE status = 'leased';
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs(status);
+
+-- Backfill: queue every project not yet analyzed by the target model (unanalyzed first)
+INSERT INTO analysis_jobs (project_id, priority)
+SELECT id, CASE WHEN ai_summary IS NULL THEN 10 ELSE 0 END
+FROM projects
+WHERE ai_model_name IS NULL OR ai_model_name NOT ILIKE '%120b%'
+ON CONFLICT (project_id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION enqueue_analysis_jobs(project_ids TEXT[], target_model TEXT DEFAULT '120b')
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH queued AS (
+        INSERT INTO analysis_jobs (project_id, priority)
+        SELECT p.id, CASE WHEN p.ai_summary IS NULL THEN 10 ELSE 0 END
+        FROM projects p
+        WHERE p.id = ANY(project_ids)
+          AND (p.ai_model_name IS NULL OR p.ai_model_name NOT ILIKE '%' || target_model || '%')
+        ON CONFLICT (project_id) DO NOTHING
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM queued;
+$$;
+
+-- Atomically lease up to n jobs (pending, or leased with an expired lease) and return their projects.
+-- Expired leases that already used max_attempts are marked failed instead of being re-claimed.
+DROP FUNCTION IF EXISTS claim_analysis_jobs(TEXT, INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION claim_analysis_jobs(worker TEXT, n INTEGER DEFAULT 5, lease_seconds INTEGER DEFAULT 1800,
+                                               max_attempts INTEGER DEFAULT 3)
+RETURNS SETOF projects
+LANGUAGE sql
+AS $$
+    UPDATE analysis_jobs
+    SET status = 'failed',
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        last_error = 'lease expired',
+        updated_at = NOW()
+    WHERE status = 'leased' AND lease_expires_at < NOW() AND attempts >= max_attempts;
+
+    WITH claimed AS (
+        UPDATE analysis_jobs j
+        SET status = 'leased',
+            lease_owner = worker,
+            lease_expires_at = NOW() + make_interval(secs => lease_seconds),
+            attempts = j.attempts + 1,
+            updated_at = NOW()
+        WHERE j.project_id IN (
+            SELECT project_id FROM analysis_jobs
+            WHERE status = 'pending' OR (status = 'leased' AND lease_expires_at < NOW() AND attempts < max_attempts)
+            ORDER BY priority DESC, enqueued_at
+            LIMIT n
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING j.project_id, j.priority, j.enqueued_at
+    )
+    SELECT p.* FROM projects p JOIN claimed c ON c.project_id = p.id
+    ORDER BY c.priority DESC, c.enqueued_at;
+$$;
+
+-- Give a leased job back: retry later, or mark failed after max_attempts
+CREATE OR REPLACE FUNCTION fail_analysis_job(pid TEXT, worker TEXT, error TEXT, max_attempts INTEGER DEFAULT 3)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE analysis_jobs
+    SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        last_error = error,
+        updated_at = NOW()
+    WHERE project_id = pid AND lease_owner = worker;
+$$;
+
+-- Dashboard counters in one round trip: totals, analyzed counts, queued (pending) jobs and per-category counts
+CREATE INDEX IF NOT EXISTS idx_projects_model_name ON projects(ai_model_name);
+CREATE INDEX IF NOT EXISTS idx_projects_model_category ON projects(ai_model_name, category);
+
+-- The substring match on target_model runs only over the handful of distinct model
+-- names (walked on idx_projects_model_name); projects are then counted with an
+-- equality predicate, and per-category totals come from idx_projects_category,
+-- so neither counter reads the wide projects rows.
+CREATE OR REPLACE FUNCTION project_stats(target_model TEXT DEFAULT '120b')
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH RECURSIVE models(name) AS (
+        (SELECT ai_model_name FROM projects WHERE ai_model_name IS NOT NULL ORDER BY ai_model_name LIMIT 1)
+        UNION ALL
+        SELECT (SELECT p.ai_model_name FROM projects p WHERE p.ai_model_name > m.name
+                ORDER BY p.ai_model_name LIMIT 1)
+        FROM models m
+        WHERE m.name IS NOT NULL
+    ),
+    matching AS (
+        SELECT name FROM models WHERE name ILIKE '%' || target_model || '%'
+    ),
+    totals AS (
+        SELECT category, COUNT(*) AS n FROM projects GROUP BY category
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT COALESCE(SUM(n), 0) FROM totals),
+        'analyzed', (SELECT COUNT(*) FROM projects WHERE ai_model_name IN (SELECT name FROM matching)),
+        'pending', (SELECT COUNT(*) FROM analysis_jobs WHERE status IN ('pending', 'leased')),
+        'categories', (SELECT COALESCE(jsonb_object_agg(category, n), '{}'::jsonb) FROM totals)
+    );
+$$;
+
 -- Enable Row Level Security (optional, but recommended)
 -- For now, allow all access via anon key
 ALTER TABLE projects ENABLE ROW LEVEL SECURITY;
 ALTER TABLE scan_history ENABLE ROW LEVEL SECURITY;
 ALTER TABLE settings ENABLE ROW LEVEL SECURITY;
 ALTER TABLE news_sources ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analysis_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE star_snapshots ENABLE ROW LEVEL SECURITY;
+ALTER TABLE project_content ENABLE ROW LEVEL SECURITY;
 
 -- Policies to allow read/write from anon key
 CREATE POLICY "Allow all access to projects" ON projects FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all access to scan_history" ON scan_history FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all access to settings" ON settings FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all access to news_sources" ON news_sources FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Allow all access to analysis_jobs" ON analysis_jobs FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Allow all access to star_snapshots" ON star_snapshots FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Allow all access to project_content" ON project_content FOR ALL USING (true) WITH CHECK (true);
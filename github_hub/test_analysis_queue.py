@@ -0,0 +1,82 @@
+"""Analysis job queue tests: leases, release, expiry, completion and failure"""
+import threading
+import time
+
+import pytest
+
+from github_hub.config import ANALYSIS_CONFIG
+
+
+@pytest.fixture
+def db(db, make_project):
+    db.upsert_projects([make_project(i) for i in range(6)])
+    return db
+
+
+def _ids(projects):
+    return sorted(p["id"] for p in projects)
+
+
+def test_concurrent_workers_never_share_a_lease(db):
+    claimed = {}
+
+    def worker(name):
+        claimed[name] = _ids(db.claim_analysis_jobs(name, limit=2))
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    all_ids = [pid for ids in claimed.values() for pid in ids]
+    assert sorted(all_ids) == [str(i) for i in range(6)]
+    assert db.claim_analysis_jobs("late", limit=10) == []
+
+
+def test_released_and_expired_leases_are_claimable_again(db, monkeypatch):
+    # 每次领取都计入 attempts; 放宽上限，只验证可重新领取
+    monkeypatch.setitem(ANALYSIS_CONFIG, "max_attempts", 10)
+    first = _ids(db.claim_analysis_jobs("a", limit=2))
+    db.release_analysis_jobs(first, "a")
+    assert set(first) <= set(_ids(db.claim_analysis_jobs("b", limit=6)))
+
+    db.release_analysis_jobs([str(i) for i in range(6)], "b")
+    expiring = _ids(db.claim_analysis_jobs("c", limit=2, lease_seconds=0))
+    time.sleep(0.01)
+    assert set(expiring) <= set(_ids(db.claim_analysis_jobs("d", limit=6)))
+
+
+def test_completion_waits_for_buffered_patch(db):
+    job = db.claim_analysis_jobs("a", limit=1)[0]["id"]
+    with db.write_buffer():
+        db.update_project_analysis(job, {"summary": "done", "model_name": "gpt-oss-120b"})
+        db.complete_analysis_job(job, "a")
+        # 补丁未落库前任务仍处于租约中
+        assert db.backend.project_stats("120b")["pending"] == 6
+    assert db.backend.project_stats("120b")["pending"] == 5
+    assert db.get_project(job)["ai_summary"] == "done"
+
+
+def test_failures_requeue_until_max_attempts(db, monkeypatch):
+    monkeypatch.setitem(ANALYSIS_CONFIG, "max_attempts", 2)
+    for attempt in range(2):
+        claimed = [p["id"] for p in db.claim_analysis_jobs("a", limit=6)]
+        assert "0" in claimed
+        db.release_analysis_jobs([pid for pid in claimed if pid != "0"], "a")
+        db.fail_analysis_job("0", "a", "boom")
+    assert "0" not in [p["id"] for p in db.claim_analysis_jobs("a", limit=6)]
+
+
+def test_lease_expiring_max_attempts_times_fails_the_job(db, monkeypatch):
+    monkeypatch.setitem(ANALYSIS_CONFIG, "max_attempts", 2)
+    others = [str(i) for i in range(1, 6)]
+    for attempt in range(2):
+        claimed = _ids(db.claim_analysis_jobs("crashy", limit=6, lease_seconds=0))
+        assert "0" in claimed
+        db.release_analysis_jobs(others, "crashy")
+        time.sleep(0.01)
+    # 第三次领取时租约已过期两次: 任务被标记为 failed 而不是再次租出
+    assert "0" not in _ids(db.claim_analysis_jobs("next", limit=6))
+    row = db.backend._conn().execute(
+        "SELECT status, last_error FROM analysis_jobs WHERE project_id = '0'").fetchone()
+    assert (row["status"], row["last_error"]) == ("failed", "lease expired")
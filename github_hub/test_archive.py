@@ -0,0 +1,60 @@
+"""Archive tests: base/delta round-trip and crash-safe publishing of a day"""
+import pytest
+
+from github_hub import archive as archive_module
+from github_hub.archive import ArchiveEngine
+
+
+def _rows(**stars):
+    return [{"id": pid, "name": pid, "category": "llm", "stars": n, "last_scanned": f"t{n}"}
+            for pid, n in stars.items()]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return ArchiveEngine(root=str(tmp_path / "archive"), compression="gzip", base_every=3)
+
+
+def test_delta_round_trip(engine):
+    engine.archive(_rows(a=1, b=2, c=3), day="2026-01-01")
+    stats = engine.archive(_rows(a=1, b=5, d=4), day="2026-01-02")
+    assert (stats["kind"], stats["added"], stats["changed"], stats["removed"]) == ("delta", 1, 1, 1)
+    # 只有易变字段变化的行不重写
+    assert engine.archive([dict(r, last_scanned="later") for r in _rows(a=1, b=5, d=4)],
+                          day="2026-01-03")["written"] == 0
+    assert engine.archive(_rows(a=9), day="2026-01-04")["kind"] == "base"
+
+    assert {pid: row["stars"] for pid, row in engine.reconstruct("2026-01-02").items()} == {"a": 1, "b": 5, "d": 4}
+    assert engine.reconstruct("2026-01-03")["b"]["last_scanned"] == "t5"
+    replayed = {day: sorted(rows) for day, rows in engine.replay("2026-01-02")}
+    assert replayed == {"2026-01-02": ["a", "b", "d"], "2026-01-03": ["a", "b", "d"], "2026-01-04": ["a"]}
+
+
+def test_rerun_of_a_day_replaces_it(engine):
+    engine.archive(_rows(a=1), day="2026-01-01")
+    engine.archive(_rows(a=1, b=2), day="2026-01-02")
+    engine.archive(_rows(a=1, b=3), day="2026-01-02")
+    assert engine.days() == [("2026-01-01", "base"), ("2026-01-02", "delta")]
+    assert engine.reconstruct("2026-01-02")["b"]["stars"] == 3
+
+
+def test_crash_before_publish_leaves_no_half_written_day(engine, monkeypatch):
+    engine.archive(_rows(a=1, b=2), day="2026-01-01")
+    real_open = archive_module.gzip.open
+
+    def crash_on_index(path, *args, **kwargs):
+        if "_index" in str(path) and "w" in args[0]:
+            raise OSError("simulated crash")
+        return real_open(path, *args, **kwargs)
+
+    # 数据已写完、index 尚未写入时崩溃
+    monkeypatch.setattr(archive_module.gzip, "open", crash_on_index)
+    with pytest.raises(OSError):
+        engine.archive(_rows(a=1, b=7), day="2026-01-02")
+    monkeypatch.setattr(archive_module.gzip, "open", real_open)
+
+    assert engine.days() == [("2026-01-01", "base")]
+    # 次日的 delta 以最后一个完整发布的日期为基准
+    stats = engine.archive(_rows(a=1, b=7, c=1), day="2026-01-03")
+    assert (stats["added"], stats["changed"]) == (1, 1)
+    assert {pid: row["stars"] for pid, row in engine.reconstruct("2026-01-03").items()} == {"a": 1, "b": 7, "c": 1}
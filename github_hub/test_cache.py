@@ -0,0 +1,64 @@
+"""Read-through cache tests: TTL, LRU/byte budget, tags, in-flight invalidation"""
+import time
+
+from github_hub.cache import NullCache, TTLCache
+
+
+def test_ttl_expiry():
+    cache = TTLCache(ttl_seconds=60)
+    cache.set("a", 1, ttl=0.01)
+    cache.set("b", 2)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_lru_and_byte_budget_evict_oldest():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+
+    small = TTLCache(max_bytes=40)
+    small.set("x", "a" * 25)
+    small.set("y", "b" * 25)
+    assert small.get("x") is None and small.get("y") == "b" * 25
+    assert small.stats()["bytes"] <= 40
+
+
+def test_invalidate_tag_drops_tagged_entries():
+    cache = TTLCache()
+    cache.get_or_load("list", lambda: [{"id": "1"}, {"id": "2"}],
+                      tags=lambda rows: [f"project:{r['id']}" for r in rows])
+    cache.set("other", 1, tags=["project:3"])
+    cache.invalidate_tag("project:2")
+    assert cache.get("list") is None
+    assert cache.get("other") == 1
+
+
+def test_invalidation_during_load_is_not_recached():
+    cache = TTLCache()
+
+    def loader():
+        # 写入发生在加载进行中：加载到的值可能早于该写入
+        cache.invalidate_tag("project:1")
+        return ["stale"]
+
+    assert cache.get_or_load("k", loader, tags=lambda _: ["project:1"]) == ["stale"]
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", lambda: ["fresh"]) == ["fresh"]
+    assert cache.get("k") == ["fresh"]
+
+
+def test_none_is_not_cached_and_null_cache_stores_nothing():
+    cache = TTLCache()
+    calls = []
+    for _ in range(2):
+        cache.get_or_load("k", lambda: calls.append(1))
+    assert len(calls) == 2
+
+    null = NullCache()
+    null.get_or_load("k", lambda: 1)
+    assert null.get("k") is None
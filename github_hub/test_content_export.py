@@ -0,0 +1,56 @@
+"""Large text moved to the content store still reaches export and the daily archive"""
+import json
+
+import pytest
+
+from github_hub.archive import ArchiveEngine
+from github_hub.export import iter_ndjson
+
+
+@pytest.fixture
+def db(db, make_project):
+    db.upsert_projects([make_project(i) for i in range(3)])
+    db.update_project_tutorial("1", "# 教程\nstep 1")
+    db.update_project_visual_summary("1", "diagram")
+    return db
+
+
+def test_tutorial_lives_only_in_content_store(db):
+    assert db.backend.get_projects_by_ids(["1"])[0]["ai_tutorial"] is None
+    assert db.get_tutorial("1") == "# 教程\nstep 1"
+
+
+def test_tutorial_flag_is_not_left_in_the_write_buffer(db, monkeypatch):
+    def failing(updates):
+        raise IOError("database is locked")
+
+    with db.write_buffer():
+        db.update_project_tutorial("2", "# guide")
+        # 正文与标志都已落库；之后的刷新失败不影响它们
+        monkeypatch.setattr(db.backend, "patch_projects", failing)
+    monkeypatch.undo()
+    assert db.backend.get_projects_by_ids(["2"])[0]["has_tutorial"]
+    assert db.get_tutorial("2") == "# guide"
+
+
+def test_export_detail_includes_content(db):
+    lines = b"".join(iter_ndjson(db.iter_projects(batch_size=2, with_content=True))).decode("utf-8")
+    rows = {row["id"]: row for row in map(json.loads, lines.splitlines())}
+    assert rows["1"]["ai_tutorial"] == "# 教程\nstep 1"
+    assert rows["1"]["ai_visual_summary"] == "diagram"
+    assert rows["0"]["ai_tutorial"] is None
+
+
+def test_explicit_columns_only_load_requested_content(db):
+    rows = list(db.iter_projects(columns="id,ai_tutorial", with_content=True))
+    assert rows[1] == {"id": "1", "ai_tutorial": "# 教程\nstep 1"}
+
+
+def test_archive_keeps_content_across_days(db, tmp_path):
+    engine = ArchiveEngine(root=str(tmp_path / "archive"), compression="gzip", base_every=7)
+    engine.archive(db.iter_projects(with_content=True), day="2026-01-01")
+    db.update_project_tutorial("1", "v2")
+    stats = engine.archive(db.iter_projects(with_content=True), day="2026-01-02")
+    assert stats["kind"] == "delta" and stats["changed"] == 1
+    assert engine.reconstruct("2026-01-01")["1"]["ai_tutorial"] == "# 教程\nstep 1"
+    assert engine.reconstruct("2026-01-02")["1"]["ai_tutorial"] == "v2"
@@ -0,0 +1,102 @@
+"""GraphQL batch fetch tests: batching, README caching and REST fallback (no network)"""
+import pytest
+
+from github_hub import crawler as crawler_module
+from github_hub.readme_cache import ReadmeCache
+
+
+class _Response:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def _node(full_name, readme=None):
+    owner, name = full_name.split("/")
+    node = {"databaseId": abs(hash(full_name)) % 10 ** 8, "name": name, "nameWithOwner": full_name,
+            "stargazerCount": 100, "forkCount": 5, "description": "d", "url": f"https://github.com/{full_name}",
+            "homepageUrl": None, "primaryLanguage": {"name": "Python"},
+            "repositoryTopics": {"nodes": [{"topic": {"name": "llm"}}]},
+            "createdAt": "2024-01-01T00:00:00Z", "updatedAt": "2024-06-01T00:00:00Z"}
+    if readme is not None:
+        node["readme1"] = {"text": readme, "oid": "abc123"}
+    return node
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(crawler_module, "GITHUB_TOKEN", "token")
+    monkeypatch.setitem(crawler_module.GRAPHQL_CONFIG, "batch_size", 2)
+    agent = crawler_module.CrawlerAgent()
+    agent.readme_cache = ReadmeCache(root=str(tmp_path / "readmes"))
+    agent.rest_calls = []
+    monkeypatch.setattr(agent, "_fetch_repo_rest",
+                        lambda full_name, category: agent.rest_calls.append(full_name) or None)
+    monkeypatch.setattr(crawler_module.governor, "get",
+                        lambda *a, **k: pytest.fail("README should come from the GraphQL batch"))
+    return agent
+
+
+def test_repos_and_readmes_come_back_in_batches(agent, monkeypatch):
+    queries = []
+
+    def post(url, json=None, **kwargs):
+        queries.append(json["variables"])
+        names = [f"{json['variables'][f'o{i}']}/{json['variables'][f'n{i}']}" for i in range(len(json["variables"]) // 2)]
+        return _Response({"data": {f"r{i}": _node(name, readme=f"# {name}") for i, name in enumerate(names)}})
+
+    monkeypatch.setattr(crawler_module.governor, "post", post)
+    projects = agent.fetch_repos(["a/one", "a/two", "b/three"], category="llm")
+
+    assert [len(q) // 2 for q in queries] == [2, 1]
+    assert projects["a/two"]["stars"] == 100 and projects["a/two"]["category"] == "llm"
+    assert agent.get_readme("b/three") == "# b/three"
+    assert agent.rest_calls == []
+
+
+def test_unresolved_repos_and_failed_batches_fall_back_to_rest(agent, monkeypatch):
+    def post(url, json=None, **kwargs):
+        if json["variables"]["o0"] == "broken":
+            return _Response({}, status_code=502)
+        return _Response({"data": {"r0": _node("a/one", readme="x"), "r1": None}})
+
+    monkeypatch.setattr(crawler_module.governor, "post", post)
+    projects = agent.fetch_repos(["a/one", "a/missing", "broken/x"], with_readme=False)
+
+    assert list(projects) == ["a/one"]
+    assert agent.rest_calls == ["a/missing", "broken/x"]
+
+
+def test_prefetch_only_requests_stale_readmes(agent, monkeypatch):
+    agent.readme_cache.put("a/cached", "fresh", "sha")
+    requested = []
+
+    def post(url, json=None, **kwargs):
+        requested.append(f"{json['variables']['o0']}/{json['variables']['n0']}")
+        return _Response({"data": {"r0": _node(requested[-1], readme="new")}})
+
+    monkeypatch.setattr(crawler_module.governor, "post", post)
+    assert agent.prefetch_readmes(["a/cached", "a/stale"]) == 1
+    assert requested == ["a/stale"]
+
+
+def test_project_by_url_brings_its_readme_in_the_same_query(agent, monkeypatch):
+    queries = []
+
+    def post(url, json=None, **kwargs):
+        queries.append(json["variables"])
+        return _Response({"data": {"r0": _node("a/one", readme="# one")}})
+
+    monkeypatch.setattr(crawler_module.governor, "post", post)
+    project = agent.fetch_project_by_url("https://github.com/a/one")
+    assert project["full_name"] == "a/one" and project["category"] == "manual"
+    assert agent.get_readme("a/one") == "# one"
+    assert len(queries) == 1
@@ -0,0 +1,148 @@
+"""Database facade tests against a temporary SQLite file"""
+import threading
+import time
+
+from github_hub.config import DB_CONFIG
+from github_hub.database import Database
+
+
+def test_project_stats_counts_analyzed_by_model_substring(db, make_project):
+    db.upsert_projects([make_project("1"), make_project("2"),
+                        make_project("3", "agents"), make_project("4", "agents")])
+    db.update_project_analysis("1", {"summary": "s", "model_name": "openai/gpt-oss-120B"})
+    db.update_project_analysis("3", {"summary": "s", "model_name": "gpt-oss-120b"})
+    db.update_project_analysis("4", {"summary": "s", "model_name": "qwen-7b"})
+
+    stats = db.backend.project_stats("120b")
+    assert stats["total"] == 4
+    assert stats["categories"] == {"llm": 2, "agents": 2}
+    assert stats["analyzed"] == 2
+    assert db.backend.project_stats("no-such-model")["analyzed"] == 0
+
+
+def _flusher_threads():
+    return [t for t in threading.enumerate() if t.name == "db-flusher"]
+
+
+def test_write_buffer_coalesces_patches(db, monkeypatch, make_project):
+    db.upsert_projects([make_project("1"), make_project("2")])
+    calls = []
+    patch = db.backend.patch_projects
+    monkeypatch.setattr(db.backend, "patch_projects", lambda updates: calls.append(dict(updates)) or patch(updates))
+    with db.write_buffer():
+        db.update_project_rag_summary("1", "a")
+        db.update_project_screenshot("1", "shot.jpg")
+        db.update_project_rag_summary("2", "b")
+        # 缓冲期间的读取能看到自己的写入
+        assert db.get_project("1")["ai_rag_summary"] == "a"
+        assert calls == []
+    assert calls == [{"1": {"ai_rag_summary": "a", "screenshot": "shot.jpg"}, "2": {"ai_rag_summary": "b"}}]
+    assert db.backend.get_projects_by_ids(["1"])[0]["screenshot"] == "shot.jpg"
+
+
+def test_concurrent_flushes_never_write_an_older_snapshot_last(db, monkeypatch, make_project):
+    db.upsert_projects([make_project("1")])
+    patch = db.backend.patch_projects
+    writing = threading.Event()
+
+    def slow(updates):
+        if updates["1"]["ai_rag_summary"] == "old":
+            writing.set()
+            time.sleep(0.2)
+        patch(updates)
+
+    monkeypatch.setattr(db.backend, "patch_projects", slow)
+    with db.write_buffer():
+        db.update_project_rag_summary("1", "old")
+        # 后台刷新拿走旧快照后，新值随 write_buffer 退出时刷新
+        flusher = threading.Thread(target=db.flush_updates)
+        flusher.start()
+        assert writing.wait(1)
+        db.update_project_rag_summary("1", "new")
+    flusher.join()
+    assert db.backend.get_projects_by_ids(["1"])[0]["ai_rag_summary"] == "new"
+
+
+def test_flusher_starts_on_first_buffered_write_and_stops_on_close(tmp_path, monkeypatch, make_project):
+    monkeypatch.setitem(DB_CONFIG, "write_buffer_max_age", 0)
+    before = len(_flusher_threads())
+    database = Database(str(tmp_path / "hub.db"))
+    database.upsert_projects([make_project("1")])
+    with database.write_buffer():
+        assert len(_flusher_threads()) == before
+        database.update_project_rag_summary("1", "a")
+        assert len(_flusher_threads()) == before + 1
+        # 滞留超过 max_age 的缓冲由后台线程刷新
+        deadline = time.monotonic() + 5
+        stored = None
+        while stored != "a" and time.monotonic() < deadline:
+            time.sleep(0.1)
+            stored = database.backend.get_projects_by_ids(["1"])[0]["ai_rag_summary"]
+        assert stored == "a"
+    database.close()
+    assert len(_flusher_threads()) == before
+
+
+def test_short_lived_instances_start_no_threads(tmp_path, make_project):
+    before = threading.active_count()
+    for i in range(3):
+        database = Database(str(tmp_path / f"hub{i}.db"))
+        database.upsert_projects([make_project("1")])
+        database.update_project_rag_summary("1", "unbuffered")
+        database.close()
+    assert threading.active_count() == before
+
+
+def test_upsert_is_chunked_and_deduplicated(db, monkeypatch, make_project):
+    chunks = []
+    upsert = db.backend.upsert_projects
+    monkeypatch.setattr(db.backend, "upsert_projects", lambda rows: chunks.append(len(rows)) or upsert(rows))
+    projects = [make_project(str(i)) for i in range(7)] + [make_project("3", stars=42)]
+
+    stats = db.upsert_projects(projects, chunk_size=3)
+
+    assert chunks == [3, 3, 1]
+    assert (stats["rows"], stats["written"], stats["queued"]) == (7, 7, 7)
+    # 同一批中重复的 id 以后出现的为准
+    assert db.backend.get_projects_by_ids(["3"])[0]["stars"] == 42
+
+
+def test_unchanged_rows_are_skipped_once_fingerprints_are_loaded(db, monkeypatch, make_project):
+    db.upsert_projects([make_project("1"), make_project("2")])
+    db.load_fingerprints()
+    chunks = []
+    upsert = db.backend.upsert_projects
+    monkeypatch.setattr(db.backend, "upsert_projects", lambda rows: chunks.append([r["id"] for r in rows]) or upsert(rows))
+
+    stats = db.upsert_projects([make_project("1"), make_project("2", stars=11)])
+
+    assert (stats["written"], stats["skipped"]) == (1, 1)
+    assert chunks == [["2"]]
+
+
+def test_connections_of_finished_threads_are_closed(db):
+    backend = db.backend
+    for i in range(20):
+        # 模拟 threaded=True 的 Flask: 每个请求一个短命线程
+        thread = threading.Thread(target=backend.get_projects_by_ids, args=([str(i)],))
+        thread.start()
+        thread.join()
+    assert backend.connection_count() <= 2
+
+
+def test_writes_during_index_rebuild_reach_the_new_index(db, monkeypatch, make_project):
+    db.upsert_projects([make_project("1", description="alpha")])
+    db.rebuild_search_index()
+    scan = db.iter_projects
+
+    def scan_then_write(**kwargs):
+        rows = list(scan(**kwargs))
+        # 扫描已读完、新索引尚未交换时的写入
+        db.upsert_projects([make_project("2", description="bravo")])
+        db.delete_project("1")
+        return iter(rows)
+
+    monkeypatch.setattr(db, "iter_projects", scan_then_write)
+    index = db.rebuild_search_index()
+    assert index is db.search_index
+    assert index.search("bravo")[1] == 1 and index.search("alpha")[1] == 0
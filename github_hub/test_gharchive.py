@@ -0,0 +1,66 @@
+"""GH Archive backfill tests: anchoring to the end of the imported range"""
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from github_hub.gharchive import import_gharchive
+
+
+def _write_dump(path, events):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"type": "PushEvent", "repo": {"name": "owner/repo"}}) + "\n")
+        for name, created_at in events:
+            f.write(json.dumps({"type": "WatchEvent", "repo": {"name": name}, "created_at": created_at}) + "\n")
+
+
+@pytest.fixture
+def db(db, make_project):
+    db.upsert_projects([make_project("1", name="repo", full_name="owner/repo", stars=500)])
+    return db
+
+
+def _history(db):
+    return {captured_at: stars for pid, captured_at, stars in db.iter_star_snapshots("2000-01-01") if pid == "1"}
+
+
+def test_past_range_is_anchored_to_stored_snapshot_after_range(db, tmp_path):
+    # 2 stars on 2024-03-01, 3 on 2024-03-02; the live count (500) includes years of later stars
+    _write_dump(tmp_path / "2024-03-01-0.json.gz", [("owner/repo", "2024-03-01T01:00:00Z")] * 2)
+    _write_dump(tmp_path / "2024-03-02-23.json.gz", [("owner/repo", "2024-03-02T23:00:00Z")] * 3)
+    db.add_star_snapshots([{"project_id": "1", "captured_at": "2024-03-03T06:00:00+00:00", "stars": 120, "forks": 0}])
+
+    result = import_gharchive(db, [str(p) for p in sorted(tmp_path.glob("*.json.gz"))],
+                              workers=1, update_growth=False)
+
+    history = _history(db)
+    assert result["range_end"] == "2024-03-02" and result["unanchored"] == 0
+    assert history["2024-03-02T23:59:59+00:00"] == 120
+    assert history["2024-03-01T23:59:59+00:00"] == 117
+    assert history["2024-02-29T23:59:59+00:00"] == 115
+
+
+def test_past_range_without_anchor_is_skipped(db, tmp_path):
+    _write_dump(tmp_path / "2024-03-01-0.json.gz", [("owner/repo", "2024-03-01T01:00:00Z")])
+
+    result = import_gharchive(db, [str(tmp_path / "2024-03-01-0.json.gz")], workers=1, update_growth=False)
+
+    assert result["unanchored"] == 1 and result["snapshots"] == 0
+    assert not any(ts.startswith("2024-") for ts in _history(db))
+
+
+def test_range_reaching_today_uses_live_stars(db, tmp_path):
+    today = datetime.now(timezone.utc).date()
+    yesterday = today - timedelta(days=1)
+    path = tmp_path / f"{today.isoformat()}-0.json.gz"
+    _write_dump(path, [("owner/repo", f"{yesterday.isoformat()}T12:00:00Z")] * 4
+                + [("owner/repo", f"{today.isoformat()}T00:30:00Z")])
+
+    import_gharchive(db, [str(path)], workers=1, update_growth=False)
+
+    history = _history(db)
+    assert history[f"{today.isoformat()}T23:59:59+00:00"] == 500
+    assert history[f"{yesterday.isoformat()}T23:59:59+00:00"] == 499
+    # 所有回填时间戳都带 UTC 时区
+    assert all(ts.endswith("+00:00") for ts in history if "T23:59:59" in ts)
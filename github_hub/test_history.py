@@ -0,0 +1,60 @@
+"""History index tests: updates from the archiver, shared read-only query instances"""
+import threading
+
+import pytest
+
+from github_hub.archive import ArchiveEngine
+from github_hub.history import HistoryIndex
+
+
+def _rows(**stars):
+    return [{"id": pid, "full_name": f"owner/{pid}", "category": "llm", "stars": n, "forks": 0}
+            for pid, n in stars.items()]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = ArchiveEngine(root=str(tmp_path / "archive"), compression="gzip", base_every=7)
+    engine.archive(_rows(a=1, b=10), day="2026-01-01")
+    engine.archive(_rows(a=5, b=11, c=2), day="2026-01-02")
+    return engine
+
+
+def test_update_indexes_days_and_answers_queries(engine):
+    assert HistoryIndex(engine).update()["indexed"] == ["2026-01-01", "2026-01-02"]
+    history = HistoryIndex.open(engine)
+    assert history.series("a") == [{"date": "2026-01-01", "stars": 1}, {"date": "2026-01-02", "stars": 5}]
+    assert history.first_seen(history.find("OWNER/c")) == "2026-01-02"
+    assert [row["id"] for row in history.top_gainers("2026-01-01", "2026-01-02")] == ["a", "b"]
+
+
+def test_open_is_shared_and_reloads_only_after_update(engine):
+    HistoryIndex(engine).update()
+    first = HistoryIndex.open(engine)
+    assert HistoryIndex.open(engine) is first
+    with pytest.raises(RuntimeError):
+        first.update()
+
+    engine.archive(_rows(a=9), day="2026-01-03")
+    assert HistoryIndex.open(engine) is first
+    HistoryIndex(engine).update()
+    reopened = HistoryIndex.open(engine)
+    assert reopened is not first and reopened.days[-1] == "2026-01-03"
+
+
+def test_concurrent_updates_do_not_race(engine):
+    errors = []
+
+    def run():
+        try:
+            HistoryIndex(engine).update()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert HistoryIndex.open(engine).days == ["2026-01-01", "2026-01-02"]
@@ -0,0 +1,85 @@
+"""Conditional-request cache tests with a scripted fetch (no network)"""
+import threading
+
+import requests
+
+from github_hub.http_cache import HttpCache
+
+
+def _response(status=200, body=b'{"n": 1}', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    return response
+
+
+class _Fetch:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def __call__(self, url, params=None, headers=None, **kwargs):
+        self.sent.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def test_etag_revalidation_answers_304_from_disk(tmp_path):
+    fetch = _Fetch(_response(headers={"ETag": '"v1"'}), _response(304))
+    cache = HttpCache(root=str(tmp_path), fetch=fetch)
+    assert cache.get("https://api.github.com/repos/a/b").json() == {"n": 1}
+
+    again = HttpCache(root=str(tmp_path), fetch=fetch).get("https://api.github.com/repos/a/b")
+    assert again.status_code == 200 and again.json() == {"n": 1}
+    assert fetch.sent[1]["If-None-Match"] == '"v1"'
+
+
+def test_max_age_is_served_without_a_request(tmp_path):
+    fetch = _Fetch(_response(headers={"ETag": '"v1"', "Cache-Control": "public, max-age=60"}))
+    cache = HttpCache(root=str(tmp_path), fetch=fetch)
+    cache.get("https://api.github.com/repos/a/b")
+    assert cache.get("https://api.github.com/repos/a/b").json() == {"n": 1}
+    assert len(fetch.sent) == 1 and cache.counters["hits"] == 1
+
+
+def test_params_and_accept_are_part_of_the_key(tmp_path):
+    fetch = _Fetch(*[_response(headers={"ETag": f'"v{i}"'}) for i in range(3)])
+    cache = HttpCache(root=str(tmp_path), fetch=fetch)
+    cache.get("https://api.github.com/search/repositories", params={"q": "a"})
+    cache.get("https://api.github.com/search/repositories", params={"q": "b"})
+    cache.get("https://api.github.com/search/repositories", params={"q": "a"}, headers={"Accept": "x"})
+    assert all("If-None-Match" not in sent for sent in fetch.sent)
+
+
+def test_directory_is_kept_under_max_bytes(tmp_path):
+    body = b"x" * 4000
+    fetch = _Fetch(*[_response(body=body, headers={"ETag": f'"v{i}"'}) for i in range(20)])
+    cache = HttpCache(root=str(tmp_path), max_bytes=2000, fetch=fetch)
+    for i in range(20):
+        cache.get(f"https://api.github.com/repos/a/{i}")
+    assert cache._scan() <= 2000 and cache.counters["evicted"] > 0
+
+
+def test_running_size_matches_disk_after_revalidation(tmp_path):
+    fetch = _Fetch(_response(headers={"ETag": '"v1"'}), *[_response(304) for _ in range(3)])
+    cache = HttpCache(root=str(tmp_path), fetch=fetch)
+    for _ in range(4):
+        cache.get("https://api.github.com/repos/a/b")
+    assert cache.stats()["bytes"] == cache._scan()
+
+
+def test_counters_are_exact_under_concurrent_hits(tmp_path):
+    fetch = _Fetch(_response(headers={"ETag": '"v1"', "Cache-Control": "max-age=60"}))
+    cache = HttpCache(root=str(tmp_path), fetch=fetch)
+    cache.get("https://api.github.com/repos/a/b")
+
+    def worker():
+        for _ in range(200):
+            cache.get("https://api.github.com/repos/a/b")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.stats()["hits"] == 1600
@@ -0,0 +1,91 @@
+"""Shared HTTP client tests against a local keep-alive server"""
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from urllib3.exceptions import EmptyPoolError
+
+from github_hub.http_client import HttpClient, metrics
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures = {"n": 0}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", encoding: str = None):
+        self.send_response(status)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/flaky" and self.failures["n"] < 2:
+            self.failures["n"] += 1
+            return self._send(503)
+        if self.path == "/down":
+            return self._send(503)
+        body = b'{"ok": true}'
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            return self._send(200, gzip.compress(body), "gzip")
+        self._send(200, body)
+
+    def do_POST(self):
+        self.failures["n"] += 1
+        self._send(503)
+
+
+@pytest.fixture
+def server():
+    _Handler.failures["n"] = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def client():
+    c = HttpClient({"backoff_factor": 0.01, "backoff_jitter": 0.01})
+    yield c
+    c.close()
+
+
+def test_keep_alive_reuses_connections_and_decodes_gzip(server, client):
+    before = metrics.stats().get("127.0.0.1", {"requests": 0, "connections": 0})
+    for _ in range(5):
+        assert client.get(f"{server}/data").json() == {"ok": True}
+    after = metrics.stats()["127.0.0.1"]
+    assert after["requests"] - before["requests"] == 5
+    assert after["connections"] - before["connections"] == 1
+
+
+def test_5xx_is_retried_with_backoff(server, client):
+    response = client.get(f"{server}/flaky")
+    assert response.status_code == 200
+    assert _Handler.failures["n"] == 2
+
+
+def test_exhausted_retries_return_last_response(server, client):
+    assert client.get(f"{server}/down").status_code == 503
+
+
+def test_post_is_not_retried(server, client):
+    assert client.post(f"{server}/submit", data={"q": "x"}).status_code == 503
+    assert _Handler.failures["n"] == 1
+
+
+def test_blocked_pool_gives_up_after_pool_timeout(server):
+    client = HttpClient({"pool_maxsize": 1, "pool_timeout": 0.2})
+    # 未读取的流式响应一直占用池中唯一的连接
+    held = client.get(f"{server}/data", stream=True)
+    with pytest.raises(EmptyPoolError):
+        client.get(f"{server}/data")
+    held.close()
+    assert client.get(f"{server}/data").json() == {"ok": True}
+    client.close()
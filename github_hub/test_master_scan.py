@@ -0,0 +1,91 @@
+"""MasterAgent full-scan tests: stop/cancel during the parallel crawl and the analysis step"""
+import threading
+import time
+
+import pytest
+
+from github_hub.master import MasterAgent
+
+
+@pytest.fixture
+def master(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent = MasterAgent(str(tmp_path / "hub.db"))
+    agent.crawler.crawl_external_page = lambda url: []
+    agent.crawler.prefetch_readmes = lambda names: 0
+    agent._get_readme = lambda project: "readme"
+    agent.archive_data = lambda: None
+    yield agent
+    agent.close()
+
+
+def test_stop_cancels_parallel_crawl(master):
+    started = threading.Event()
+
+    def blocked(cat_id):
+        started.set()
+        # 模拟等待额度: 直到 stop_task 置位取消
+        master._cancel.wait(30)
+        return []
+
+    master.crawler.fetch_category = blocked
+    scan = threading.Thread(target=master.run_full_scan)
+    scan.start()
+    assert started.wait(10)
+
+    assert master.stop_task() == {"status": "stopping"}
+    begin = time.time()
+    scan.join(10)
+    assert not scan.is_alive()
+    assert time.time() - begin < 5
+    assert master.stop_task() == {"status": "not_running"}
+
+
+def test_full_scan_analyzes_pending_projects(master, make_project):
+    master.db.upsert_projects([make_project(1000 + i) for i in range(3)])
+    assert master.db.get_pending_count() == 3
+    master.crawler.fetch_category = lambda cat_id: []
+    master.analyzer.analyze_project = lambda project, readme: {"summary": "ok", "model_name": "gpt-oss-120b"}
+
+    results = master.run_full_scan()
+
+    assert "error" not in results
+    assert results["analyze"] == 3
+    assert master.db.get_pending_count() == 0
+
+
+def test_stop_during_analysis_releases_claimed_leases(master, make_project):
+    master.db.upsert_projects([make_project(1000 + i) for i in range(3)])
+    master.crawler.fetch_category = lambda cat_id: []
+    analyzed = []
+
+    def analyze_then_stop(project, readme):
+        analyzed.append(project["id"])
+        master.stop_task()
+        return {"summary": "ok", "model_name": "gpt-oss-120b"}
+
+    master.analyzer.analyze_project = analyze_then_stop
+    master.run_full_scan()
+
+    assert len(analyzed) == 1
+    # 剩余两个租约立即归还，可以马上被再次领取
+    claimed = master.db.claim_analysis_jobs("other-worker", limit=10)
+    assert sorted(p["id"] for p in claimed) == sorted(str(1000 + i) for i in range(3) if str(1000 + i) not in analyzed)
+
+
+def test_stopped_scan_skips_growth_and_archive(master):
+    steps = []
+    master.db.update_growth = lambda: steps.append("growth")
+    master.archive_data = lambda: steps.append("archive")
+
+    def crawl_then_stop(cat_id):
+        master.stop_task()
+        return []
+
+    master.crawler.fetch_category = crawl_then_stop
+    results = master.run_full_scan()
+    assert results.get("cancelled") and steps == []
+
+    master.crawler.fetch_category = lambda cat_id: []
+    master.run_full_scan()
+    assert steps == ["growth", "archive"]
@@ -0,0 +1,65 @@
+"""Migrator tests between two SQLite backends: resume cursor and --diff"""
+import json
+
+import pytest
+
+from github_hub.migrate_to_supabase import Migrator
+from github_hub.sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def env(tmp_path, make_project):
+    source = SQLiteBackend(str(tmp_path / "source.db"))
+    target = SQLiteBackend(str(tmp_path / "target.db"))
+    # 零填充 id: 游标按 id 的字符串顺序推进
+    source.upsert_projects([make_project(f"{i:03d}", stars=i) for i in range(10)])
+    yield source, target, str(tmp_path / "state.json")
+    source.close()
+    target.close()
+
+
+def _target_ids(target):
+    return sorted(row["id"] for row in target.select_changed("projects", limit=100))
+
+
+def test_interrupted_run_resumes_after_last_written_chunk(env, monkeypatch):
+    source, target, state_path = env
+    replace_rows = target.replace_rows
+    calls = {"n": 0}
+
+    def flaky(table, rows, merge_key):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise IOError("connection reset")
+        return replace_rows(table, rows, merge_key)
+
+    monkeypatch.setattr(target, "replace_rows", flaky)
+    first = Migrator(source, target, "push", chunk_size=3, workers=1, state_path=state_path)
+    stats = first.migrate_table("projects")
+    assert "error" in stats and stats["failed"] == 3
+    # 失败分块之后的分块即使写入成功，游标也停在最长的已写入前缀
+    with open(state_path, encoding="utf-8") as f:
+        assert json.load(f) == {"push:projects": "005"}
+
+    monkeypatch.setattr(target, "replace_rows", replace_rows)
+    second = Migrator(source, target, "push", chunk_size=3, workers=1, state_path=state_path)
+    stats = second.migrate_table("projects")
+    # 只从游标之后读取，跑完后清除游标
+    assert stats["read"] == 4 and "error" not in stats
+    assert _target_ids(target) == [f"{i:03d}" for i in range(10)]
+    assert second.state == {}
+
+
+def test_diff_moves_only_changed_rows(env, make_project):
+    source, target, state_path = env
+    Migrator(source, target, "push", chunk_size=4, workers=2, state_path=state_path).migrate_table("projects")
+    source.upsert_projects([make_project("004", stars=999), make_project("042", stars=42)])
+
+    dry = Migrator(source, target, "push", chunk_size=4, workers=2, state_path=state_path,
+                   diff=True, dry_run=True).migrate_table("projects")
+    assert (dry["added"], dry["changed"], dry["written"]) == (1, 1, 0)
+
+    stats = Migrator(source, target, "push", chunk_size=4, workers=2, state_path=state_path,
+                     diff=True).migrate_table("projects")
+    assert stats["written"] == 2
+    assert target.get_projects_by_ids(["004"])[0]["stars"] == 999
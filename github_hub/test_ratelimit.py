@@ -0,0 +1,105 @@
+"""Rate-limit governor tests with a scripted session (no network)"""
+import threading
+import time
+
+import pytest
+
+from github_hub.config import RATELIMIT_CONFIG
+from github_hub.ratelimit import RateLimitExceeded, RateLimitGovernor, RequestCancelled, resource_for
+
+
+class _Response:
+    def __init__(self, status_code=200, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class _Session:
+    """Returns queued responses in order and records request times"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, time.time()))
+        return self.responses.pop(0)
+
+
+def _budget(remaining, reset_in=0.0, resource="core"):
+    return {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Reset": str(time.time() + reset_in), "X-RateLimit-Resource": resource}
+
+
+@pytest.fixture(autouse=True)
+def no_reset_margin(monkeypatch):
+    monkeypatch.setitem(RATELIMIT_CONFIG, "reset_margin", 0.0)
+
+
+def test_resource_buckets():
+    assert resource_for("https://api.github.com/search/code?q=x") == "code_search"
+    assert resource_for("https://api.github.com/search/repositories?q=x") == "search"
+    assert resource_for("https://api.github.com/graphql") == "graphql"
+    assert resource_for("https://api.github.com/repos/a/b") == "core"
+
+
+def test_exhausted_budget_waits_for_reset():
+    session = _Session([_Response(headers=_budget(0, reset_in=0.3)), _Response(headers=_budget(4999, 3600))])
+    governor = RateLimitGovernor(session)
+    governor.get("https://api.github.com/repos/a/b")
+    start = time.time()
+    governor.get("https://api.github.com/repos/a/c")
+    assert time.time() - start >= 0.25
+    assert governor.stats()["core"]["waits"] == 1
+
+
+def test_wait_longer_than_max_wait_raises():
+    governor = RateLimitGovernor(_Session([_Response(headers=_budget(0, reset_in=600))]))
+    governor.get("https://api.github.com/repos/a/b")
+    with pytest.raises(RateLimitExceeded):
+        governor.get("https://api.github.com/repos/a/c", max_wait=1)
+
+
+def test_secondary_limit_is_retried_after_retry_after():
+    session = _Session([_Response(429, {"Retry-After": "0.2"}), _Response(headers=_budget(10, 3600))])
+    response = RateLimitGovernor(session).get("https://api.github.com/search/repositories?q=x")
+    assert response.status_code == 200
+    assert session.calls[1][2] - session.calls[0][2] >= 0.15
+
+
+def test_cancel_aborts_a_waiting_request():
+    governor = RateLimitGovernor(_Session([_Response(headers=_budget(0, reset_in=600))]))
+    governor.get("https://api.github.com/repos/a/b")
+    cancel, errors = threading.Event(), []
+
+    def worker():
+        with governor.cancel_on(cancel):
+            try:
+                governor.get("https://api.github.com/repos/a/c")
+            except RequestCancelled as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.1)
+    cancel.set()
+    governor.wake()
+    thread.join(timeout=2)
+    assert not thread.is_alive() and len(errors) == 1
+
+
+def test_unknown_budget_lets_one_probe_through():
+    governor = RateLimitGovernor(_Session([]))
+    governor.acquire("core")
+    entered = threading.Event()
+
+    def second():
+        governor.acquire("core")
+        entered.set()
+
+    threading.Thread(target=second, daemon=True).start()
+    # 探测请求的响应头到达之前，第二个请求被挡住
+    assert not entered.wait(0.2)
+    governor.update("core", _Response(headers=_budget(100, 3600)))
+    assert entered.wait(1)
@@ -0,0 +1,70 @@
+"""README cache tests: persistence, freshness and ETag/SHA revalidation in get_readme"""
+import base64
+
+import pytest
+
+from github_hub import crawler as crawler_module
+from github_hub.readme_cache import ReadmeCache
+
+
+class _Response:
+    def __init__(self, status_code, payload=None, etag=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent = crawler_module.CrawlerAgent()
+    # revalidate_hours=0: 每次读取都走条件请求
+    agent.readme_cache = ReadmeCache(root=str(tmp_path / "readmes"), revalidate_hours=0)
+    return agent
+
+
+def _script(monkeypatch, *responses):
+    sent = []
+    queue = list(responses)
+
+    def get(url, headers=None, **kwargs):
+        sent.append(dict(headers or {}))
+        return queue.pop(0)
+
+    monkeypatch.setattr(crawler_module.governor, "get", get)
+    return sent
+
+
+def test_entries_persist_across_instances(tmp_path):
+    ReadmeCache(root=str(tmp_path)).put("Owner/Repo", "# hi", "sha1", '"e1"')
+    entry = ReadmeCache(root=str(tmp_path)).get("owner/repo")
+    assert (entry["text"], entry["sha"], entry["etag"]) == ("# hi", "sha1", '"e1"')
+
+
+def test_304_reuses_cached_text(agent, monkeypatch):
+    body = {"sha": "sha1", "content": base64.b64encode("# readme".encode()).decode()}
+    sent = _script(monkeypatch, _Response(200, body, '"e1"'), _Response(304))
+    assert agent.get_readme("a/b") == "# readme"
+    assert agent.get_readme("a/b") == "# readme"
+    assert sent[1]["If-None-Match"] == '"e1"'
+    assert agent.readme_cache.counters["revalidated"] == 1
+
+
+def test_unchanged_sha_skips_decoding_and_404_is_cached(agent, monkeypatch):
+    agent.readme_cache.put("a/b", "cached text", "sha1", '"old"')
+    _script(monkeypatch, _Response(200, {"sha": "sha1", "content": "!!not base64!!"}, '"new"'),
+            _Response(404, etag='"none"'))
+    assert agent.get_readme("a/b") == "cached text"
+    assert agent.readme_cache.counters["unchanged"] == 1
+    assert agent.get_readme("a/none") is None
+    assert agent.readme_cache.get("a/none")["text"] is None
+
+
+def test_fresh_entry_is_served_without_a_request(tmp_path, agent, monkeypatch):
+    agent.readme_cache = ReadmeCache(root=str(tmp_path / "fresh"), revalidate_hours=1)
+    agent.readme_cache.put("a/b", "local", "sha1")
+    _script(monkeypatch)
+    assert agent.get_readme("a/b") == "local"
@@ -0,0 +1,91 @@
+"""Replica sync tests: row_updated_at watermark, buffered patches, deletes"""
+import time
+
+import pytest
+
+from github_hub.database import Database
+from github_hub.replica import ReplicaSync
+from github_hub.sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def env(tmp_path):
+    db = Database(str(tmp_path / "primary.db"))
+    replica = SQLiteBackend(str(tmp_path / "replica.db"))
+    # overlap 0: 不依赖回退窗口掩盖水位问题
+    sync = ReplicaSync(db.backend, replica, {"overlap_seconds": 0, "page_size": 2})
+    yield db, replica, sync
+    db.close()
+    replica.close()
+
+
+def _replica_row(replica, pid):
+    rows = replica.get_projects_by_ids([pid])
+    return rows[0] if rows else None
+
+
+def test_initial_copy_and_incremental_pull(env, make_project):
+    db, replica, sync = env
+    db.upsert_projects([make_project(str(i)) for i in range(5)])
+    assert sync.sync_once() >= 5
+    db.upsert_projects([make_project("9")])
+    db.update_project_rag_summary("2", "summary")
+    sync.sync_once()
+    assert _replica_row(replica, "9") is not None
+    assert _replica_row(replica, "2")["ai_rag_summary"] == "summary"
+
+
+def test_patches_do_not_touch_last_analyzed(env, make_project):
+    db, replica, sync = env
+    db.upsert_projects([make_project("1")])
+    db.update_project_screenshot("1", "static/screenshots/1.jpg")
+    row = db.backend.get_projects_by_ids(["1"])[0]
+    assert row["last_analyzed"] is None
+    assert row["row_updated_at"] is not None
+
+
+def test_buffered_patch_is_stamped_when_written(env, make_project):
+    db, replica, sync = env
+    db.upsert_projects([make_project("1"), make_project("2")])
+    sync.sync_once()
+    with db.write_buffer():
+        db.update_project_rag_summary("1", "late")
+        time.sleep(0.05)
+        # 缓冲期间其他写入推进了副本水位
+        db.upsert_projects([dict(make_project("2"), stars=99)])
+        sync.sync_once()
+        # 戳为毫秒精度：同一毫秒内的写入本就依赖 overlap 回退窗口，这里不测它
+        time.sleep(0.01)
+    sync.sync_once()
+    assert _replica_row(replica, "2")["stars"] == 99
+    assert _replica_row(replica, "1")["ai_rag_summary"] == "late"
+
+
+def test_last_scanned_touch_does_not_move_the_watermark(env, make_project):
+    db, replica, sync = env
+    db.upsert_projects([make_project("1")])
+    sync.sync_once()
+    stamp = db.backend.get_projects_by_ids(["1"])[0]["row_updated_at"]
+    time.sleep(0.01)
+    db.touch_projects(["1"])
+    row = db.backend.get_projects_by_ids(["1"])[0]
+    assert row["row_updated_at"] == stamp and row["last_scanned"] is not None
+    assert sync.sync_once() == 0
+
+
+def test_copied_rows_keep_primary_stamp(env, make_project):
+    db, replica, sync = env
+    db.upsert_projects([make_project("1")])
+    sync.sync_once()
+    primary = db.backend.get_projects_by_ids(["1"])[0]["row_updated_at"]
+    assert _replica_row(replica, "1")["row_updated_at"] == primary
+
+
+def test_reconcile_removes_deleted_projects(env, make_project):
+    db, replica, sync = env
+    db.upsert_projects([make_project("1"), make_project("2")])
+    sync.sync_once()
+    db.backend.delete_project("1")
+    sync.reconcile()
+    assert _replica_row(replica, "1") is None
+    assert _replica_row(replica, "2") is not None
@@ -0,0 +1,46 @@
+"""Search index tests: CJK bigram tokenisation and order-independent BM25F scores"""
+import pytest
+
+from github_hub.search_index import SearchIndex, build_index, tokenize
+
+WEIGHTS = {"name": 3.0, "description": 1.0}
+
+ROWS = [
+    {"id": "1", "name": "langchain", "description": "build llm apps with chains and agents"},
+    {"id": "2", "name": "llama-index", "description": "data framework for llm rag over your documents"},
+    {"id": "3", "name": "ragflow", "description": "rag engine based on deep document understanding " * 3},
+    {"id": "4", "name": "知识库", "description": "本地知识库问答系统"},
+]
+
+
+def test_cjk_runs_become_bigrams():
+    assert tokenize("本地知识库 RAG") == ["本地", "地知", "知识", "识库", "rag"]
+    assert tokenize("库") == ["库"]
+
+
+def test_cjk_query_matches_on_bigrams():
+    index = build_index(ROWS, WEIGHTS)
+    hits, total = index.search("知识库")
+    assert total == 1 and hits[0][0] == "4"
+
+
+def test_scores_do_not_depend_on_insertion_order():
+    forward = build_index(ROWS, WEIGHTS)
+    backward = build_index(reversed(ROWS), WEIGHTS)
+    for query in ("rag", "llm", "document", "lang"):
+        assert dict(forward.search(query)[0]) == pytest.approx(dict(backward.search(query)[0]))
+
+
+def test_scores_follow_corpus_changes():
+    index = build_index(ROWS, WEIGHTS)
+    index.remove("3")
+    fresh = build_index([r for r in ROWS if r["id"] != "3"], WEIGHTS)
+    assert dict(index.search("rag")[0]) == pytest.approx(dict(fresh.search("rag")[0]))
+
+
+def test_partial_update_reindexes_one_field():
+    index = SearchIndex(WEIGHTS)
+    index.add("1", ROWS[0])
+    index.update("1", {"description": "vector database"})
+    assert index.search("chains")[1] == 0
+    assert index.search("langchain")[1] == 1 and index.search("vector")[1] == 1
@@ -9,6 +9,7 @@ from bs4 import BeautifulSoup
 import urllib.parse
 import re
 from openai import OpenAI
+from github_hub.http_client import http_client  # 共享 keep-alive 连接池与重试
 
 # Configuration
 API_BASE = "http://198.18.0.1:1234/v1"
@@ -49,7 +50,7 @@ def search_duckduckgo(query, max_results=3):
     payload = {'q': query}
     
     try:
-        response = requests.post(url, data=payload, headers=HEADERS, timeout=10)
+        response = http_client.post(url, data=payload, headers=HEADERS, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -91,7 +92,7 @@ def search_github(query, max_results=5):
     }
     
     try:
-        response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        response = http_client.get(url, params=params, headers=HEADERS, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -143,7 +144,7 @@ def search_searxng(query, max_results=5, engines="google,bing,brave,duckduckgo")
             }
             
             print(f"      Trying: {instance}...")
-            response = requests.get(url, params=params, headers=HEADERS, timeout=10)
+            response = http_client.get(url, params=params, headers=HEADERS, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -175,25 +176,6 @@ def search_searxng(query, max_results=5, engines="google,bing,brave,duckduckgo")
             continue
     
     print(f"   {YELLOW}All SearXNG instances failed.{RESET}")
-    return []
-            response.raise_for_status()
-            
-            data = response.json()
-            results = []
-            
-            for item in data.get('results', [])[:max_results]:
-                title = item.get('title', 'No Title')
-                href = item.get('url', '#')
-                snippet = item.get('content', 'No description')
-                results.append({"title": title, "url": href, "snippet": snippet})
-            
-            if results:
-                return results
-                
-        except Exception as e:
-            print(f"   {YELLOW}SearXNG ({instance}) failed: {e}{RESET}")
-            continue
-    
     return []
 
 